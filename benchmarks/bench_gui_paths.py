@@ -0,0 +1,323 @@
+"""
+Micro-benchmarks for the GUI-thread hot paths of SagaTrans.
+
+Runs the main window headlessly (offscreen Qt platform) against generated
+projects of increasing size and reports a scaling curve for every measured
+path, optionally comparing the results with a stored baseline.
+
+Usage:
+    python benchmarks/bench_gui_paths.py
+    python benchmarks/bench_gui_paths.py --sizes 50 200 800 --repeat 7
+    python benchmarks/bench_gui_paths.py --save-baseline
+    python benchmarks/bench_gui_paths.py --json bench_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Must be set before PyQt5 creates the QApplication
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("QTWEBENGINE_CHROMIUM_FLAGS", "--no-sandbox")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = [50, 200, 800]
+REGRESSION_THRESHOLD = 1.25  # Flag results slower than baseline by this factor
+
+_WORDS = (
+    "the knight sword castle forest dragon village king queen magic spell "
+    "shadow river mountain journey secret ancient temple guard letter night "
+    "morning voice heart blood fire stone wind silver golden promise battle"
+).split()
+
+
+def generate_project(item_count, paragraphs_per_item=12, seed=1234):
+    """Creates a synthetic project with `item_count` chapters."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(item_count):
+        paragraphs = []
+        for _ in range(paragraphs_per_item):
+            sentence_count = rng.randint(2, 5)
+            sentences = []
+            for _ in range(sentence_count):
+                words = rng.choices(_WORDS, k=rng.randint(6, 16))
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraphs.append(" ".join(sentences))
+        source_text = "\n\n".join(paragraphs)
+        # Roughly half of the project is already translated
+        translated_text = source_text.upper() if i % 2 == 0 else ""
+        items.append({
+            "name": f"Chapter {i + 1}",
+            "source_text": source_text,
+            "translated_text": translated_text
+        })
+
+    return {
+        "title": f"Benchmark Project ({item_count} items)",
+        "description": "Generated by bench_gui_paths.py",
+        "author": "SagaTrans",
+        "target_language": "Polish",
+        "model": "openrouter/meta-llama/llama-4-maverick",
+        "context_token_limit_approx": 32000,
+        "context_selection_mode": "fill_budget",
+        "prompt_config": {},
+        "items": items
+    }
+
+
+def generate_markdown(paragraph_count, seed=4321):
+    """Creates a markdown document with headings, emphasis and lists."""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(paragraph_count):
+        if i % 10 == 0:
+            blocks.append(f"## Section {i // 10 + 1}")
+        words = rng.choices(_WORDS, k=rng.randint(20, 40))
+        words[0] = f"**{words[0]}**"
+        blocks.append(" ".join(words))
+        if i % 7 == 0:
+            blocks.append("\n".join(f"- {w}" for w in rng.choices(_WORDS, k=4)))
+    return "\n\n".join(blocks)
+
+
+def _time_call(func, repeat, setup=None):
+    """Returns the median and minimum wall time of `func` in milliseconds."""
+    samples = []
+    sink = io.StringIO()
+    for _ in range(repeat):
+        if setup:
+            setup()
+        # The GUI paths print debug output; keep it out of the terminal
+        with contextlib.redirect_stdout(sink):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        sink.seek(0)
+        sink.truncate()
+        samples.append(elapsed * 1000.0)
+    return statistics.median(samples), min(samples)
+
+
+def _scaling_exponent(points):
+    """Least-squares slope of log(time) over log(size).
+
+    ~1.0 means linear scaling, ~2.0 quadratic.
+    """
+    usable = [(s, t) for s, t in points if s > 0 and t > 0]
+    if len(usable) < 2:
+        return None
+    xs = [math.log(s) for s, _ in usable]
+    ys = [math.log(t) for _, t in usable]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+class GuiBenchmark:
+    """Owns the headless main window and the benchmark definitions."""
+
+    def __init__(self, repeat):
+        from PyQt5.QtWidgets import QApplication
+        from model_manager import ModelManager
+        from ui.qt_main_window import QtMainWindow
+
+        self.repeat = repeat
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.window = QtMainWindow(ModelManager())
+
+    def load_project(self, project_data):
+        window = self.window
+        window.current_project_data = project_data
+        window.project_items = project_data["items"]
+        window.current_item_index = len(window.project_items) // 2
+        window._clear_token_cache()
+        with contextlib.redirect_stdout(io.StringIO()):
+            window._refresh_listbox_display()
+            item = window.project_items[window.current_item_index]
+            window.source_text_area.blockSignals(True)
+            window.source_text_area.setPlainText(item["source_text"])
+            window.source_text_area.blockSignals(False)
+
+    def _set_mode(self, mode):
+        self.window.current_project_data["context_selection_mode"] = mode
+
+    def run_size(self, size):
+        """Runs every benchmark for a project with `size` items."""
+        window = self.window
+        self.load_project(generate_project(size))
+        results = {}
+
+        for mode in ("fill_budget", "nearby"):
+            self._set_mode(mode)
+            results[f"context_indices[{mode}]"] = _time_call(
+                window._get_context_item_indices, self.repeat)
+        self._set_mode("fill_budget")
+
+        results["context_indices[cold_cache]"] = _time_call(
+            window._get_context_item_indices, self.repeat, setup=window._clear_token_cache)
+
+        results["build_api_payload"] = _time_call(window._build_api_payload, self.repeat)
+        results["update_token_counts[cold_cache]"] = _time_call(
+            window.token_manager._update_token_counts, self.repeat, setup=window._clear_token_cache)
+        results["update_token_counts[warm_cache]"] = _time_call(
+            window.token_manager._update_token_counts, self.repeat)
+        results["refresh_listbox_display"] = _time_call(window._refresh_listbox_display, self.repeat)
+
+        preview_result = self._run_preview(size)
+        if preview_result:
+            results["update_preview_content"] = preview_result
+
+        return results
+
+    def _run_preview(self, size):
+        """Renders a markdown document with `size` paragraphs in the preview."""
+        from ui import preview_manager
+
+        window = self.window
+        preview_view = getattr(window, "translated_text_preview", None)
+        if not preview_manager.QWebEngineView or preview_view is None:
+            return None
+
+        window.translated_text_area.blockSignals(True)
+        window.translated_text_area.setPlainText(generate_markdown(size))
+        window.translated_text_area.blockSignals(False)
+        window.preview_visible = True
+        try:
+            return _time_call(
+                lambda: window.preview_manager._update_preview_content(window.translated_text_area, preview_view),
+                self.repeat)
+        finally:
+            window.preview_visible = False
+
+
+def run_benchmarks(sizes, repeat):
+    """Runs all benchmarks and returns {name: {size: median_ms}} plus exponents."""
+    workdir = tempfile.mkdtemp(prefix="sagatrans_bench_")
+    previous_cwd = os.getcwd()
+    # The app writes settings/ and projects/ relative to the working directory
+    os.chdir(workdir)
+    try:
+        bench = GuiBenchmark(repeat)
+        curves = {}
+        for size in sizes:
+            print(f"Running size {size}...", file=sys.stderr)
+            for name, (median_ms, min_ms) in bench.run_size(size).items():
+                curves.setdefault(name, {})[str(size)] = {"median_ms": median_ms, "min_ms": min_ms}
+    finally:
+        os.chdir(previous_cwd)
+
+    results = {}
+    for name, by_size in curves.items():
+        points = [(int(size), data["median_ms"]) for size, data in by_size.items()]
+        results[name] = {
+            "sizes": by_size,
+            "scaling_exponent": _scaling_exponent(points)
+        }
+    return {
+        "python": sys.version.split()[0],
+        "sizes": sizes,
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def print_report(report, baseline=None):
+    sizes = [str(size) for size in report["sizes"]]
+    header = f"{'benchmark':40}" + "".join(f"{'n=' + size:>12}" for size in sizes) + f"{'exp':>7}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    print("-" * len(header))
+
+    regressions = []
+    for name, data in sorted(report["results"].items()):
+        row = f"{name:40}"
+        for size in sizes:
+            entry = data["sizes"].get(size)
+            row += f"{entry['median_ms']:10.2f}ms" if entry else f"{'-':>12}"
+        exponent = data["scaling_exponent"]
+        row += f"{exponent:7.2f}" if exponent is not None else f"{'-':>7}"
+
+        if baseline:
+            base_entry = baseline.get("results", {}).get(name)
+            ratio = _baseline_ratio(data, base_entry)
+            if ratio is None:
+                row += f"{'new':>10}"
+            else:
+                row += f"{ratio:9.2f}x"
+                if ratio > REGRESSION_THRESHOLD:
+                    row += "  <-- slower"
+                    regressions.append(name)
+        print(row)
+
+    print("\nexp = log-log slope of median time over project size (1.0 = linear, 2.0 = quadratic)")
+    if baseline:
+        print("vs base = geometric mean of current/baseline medians over the common sizes")
+    return regressions
+
+
+def _baseline_ratio(current, baseline_entry):
+    if not baseline_entry:
+        return None
+    ratios = []
+    for size, entry in current["sizes"].items():
+        base = baseline_entry.get("sizes", {}).get(size)
+        if base and base["median_ms"] > 0 and entry["median_ms"] > 0:
+            ratios.append(entry["median_ms"] / base["median_ms"])
+    if not ratios:
+        return None
+    return math.exp(sum(math.log(r) for r in ratios) / len(ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SagaTrans GUI hot-path micro-benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Project sizes (number of items) to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(sorted(set(args.sizes)), max(1, args.repeat))
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = print_report(report, baseline)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {REGRESSION_THRESHOLD}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
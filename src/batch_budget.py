@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from cost_ledger import request_cost, format_cost
+
+# Project setting `batch_limits`; 0 or missing means no limit
+LIMIT_KEYS = ("tokens", "cost", "minutes", "rpm")
+
+
+def batch_limits(project_data: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """The project's batch limits: total tokens, dollars, wall-clock minutes and requests per minute."""
+    limits = (project_data or {}).get("batch_limits") or {}
+    parsed = {}
+    for key in LIMIT_KEYS:
+        try:
+            parsed[key] = max(0.0, float(limits.get(key) or 0))
+        except (TypeError, ValueError):
+            parsed[key] = 0.0
+    return parsed
+
+
+def exceeded_limits(limits: Dict[str, float], estimate: Dict[str, Any]) -> Optional[str]:
+    """Which limits a pre-flight `estimate` would exceed, as text; None when it fits."""
+    problems = []
+    tokens = estimate.get("prompt_tokens", 0) + estimate.get("completion_tokens", 0)
+    if limits.get("tokens") and tokens > limits["tokens"]:
+        problems.append(f"~{tokens:,} tokens exceed the limit of {int(limits['tokens']):,}")
+    if limits.get("cost") and estimate.get("cost") is not None and estimate["cost"] > limits["cost"]:
+        problems.append(f"~{format_cost(estimate['cost'])} exceeds the limit of {format_cost(limits['cost'])}")
+    return "; ".join(problems) or None
+
+
+class BatchBudget:
+    """Enforces the limits of one batch run while it is scheduled.
+
+    Before each request the scheduler calls `try_start()`. It refuses when the
+    wall-clock limit has passed or when the tokens or dollars already spent,
+    plus the expected cost of the requests in flight and of the next one,
+    would cross a limit; the batch then pauses before the limit is hit. The
+    requests-per-minute limit only delays the next request. The expected cost
+    of a request is the mean of the finished ones, or the pre-flight estimate
+    until one has finished. Safe to share between worker threads.
+    """
+
+    def __init__(self, limits: Dict[str, float], pricing: Optional[Dict[str, float]] = None,
+                 expected_tokens: float = 0, expected_cost: float = 0, batch_api: bool = False):
+        self.limits = dict(limits)
+        self.pricing = pricing
+        self.batch_api = batch_api
+        self.expected_tokens = expected_tokens
+        self.expected_cost = expected_cost
+        self.started = time.monotonic()
+        self.tokens = 0
+        self.cost = 0.0
+        self.finished = 0
+        self.in_flight = 0
+        self.paused_reason = None
+        self._starts = deque()  # start times of the requests of the last minute
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_project(cls, project_data, pricing=None, estimate=None, batch_api=False) -> Optional["BatchBudget"]:
+        """A budget for the project's `batch_limits`, or None when no limit is set.
+
+        `estimate` is the pre-flight estimate of the run, used until requests finish.
+        """
+        limits = batch_limits(project_data)
+        if not any(limits.values()):
+            return None
+        expected_tokens = expected_cost = 0
+        if estimate and estimate.get("requests"):
+            expected_tokens = (estimate["prompt_tokens"] + estimate["completion_tokens"]) / estimate["requests"]
+            expected_cost = (estimate.get("cost") or 0) / estimate["requests"]
+        return cls(limits, pricing, expected_tokens, expected_cost, batch_api)
+
+    def update_limits(self, limits: Dict[str, float]) -> None:
+        """Apply changed limits, for example to resume a paused batch; what was spent still counts."""
+        with self._lock:
+            self.limits = dict(limits)
+            self.paused_reason = None
+
+    def _expected(self):
+        if self.finished:
+            return self.tokens / self.finished, self.cost / self.finished
+        return self.expected_tokens, self.expected_cost
+
+    def try_start(self) -> Tuple[Optional[str], float]:
+        """Reserve a request: (None, 0) when it may start now, (None, seconds) when it has to
+        wait for the rate limit, or (reason, 0) when the batch has to pause."""
+        with self._lock:
+            now = time.monotonic()
+            minutes = self.limits.get("minutes")
+            if minutes and now - self.started >= minutes * 60:
+                self.paused_reason = f"time limit of {minutes:g} min reached"
+                return self.paused_reason, 0
+            tokens_per_request, cost_per_request = self._expected()
+            pending = self.in_flight + 1
+            token_limit = self.limits.get("tokens")
+            if token_limit and self.tokens + pending * tokens_per_request > token_limit:
+                self.paused_reason = f"token limit of {int(token_limit):,} nearly reached ({self.tokens:,} used)"
+                return self.paused_reason, 0
+            cost_limit = self.limits.get("cost")
+            if cost_limit and self.cost + pending * cost_per_request > cost_limit:
+                self.paused_reason = f"cost limit of {format_cost(cost_limit)} nearly reached ({format_cost(self.cost)} spent)"
+                return self.paused_reason, 0
+            rpm = self.limits.get("rpm")
+            if rpm:
+                while self._starts and now - self._starts[0] >= 60:
+                    self._starts.popleft()
+                if len(self._starts) >= rpm:
+                    return None, 60 - (now - self._starts[0])
+            self.in_flight += 1
+            self._starts.append(now)
+            return None, 0
+
+    def finish_request(self, prompt_tokens: int, completion_tokens: int, cost: Optional[float] = None) -> None:
+        """Account a finished request; `cost` defaults to the budget's pricing."""
+        if cost is None:
+            cost = request_cost(self.pricing, prompt_tokens, completion_tokens, self.batch_api) or 0.0
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.tokens += prompt_tokens + completion_tokens
+            self.cost += cost
+            self.finished += 1
+
+    def cancel_request(self) -> None:
+        """Release a reserved request that failed or was stopped without usage."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def remaining(self) -> Dict[str, Optional[float]]:
+        """What is left of each limit; None for limits that are not set."""
+        with self._lock:
+            elapsed_minutes = (time.monotonic() - self.started) / 60
+            return {
+                "tokens": max(0, self.limits["tokens"] - self.tokens) if self.limits.get("tokens") else None,
+                "cost": max(0.0, self.limits["cost"] - self.cost) if self.limits.get("cost") else None,
+                "minutes": max(0.0, self.limits["minutes"] - elapsed_minutes) if self.limits.get("minutes") else None,
+            }
+
+    def describe(self) -> str:
+        """Remaining budget as text, e.g. "12,000 tokens, $1.20 and 14 min left"."""
+        remaining = self.remaining()
+        parts = []
+        if remaining["tokens"] is not None:
+            parts.append(f"{int(remaining['tokens']):,} tokens")
+        if remaining["cost"] is not None:
+            parts.append(format_cost(remaining["cost"]))
+        if remaining["minutes"] is not None:
+            parts.append(f"{remaining['minutes']:.0f} min")
+        if not parts:
+            return f"{self.limits['rpm']:g} requests per minute" if self.limits.get("rpm") else "no limits"
+        return (", ".join(parts[:-1]) + " and " + parts[-1] if len(parts) > 1 else parts[0]) + " left"
@@ -0,0 +1,330 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from model_request_handler import ModelRequestHandler
+from http_session import get_session
+from openai_adapter import parse_completion
+from stream_decoder import StreamError
+from batch_budget import BatchBudget
+from token_calibration import get_calibration
+
+# (custom_id, payload) pairs submitted as one job
+BatchRequests = List[Tuple[str, Dict[str, Any]]]
+
+# Requests the queued fallback runs at the same time
+DEFAULT_QUEUED_WORKERS = 2
+
+# Seconds between status checks of a provider batch job
+DEFAULT_POLL_SECONDS = 30
+
+# "paused": a queued job stopped sending requests at a batch limit
+FINAL_STATES = ("completed", "failed", "cancelled", "paused")
+
+
+def batch_result(custom_id: str, text: str = "", error: str = "",
+                 usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    return {"custom_id": custom_id, "text": text, "error": error, "usage": usage}
+
+
+class BatchBackend(ABC):
+    """Runs a bulk job of chat requests and hands back their results.
+
+    `status()` returns {"state": "running" | "completed" | "failed" |
+    "cancelled" | "paused", "done": int, "total": int}, plus "reason" when
+    paused. `take_results()` returns the results that finished since the
+    last call, as `batch_result` dicts. Remote backends run the job at the
+    provider; it keeps running when the app is closed and can be picked up
+    again with `resume(job_id)` when the backend `supports_resume`.
+    """
+    remote = False
+    supports_resume = False
+    label = ""
+
+    @abstractmethod
+    def submit(self, batch: BatchRequests) -> str:
+        pass
+
+    @abstractmethod
+    def resume(self, job_id: str) -> None:
+        """Pick up a job submitted earlier instead of submitting one; only called when `supports_resume`."""
+        pass
+
+    @abstractmethod
+    def status(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def take_results(self) -> List[Dict[str, Any]]:
+        pass
+
+    def cancel(self) -> None:
+        pass
+
+
+class QueuedBatchBackend(BatchBackend):
+    """Runs the requests locally, a few at a time, for providers without a batch API.
+
+    Requests are sent without streaming and report the whole answer at once.
+    With a `budget`, requests wait for its rate limit, and the job pauses
+    (the remaining requests are not sent) when it refuses a request.
+    """
+    label = "queued requests"
+
+    def __init__(self, handler_factory: Callable[[], ModelRequestHandler], workers: int = DEFAULT_QUEUED_WORKERS,
+                 budget: Optional[BatchBudget] = None, model_id: str = ""):
+        self.handler_factory = handler_factory
+        self.workers = max(1, workers)
+        self.budget = budget
+        self.model_id = model_id
+        self._lock = threading.Lock()
+        self._results = []
+        self._done = 0
+        self._total = 0
+        self._cancelled = threading.Event()
+        self._executor = None
+        self._futures = []
+
+    def _reserve(self):
+        """Wait until the budget lets a request start; False when the job pauses or is cancelled."""
+        while not self._cancelled.is_set():
+            if self.budget.paused_reason:
+                return False
+            reason, wait = self.budget.try_start()
+            if reason:
+                return False
+            if not wait:
+                return True
+            time.sleep(min(wait, 1.0))
+        return False
+
+    def _run(self, custom_id, payload):
+        if self._cancelled.is_set() or (self.budget and not self._reserve()):
+            return
+        # One handler per request: handlers keep per-request state such as last_usage
+        handler = self.handler_factory()
+        try:
+            text = handler.complete(payload).strip()
+            result = batch_result(custom_id, text, usage=handler.last_usage)
+        except Exception as e:
+            result = batch_result(custom_id, error=str(e))
+        if self.budget:
+            usage = result["usage"]
+            if not usage and result["text"]:
+                calibration = get_calibration()
+                prompt = "\n".join(str(m.get("content") or "") for m in payload.get("messages", []))
+                usage = {"prompt_tokens": calibration.fast_count(prompt, self.model_id),
+                         "completion_tokens": calibration.fast_count(result["text"], self.model_id)}
+            if usage:
+                self.budget.finish_request(usage["prompt_tokens"], usage["completion_tokens"])
+            else:
+                self.budget.cancel_request()
+        with self._lock:
+            self._results.append(result)
+            self._done += 1
+
+    def submit(self, batch):
+        self._total = len(batch)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._futures = [self._executor.submit(self._run, custom_id, payload) for custom_id, payload in batch]
+        self._executor.shutdown(wait=False)
+        return "local"
+
+    def resume(self, job_id):
+        # The requests ran in the session that submitted them; nothing is left to pick up
+        raise RuntimeError(f"{self.label} jobs cannot be resumed")
+
+    def status(self):
+        reason = self.budget.paused_reason if self.budget else None
+        if self._cancelled.is_set():
+            state = "cancelled"
+        elif not all(future.done() for future in self._futures):
+            state = "running"
+        else:
+            state = "paused" if reason else "completed"
+        with self._lock:
+            return {"state": state, "done": self._done, "total": self._total, "reason": reason}
+
+    def take_results(self):
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """The OpenAI Batch API (/v1/files and /v1/batches) of an OpenAI-compatible provider.
+
+    Requests are uploaded as one JSONL file and run by the provider within its
+    completion window, usually at a lower price than interactive requests.
+    """
+    remote = True
+    supports_resume = True
+    label = "provider batch API"
+
+    def __init__(self, handler, completion_window: str = "24h"):
+        self.handler = handler
+        self.completion_window = completion_window
+        self.job_id = None
+        self._state = None
+        self._collected = False
+
+    def _url(self, path):
+        return f"{self.handler.base_url}/{path}"
+
+    def submit(self, batch):
+        lines = []
+        for custom_id, payload in batch:
+            lines.append(json.dumps({
+                "custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions",
+                "body": self.handler.request_body(payload, stream=False)
+            }, ensure_ascii=False))
+        headers = self.handler.headers()
+        headers.pop("Content-Type", None)  # multipart upload sets its own
+        response = get_session().post(
+            self._url("files"), headers=headers, data={"purpose": "batch"},
+            files={"file": ("sagatrans-batch.jsonl", "\n".join(lines).encode("utf-8"))}, timeout=(3.05, 600)
+        )
+        response.raise_for_status()
+        response = get_session().post(self._url("batches"), headers=self.handler.headers(), timeout=(3.05, 60), json={
+            "input_file_id": response.json()["id"], "endpoint": "/v1/chat/completions",
+            "completion_window": self.completion_window
+        })
+        response.raise_for_status()
+        self.job_id = response.json()["id"]
+        return self.job_id
+
+    def resume(self, job_id):
+        self.job_id = job_id
+        self._state = None
+        self._collected = False
+
+    def status(self):
+        response = get_session().get(self._url(f"batches/{self.job_id}"), headers=self.handler.headers(),
+                                     timeout=(3.05, 60))
+        response.raise_for_status()
+        self._state = response.json()
+        counts = self._state.get("request_counts") or {}
+        provider_state = self._state.get("status", "")
+        if provider_state == "completed":
+            state = "completed"
+        elif provider_state in ("failed", "expired"):
+            # An expired job still has results for the requests that finished in time
+            state = "completed" if self._state.get("output_file_id") else "failed"
+        elif provider_state in ("cancelling", "cancelled"):
+            state = "cancelled"
+        else:
+            state = "running"
+        return {"state": state, "done": counts.get("completed", 0) + counts.get("failed", 0),
+                "total": counts.get("total", 0)}
+
+    def take_results(self):
+        # Results only become available when the whole job is finished
+        if self._collected or not self._state or not (self._state.get("output_file_id") or self._state.get("error_file_id")):
+            return []
+        results = []
+        for key in ("output_file_id", "error_file_id"):
+            if self._state.get(key):
+                results.extend(self._read_results(self._state[key]))
+        self._collected = True
+        return results
+
+    def _read_results(self, file_id):
+        response = get_session().get(self._url(f"files/{file_id}/content"), headers=self.handler.headers(),
+                                     timeout=(3.05, 600))
+        response.raise_for_status()
+        results = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            custom_id = entry.get("custom_id", "")
+            body = (entry.get("response") or {}).get("body") or {}
+            if entry.get("error") and not body.get("error"):
+                body = {"error": entry["error"]}
+            try:
+                text, usage = parse_completion(body)
+            except StreamError as e:
+                results.append(batch_result(custom_id, error=str(e)))
+                continue
+            results.append(batch_result(custom_id, text.strip(), usage=usage))
+        return results
+
+    def cancel(self):
+        if self.job_id:
+            try:
+                get_session().post(self._url(f"batches/{self.job_id}/cancel"), headers=self.handler.headers(),
+                                   timeout=(3.05, 60))
+            except requests.exceptions.RequestException as e:
+                print(f"Warning: Could not cancel batch job {self.job_id}: {e}")
+
+
+class MockBatchBackend(BatchBackend):
+    """Answers every request locally after `delay` seconds, for trying out bulk mode without a provider.
+
+    The "translation" is the last user message, marked as a mock.
+    """
+    label = "mock batch"
+
+    def __init__(self, delay: float = 2.0):
+        self.delay = delay
+        self._batch = []
+        self._started = 0.0
+        self._collected = False
+
+    def submit(self, batch):
+        self._batch = list(batch)
+        self._started = time.monotonic()
+        return "mock"
+
+    def resume(self, job_id):
+        # The mock answers from the submitted payloads, which only this session has
+        raise RuntimeError(f"{self.label} jobs cannot be resumed")
+
+    def status(self):
+        finished = time.monotonic() - self._started >= self.delay
+        total = len(self._batch)
+        return {"state": "completed" if finished else "running", "done": total if finished else 0, "total": total}
+
+    def take_results(self):
+        if self._collected or self.status()["state"] != "completed":
+            return []
+        self._collected = True
+        results = []
+        for custom_id, payload in self._batch:
+            source = next((m["content"] for m in reversed(payload.get("messages", [])) if m.get("role") == "user"), "")
+            results.append(batch_result(custom_id, f"[mock translation]\n\n{source}",
+                                        usage={"prompt_tokens": 0, "completion_tokens": 0}))
+        return results
+
+
+def create_batch_backend(model_id: str, model_config: Dict[str, Any], workers: int = DEFAULT_QUEUED_WORKERS,
+                         budget: Optional[BatchBudget] = None) -> Optional[BatchBackend]:
+    """The bulk backend for a model: set `"batch_api"` on the provider in models.json.
+
+    `true` uses the provider's OpenAI-style batch API (providers of type
+    "openai"), `"mock"` the local mock; anything else runs queued requests.
+    Only queued requests are held to `budget`; a provider job runs as a whole.
+    """
+    batch_api = model_config.get("batch_api")
+    if batch_api == "mock":
+        return MockBatchBackend(float(model_config.get("batch_mock_delay", 2.0)))
+    handler = ModelRequestHandler.create_handler(model_id, model_config)
+    if not handler:
+        return None
+    if batch_api and hasattr(handler, "request_body"):
+        return OpenAIBatchBackend(handler, model_config.get("batch_completion_window", "24h"))
+    return QueuedBatchBackend(lambda: ModelRequestHandler.create_handler(model_id, model_config), workers,
+                              budget, model_id)
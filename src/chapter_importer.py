@@ -0,0 +1,288 @@
+import codecs
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hashing import text_hash
+from glossary_extractor import MIN_ITEMS_FOR_POOL
+
+TEXT_EXTENSIONS = (".txt", ".md")
+HTML_EXTENSIONS = (".html", ".htm", ".xhtml")
+EPUB_EXTENSIONS = (".epub",)
+
+# Lines longer than this are prose, not chapter headings
+MAX_HEADING_LENGTH = 80
+
+_NUMBER_WORDS = (
+    "one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen|"
+    "sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety|hundred"
+)
+_NUMBER = (
+    r"(?:\d+"
+    r"|(?=[ivxlcdm])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})"
+    r"|(?:" + _NUMBER_WORDS + r")(?:-(?:one|two|three|four|five|six|seven|eight|nine))?"
+    r")\b"
+)
+
+# A heading keyword, a number and an optional title, either after a separator
+# ("Chapter 12: The Gate") or bare ("Chapter XII The Gate")
+_HEADING_RE = re.compile(
+    r"^(?:"
+    r"(?:(?:(?:chapter|episode|part|book|volume)\b|chap\.|ch\.|vol\.)\s+" + _NUMBER +
+    r"|(?:prologue|epilogue|interlude|afterword|side story)\b(?:\s+" + _NUMBER + r")?)"
+    r"(?:[:.\-\u2013\u2014]?|\s*[:.\-\u2013\u2014]\s*(?P<title>.+)|\s+(?P<bare>.+))"
+    r"|第\s*[0-9０-９〇零一二三四五六七八九十百千万两]+\s*[章回节話话卷幕].*"
+    r"|제\s*\d+\s*[장화].*"
+    r")$",
+    re.IGNORECASE
+)
+
+
+def is_chapter_heading(line: str) -> bool:
+    """Whether a stripped line is a chapter heading rather than prose that starts like one.
+
+    "Chapter 3: Home, at Last" is a heading; "Part one of the plan failed." and
+    "Book in hand, she left." are not. A title after a separator may not end
+    like a sentence, a bare one may hold no punctuation and starts upper case.
+    """
+    if not line or len(line) > MAX_HEADING_LENGTH:
+        return False
+    match = _HEADING_RE.match(line)
+    if not match:
+        return False
+    title = match.group("title")
+    if title and title.rstrip()[-1] in ".,;":
+        return False
+    bare = match.group("bare")
+    if bare and (re.search(r"[.,;:!?]", bare) or bare[0].islower()):
+        return False
+    return True
+
+
+# Encodings tried in order on the start of a text file; cp1252 decodes anything
+_TEXT_ENCODINGS = ("utf-8-sig", "gb18030", "cp1252")
+_ENCODING_SAMPLE_BYTES = 1 << 20
+
+_BLOCK_TAGS = {"p", "div", "section", "article", "blockquote", "li", "tr", "pre",
+               "h1", "h2", "h3", "h4", "h5", "h6"}
+_HEADING_TAGS = {"h1", "h2", "h3"}
+_SKIPPED_TAGS = {"script", "style", "head", "nav"}
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Plain text of an (X)HTML chapter: one paragraph per block element, plus its first heading."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self.heading = ""
+        self.title = ""
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._heading_parts: Optional[List[str]] = None
+
+    def _flush(self):
+        text = "".join(self._current)
+        lines = [" ".join(line.split()) for line in text.split("\n")]
+        text = "\n".join(line for line in lines if line)
+        if text:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "br":
+            self._current.append("\n")
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag in _HEADING_TAGS and not self.heading:
+                self._heading_parts = []
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag in _HEADING_TAGS and self._heading_parts is not None:
+                self.heading = " ".join("".join(self._heading_parts).split())
+                self._heading_parts = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+            if self._heading_parts is not None:
+                self._heading_parts.append(data)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n\n".join(self.paragraphs)
+
+
+def html_to_text(markup: str) -> Tuple[str, str]:
+    """(heading or title, plain text) of an HTML document."""
+    parser = _HTMLTextExtractor()
+    parser.feed(markup)
+    parser.close()
+    text = parser.text()
+    return parser.heading or " ".join(parser.title.split()), text
+
+
+def _natural_key(path: str):
+    """Sort 'chapter2.html' before 'chapter10.html'."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", path)]
+
+
+def _detect_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        sample = f.read(_ENCODING_SAMPLE_BYTES)
+    for encoding in _TEXT_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            # Not final: the sample may end inside a multi-byte character
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return _TEXT_ENCODINGS[-1]
+
+
+def split_text_chapters(lines: Iterable[str], fallback_name: str) -> List[Tuple[str, str]]:
+    """Split plain text into (heading, text) chapters at chapter-heading lines.
+
+    Text before the first heading becomes a chapter named `fallback_name` when
+    it is not blank; without any headings the whole text is one chapter.
+    """
+    chapters: List[Tuple[str, str]] = []
+    name = fallback_name
+    current: List[str] = []
+
+    def flush():
+        text = "".join(current).strip()
+        if text:
+            chapters.append((name, text))
+
+    for line in lines:
+        stripped = line.strip()
+        if is_chapter_heading(stripped):
+            flush()
+            name = stripped
+            current = [line]
+        else:
+            current.append(line)
+    flush()
+    return chapters
+
+
+def parse_task(task: Tuple[str, str, Any]) -> List[Tuple[str, str]]:
+    """Chapters of one import task: ("text", name, path) or ("html", name, markup or path).
+
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    kind, name, data = task
+    if kind == "text":
+        with open(data, "r", encoding=_detect_encoding(data), errors="replace") as f:
+            # Read line by line; multi-megabyte novels are never held twice in memory
+            return split_text_chapters(f, name)
+
+    if kind == "html" and os.path.isfile(data):
+        with open(data, "rb") as f:
+            data = f.read().decode("utf-8", errors="replace")
+    heading, text = html_to_text(data)
+    return [(heading or name, text)] if text.strip() else []
+
+
+def _epub_tasks(path: str) -> List[Tuple[str, str, str]]:
+    """One html task per document of the EPUB, in reading (spine) order."""
+    import ebooklib
+    from ebooklib import epub
+
+    book = epub.read_epub(path)
+    tasks = []
+    for entry in book.spine:
+        item = book.get_item_with_id(entry[0] if isinstance(entry, tuple) else entry)
+        if item is None or item.get_type() != ebooklib.ITEM_DOCUMENT or isinstance(item, epub.EpubNav):
+            continue
+        name = os.path.splitext(os.path.basename(item.get_name()))[0]
+        tasks.append(("html", name, item.get_content().decode("utf-8", errors="replace")))
+    return tasks
+
+
+def expand_sources(paths: Iterable[str]) -> List[Tuple[str, str, Any]]:
+    """Import tasks for files and folders; folders contribute their text and HTML files in natural order."""
+    tasks = []
+    for path in paths:
+        if os.path.isdir(path):
+            children = sorted((os.path.join(path, child) for child in os.listdir(path)), key=_natural_key)
+            tasks.extend(expand_sources(child for child in children
+                                        if child.lower().endswith(TEXT_EXTENSIONS + HTML_EXTENSIONS)))
+            continue
+        name, extension = os.path.splitext(os.path.basename(path))
+        extension = extension.lower()
+        if extension in EPUB_EXTENSIONS:
+            tasks.extend(_epub_tasks(path))
+        elif extension in HTML_EXTENSIONS:
+            tasks.append(("html", name, path))
+        elif extension in TEXT_EXTENSIONS:
+            tasks.append(("text", name, path))
+        else:
+            raise ValueError(f"Unsupported file type: {os.path.basename(path)}")
+    return tasks
+
+
+def parse_tasks(tasks: List[Tuple[str, str, Any]], workers: Optional[int] = None) -> List[List[Tuple[str, str]]]:
+    """Run `parse_task` over all tasks, in parallel across cores for large imports; keeps task order."""
+    if len(tasks) < MIN_ITEMS_FOR_POOL or workers == 1:
+        return [parse_task(task) for task in tasks]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(parse_task, tasks, chunksize=chunksize))
+    except (OSError, RuntimeError) as e:
+        print(f"Warning: Parallel import failed, parsing in-process: {e}")
+        return [parse_task(task) for task in tasks]
+
+
+def content_hash(text: str) -> str:
+    """Hash of a chapter's text that ignores whitespace differences, for duplicate detection."""
+    return text_hash(" ".join(text.split()))
+
+
+def build_items(chapters: Iterable[Tuple[str, str]], existing_names: Iterable[str],
+                existing_hashes: Iterable[str]) -> Dict[str, Any]:
+    """Project items for new chapters; chapters already in the project or repeated in the import are skipped.
+
+    Returns {"items": [...], "duplicates": int}. Item names are made unique
+    against the project and each other.
+    """
+    names = set(existing_names)
+    seen = set(existing_hashes)
+    items = []
+    duplicates = 0
+    for name, text in chapters:
+        digest = content_hash(text)
+        if digest in seen:
+            duplicates += 1
+            continue
+        seen.add(digest)
+
+        base_name = name.strip() or f"Chapter {len(names) + 1}"
+        unique_name = base_name
+        suffix = 2
+        while unique_name in names:
+            unique_name = f"{base_name} ({suffix})"
+            suffix += 1
+        names.add(unique_name)
+        items.append({"name": unique_name, "source_text": text, "translated_text": ""})
+    return {"items": items, "duplicates": duplicates}
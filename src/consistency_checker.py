@@ -0,0 +1,133 @@
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from glossary import GlossaryMatcher
+from glossary_extractor import extract_candidates, MIN_ITEMS_FOR_POOL
+
+# Issue kinds
+MISSING_GLOSSARY_TERM = "glossary"
+INCONSISTENT_NAME = "name"
+
+# Glossary translations longer than this may be inflected: only their stem must appear
+MIN_STEM_LENGTH = 5
+INFLECTION_SLACK = 2
+
+# A name is expected to be kept verbatim when most of the items containing it keep it
+NAME_MAJORITY = 0.75
+MIN_NAME_ITEMS = 3
+
+_worker_matcher: Optional[GlossaryMatcher] = None
+_worker_entries: List[Tuple[str, str]] = []
+
+
+def _init_worker(entries: List[Tuple[str, str]]) -> None:
+    """Build the glossary automaton once per worker process instead of once per item."""
+    global _worker_matcher, _worker_entries
+    _worker_entries = entries
+    _worker_matcher = GlossaryMatcher([source for source, _ in entries]) if entries else None
+
+
+def _target_pattern(target: str) -> "re.Pattern":
+    target = target.strip()
+    if len(target) >= MIN_STEM_LENGTH and target[-1].isalpha():
+        # Accept inflected forms: "Zorwat" also matches "Zorwata", "Zorwatem"
+        stem = re.escape(target[:-INFLECTION_SLACK])
+        return re.compile(r"(?<!\w)" + stem + r"\w{0,4}", re.IGNORECASE)
+    return re.compile(r"(?<!\w)" + re.escape(target) + r"(?!\w)", re.IGNORECASE)
+
+
+def check_item(task: Tuple[int, str, str]) -> Dict[str, Any]:
+    """Findings for one item: glossary terms whose translation is missing and names used in the source.
+
+    Runs in worker processes; uses the glossary set up by `_init_worker`.
+    """
+    index, source_text, translated_text = task
+    missing = []
+    if _worker_matcher is not None:
+        for term_index in _worker_matcher.find(source_text):
+            source, target = _worker_entries[term_index]
+            if not _target_pattern(target).search(translated_text):
+                missing.append((source, target))
+
+    names = {}
+    lowered_translation = translated_text.lower()
+    for name in extract_candidates(source_text):
+        # Only Latin-script style names can be kept verbatim in a translation
+        if " " in name or not name[:1].isupper():
+            continue
+        names[name] = name.lower() in lowered_translation
+    return {"index": index, "missing": missing, "names": names}
+
+
+def check_project(items: List[Dict[str, Any]], glossary: List[Dict[str, Any]],
+                  workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Check every translated item against the glossary and against each other.
+
+    Returns a list of issues, each a dict with item_index, item_name, kind,
+    term, expected and detail, ordered by item.
+    """
+    entries = [(entry.get("source", "").strip(), entry.get("target", "").strip()) for entry in glossary
+               if entry.get("source", "").strip() and entry.get("target", "").strip()]
+    tasks = [(i, item.get("source_text", ""), item.get("translated_text", ""))
+             for i, item in enumerate(items)
+             if item.get("source_text", "").strip() and item.get("translated_text", "").strip()]
+
+    if len(tasks) < MIN_ITEMS_FOR_POOL or workers == 1:
+        _init_worker(entries)
+        findings = [check_item(task) for task in tasks]
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(entries,)) as pool:
+                findings = list(pool.map(check_item, tasks, chunksize=chunksize))
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: Parallel consistency check failed, checking in-process: {e}")
+            _init_worker(entries)
+            findings = [check_item(task) for task in tasks]
+
+    issues = []
+    for finding in findings:
+        for source, target in finding["missing"]:
+            issues.append(_issue(items, finding["index"], MISSING_GLOSSARY_TERM, source, target,
+                                 f"'{source}' is in the source but '{target}' is not in the translation"))
+
+    issues.extend(_name_issues(items, findings, {source.lower() for source, _ in entries}))
+    issues.sort(key=lambda issue: (issue["item_index"], issue["kind"], issue["term"]))
+    return issues
+
+
+def _name_issues(items, findings, glossary_terms) -> List[Dict[str, Any]]:
+    """Names kept verbatim in most items but rendered differently in a few."""
+    kept = defaultdict(list)
+    changed = defaultdict(list)
+    for finding in findings:
+        for name, is_kept in finding["names"].items():
+            if name.lower() in glossary_terms:
+                continue  # Checked against its glossary translation instead
+            (kept if is_kept else changed)[name].append(finding["index"])
+
+    issues = []
+    for name, changed_indices in changed.items():
+        kept_count = len(kept.get(name, ()))
+        total = kept_count + len(changed_indices)
+        if total < MIN_NAME_ITEMS or kept_count / total < NAME_MAJORITY:
+            continue
+        for index in changed_indices:
+            issues.append(_issue(items, index, INCONSISTENT_NAME, name, name,
+                                 f"'{name}' is kept as is in {kept_count} of {total} items but not here"))
+    return issues
+
+
+def _issue(items, index, kind, term, expected, detail) -> Dict[str, Any]:
+    return {
+        "item_index": index,
+        "item_name": items[index].get("name", f"Item {index + 1}"),
+        "kind": kind,
+        "term": term,
+        "expected": expected,
+        "detail": detail
+    }
@@ -0,0 +1,337 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from hashing import item_source_hash
+from context_index import split_segments
+
+DEFAULT_PRE_SYSTEM_PROMPT = "You are a translation assistant. Translate the final user message into **{target_language}**."
+DEFAULT_POST_SYSTEM_PROMPT = "IMPORTANT: Respond with *only* the translation of the final user message into **{target_language}**, nothing else."
+DEFAULT_USER_PROMPT = "{source_text}"
+
+CONTEXT_INTRO = "\nUse the following context from other items in the project to inform your translation:"
+
+CONTEXT_ITEM_TEMPLATE = (
+    "\n==================== CONTEXT ITEM START: {item_name} ====================\n"
+    "Source Text ({item_name}):\n{source_text}\n"
+    "{translation_section}"
+    "==================== CONTEXT ITEM END: {item_name} ======================\n"
+)
+
+SUMMARY_ITEM_TEMPLATE = (
+    "\n-------------------- SUMMARY OF ITEM: {item_name} --------------------\n"
+    "{summary}\n"
+)
+
+EXCERPT_ITEM_TEMPLATE = (
+    "\n-------------------- RELEVANT PASSAGES FROM: {item_name} --------------------\n"
+    "{passages}"
+)
+
+DEFAULT_SUMMARY_PROMPT = (
+    "Summarize the following text in at most {max_words} words, written in {target_language}. "
+    "Focus on the characters, places, events, relationships and terminology a translator needs "
+    "to translate later chapters consistently. Keep proper names in their original form followed "
+    "by their {target_language} rendering in parentheses. Respond with only the summary."
+)
+
+# Upper bound for cached fragments; the cache is dropped when it grows past it
+MAX_CACHED_FRAGMENTS = 8192
+
+
+def resolve_prompt_templates(prompt_config: Dict[str, str], config_defaults: Dict[str, str]) -> Dict[str, str]:
+    """Resolve prompt templates: project settings first, then config.json defaults, then built-ins."""
+    return {
+        "pre_system_prompt": prompt_config.get("pre_system_prompt",
+            config_defaults.get("pre_system_prompt", DEFAULT_PRE_SYSTEM_PROMPT)),
+        "post_system_prompt": prompt_config.get("post_system_prompt",
+            config_defaults.get("post_system_prompt", DEFAULT_POST_SYSTEM_PROMPT)),
+        "user_prompt": prompt_config.get("user_prompt",
+            config_defaults.get("user_prompt", DEFAULT_USER_PROMPT)),
+        "context_item_template": prompt_config.get("context_item_template") or
+            config_defaults.get("context_item_template") or CONTEXT_ITEM_TEMPLATE,
+    }
+
+
+def get_fresh_summary(item: Dict[str, Any]) -> str:
+    """The item's stored summary, or '' when there is none or the source changed since."""
+    summary = item.get("summary")
+    if not isinstance(summary, dict) or not summary.get("text"):
+        return ""
+    if summary.get("source_hash") != item_source_hash(item):
+        return ""
+    return summary["text"].strip()
+
+
+def render_summary_item(item: Dict[str, Any], index: int, template: str = SUMMARY_ITEM_TEMPLATE) -> str:
+    """Render the item's summary as a context block, or '' without a fresh summary."""
+    summary = get_fresh_summary(item)
+    if not summary:
+        return ""
+    return template.format(item_name=item.get("name", f"Item {index + 1}"), summary=summary)
+
+
+def render_excerpt_item(item: Dict[str, Any], index: int, segment_numbers: Iterable[int], target_language: str,
+                        template: str = EXCERPT_ITEM_TEMPLATE) -> str:
+    """Render selected paragraphs of an item, each with its translation when paragraphs line up."""
+    source_segments = split_segments(item.get("source_text", ""))
+    translated_segments = split_segments(item.get("translated_text", ""))
+    aligned = len(translated_segments) == len(source_segments)
+
+    passages = []
+    for seg_no in segment_numbers:
+        if not 0 <= seg_no < len(source_segments):
+            continue
+        passage = f"Source: {source_segments[seg_no]}\n"
+        if aligned:
+            passage += f"Translation ({target_language}): {translated_segments[seg_no]}\n"
+        passages.append(passage)
+    if not passages:
+        return ""
+    return template.format(item_name=item.get("name", f"Item {index + 1}"), passages="...\n".join(passages))
+
+
+def render_context_item(item: Dict[str, Any], index: int, target_language: str,
+                        template: str = CONTEXT_ITEM_TEMPLATE) -> str:
+    """Render one project item as a context block. Items without source text render as ''."""
+    item_name = item.get("name", f"Item {index + 1}")
+    item_source = item.get("source_text", "").strip()
+    if not item_source:
+        return ""
+
+    item_translation = item.get("translated_text", "").strip()
+    if item_translation:
+        translation_section = f"\nExisting Translation ({target_language}) for '{item_name}':\n{item_translation}\n"
+    else:
+        translation_section = f"\n(No existing translation for '{item_name}')\n"
+
+    return template.format(
+        item_name=item_name,
+        source_text=item_source,
+        translation_section=translation_section
+    )
+
+
+class _Fragment:
+    __slots__ = ("version", "text", "tokens", "tokens_key")
+
+    def __init__(self, version, text):
+        self.version = version
+        self.text = text
+        self.tokens = None  # Counted lazily, only when a budget needs it
+        self.tokens_key = None  # Tokenizer the count was made with
+
+
+class ContextFragmentCache:
+    """Rendered context fragments and their token counts, one slot per item and kind.
+
+    A slot is keyed by the item object and the fragment kind ("full",
+    "summary" or "excerpt") and remembers the content version it was rendered from: the
+    item's name and text plus the template and target language. A slot is
+    re-rendered exactly when one of those changes; untouched neighbors are
+    served from the cache.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_FRAGMENTS):
+        self.max_entries = max_entries
+        self._slots: Dict[tuple, _Fragment] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self._slots.clear()
+
+    def prune(self, items: List[Dict[str, Any]]) -> None:
+        """Drop slots of items that are no longer part of the project."""
+        live = {id(item) for item in items}
+        for key in [key for key in self._slots if key[0] not in live]:
+            del self._slots[key]
+
+    def _slot(self, item: Dict[str, Any], kind: str, version: tuple, render: Callable[[], str]) -> _Fragment:
+        slot_key = (id(item), kind)
+        slot = self._slots.get(slot_key)
+        if slot is not None and slot.version == version:
+            self.hits += 1
+            return slot
+
+        self.misses += 1
+        if slot is None and len(self._slots) >= self.max_entries:
+            self._slots.clear()
+        slot = _Fragment(version, render())
+        self._slots[slot_key] = slot
+        return slot
+
+    def _full_slot(self, item: Dict[str, Any], index: int, target_language: str, template: str) -> _Fragment:
+        # The version tuple holds the item's own string objects, so hashing and
+        # equality checks stay O(1) until the item is edited (str caches its hash).
+        version = (
+            item.get("name", f"Item {index + 1}"),
+            item.get("source_text", ""),
+            item.get("translated_text", ""),
+            target_language,
+            template
+        )
+        return self._slot(item, "full", version,
+                          lambda: render_context_item(item, index, target_language, template))
+
+    def _summary_slot(self, item: Dict[str, Any], index: int, template: str) -> _Fragment:
+        summary = item.get("summary") if isinstance(item.get("summary"), dict) else {}
+        version = (
+            item.get("name", f"Item {index + 1}"),
+            item.get("source_text", ""),
+            summary.get("text", ""),
+            summary.get("source_hash", ""),
+            template
+        )
+        return self._slot(item, "summary", version, lambda: render_summary_item(item, index, template))
+
+    def _excerpt_slot(self, item: Dict[str, Any], index: int, segment_numbers: tuple,
+                      target_language: str, template: str) -> _Fragment:
+        version = (
+            item.get("name", f"Item {index + 1}"),
+            item.get("source_text", ""),
+            item.get("translated_text", ""),
+            segment_numbers,
+            target_language,
+            template
+        )
+        return self._slot(item, "excerpt", version,
+                          lambda: render_excerpt_item(item, index, segment_numbers, target_language, template))
+
+    @staticmethod
+    def _tokens(slot: _Fragment, count_tokens: Callable[[str], int], tokens_key: Optional[str]) -> int:
+        # A count made with another tokenizer (the project model changed, or its
+        # learned ratio drifted) is stale even though the text is not
+        if slot.tokens is None or slot.tokens_key != tokens_key:
+            slot.tokens = count_tokens(slot.text) if slot.text else 0
+            slot.tokens_key = tokens_key
+        return slot.tokens
+
+    def get(self, item: Dict[str, Any], index: int, target_language: str,
+            template: str = CONTEXT_ITEM_TEMPLATE) -> str:
+        return self._full_slot(item, index, target_language, template).text
+
+    def get_tokens(self, item: Dict[str, Any], index: int, target_language: str,
+                   count_tokens: Callable[[str], int], template: str = CONTEXT_ITEM_TEMPLATE,
+                   tokens_key: Optional[str] = None) -> int:
+        """Token count of the rendered fragment, counted once per content version and `tokens_key`.
+
+        `tokens_key` names the tokenizer behind `count_tokens`.
+        """
+        return self._tokens(self._full_slot(item, index, target_language, template), count_tokens, tokens_key)
+
+    def get_summary(self, item: Dict[str, Any], index: int, template: str = SUMMARY_ITEM_TEMPLATE) -> str:
+        return self._summary_slot(item, index, template).text
+
+    def get_summary_tokens(self, item: Dict[str, Any], index: int, count_tokens: Callable[[str], int],
+                           template: str = SUMMARY_ITEM_TEMPLATE, tokens_key: Optional[str] = None) -> int:
+        return self._tokens(self._summary_slot(item, index, template), count_tokens, tokens_key)
+
+    def get_excerpt(self, item: Dict[str, Any], index: int, segment_numbers: tuple, target_language: str,
+                    template: str = EXCERPT_ITEM_TEMPLATE) -> str:
+        return self._excerpt_slot(item, index, tuple(segment_numbers), target_language, template).text
+
+    def get_excerpt_tokens(self, item: Dict[str, Any], index: int, segment_numbers: tuple, target_language: str,
+                           count_tokens: Callable[[str], int], template: str = EXCERPT_ITEM_TEMPLATE,
+                           tokens_key: Optional[str] = None) -> int:
+        return self._tokens(self._excerpt_slot(item, index, tuple(segment_numbers), target_language, template),
+                            count_tokens, tokens_key)
+
+
+class ContextAssembler:
+    """Builds the context block and the API payload for a translation request.
+
+    Context fragments come from a ContextFragmentCache, so consecutive
+    requests in a batch only render the neighbors that actually changed.
+    """
+
+    def __init__(self, fragment_cache: Optional[ContextFragmentCache] = None):
+        self.fragments = fragment_cache or ContextFragmentCache()
+
+    def clear(self) -> None:
+        self.fragments.clear()
+
+    def render_fragment(self, item: Dict[str, Any], index: int, target_language: str,
+                        template: str = CONTEXT_ITEM_TEMPLATE) -> str:
+        return self.fragments.get(item, index, target_language, template)
+
+    def fragment_tokens(self, item: Dict[str, Any], index: int, target_language: str,
+                        count_tokens: Callable[[str], int], template: str = CONTEXT_ITEM_TEMPLATE,
+                        tokens_key: Optional[str] = None) -> int:
+        return self.fragments.get_tokens(item, index, target_language, count_tokens, template, tokens_key)
+
+    def summary_tokens(self, item: Dict[str, Any], index: int, count_tokens: Callable[[str], int],
+                       tokens_key: Optional[str] = None) -> int:
+        return self.fragments.get_summary_tokens(item, index, count_tokens, tokens_key=tokens_key)
+
+    def excerpt_tokens(self, item: Dict[str, Any], index: int, segment_numbers: tuple, target_language: str,
+                       count_tokens: Callable[[str], int], tokens_key: Optional[str] = None) -> int:
+        return self.fragments.get_excerpt_tokens(item, index, segment_numbers, target_language, count_tokens,
+                                                 tokens_key=tokens_key)
+
+    def build_context_block(self, items: List[Dict[str, Any]], indices: Iterable[int], target_language: str,
+                            template: str = CONTEXT_ITEM_TEMPLATE, summary_indices: Iterable[int] = (),
+                            excerpts: Optional[Dict[int, tuple]] = None) -> str:
+        """Join the rendered fragments of `indices` (in project order) into one string.
+
+        Items in `summary_indices` are represented by their stored summary,
+        items in `excerpts` by the listed paragraphs only.
+        """
+        summary_indices = set(summary_indices)
+        excerpts = excerpts or {}
+        fragments = []
+        for i in sorted(indices):
+            if not 0 <= i < len(items):
+                print(f"Warning: Index {i} out of range during context building.")
+                continue
+            if i in summary_indices:
+                fragment = self.fragments.get_summary(items[i], i)
+            elif i in excerpts:
+                fragment = self.fragments.get_excerpt(items[i], i, excerpts[i], target_language)
+            else:
+                fragment = self.render_fragment(items[i], i, target_language, template)
+            if fragment:
+                fragments.append(fragment)
+        return "".join(fragments)
+
+    @staticmethod
+    def build_system_prompt(templates: Dict[str, str], target_language: str, context_block: str,
+                            glossary_block: str = "") -> str:
+        pre_system_prompt = templates["pre_system_prompt"].format(target_language=target_language)
+        post_system_prompt = templates["post_system_prompt"].format(target_language=target_language)
+
+        system_prompt_parts = [pre_system_prompt]
+        if glossary_block:
+            system_prompt_parts.append(glossary_block)
+        if context_block:
+            system_prompt_parts.append(CONTEXT_INTRO)
+            system_prompt_parts.append(context_block)
+        system_prompt_parts.append("\n" + post_system_prompt)
+        return "\n".join(system_prompt_parts)
+
+    @staticmethod
+    def build_user_prompt(templates: Dict[str, str], source_text: str, target_language: str) -> str:
+        user_prompt_template = templates["user_prompt"]
+        if '{target_language}' in user_prompt_template:
+            return user_prompt_template.format(source_text=source_text, target_language=target_language)
+        return user_prompt_template.format(source_text=source_text)
+
+    def build_payload(self, model_name: str, target_language: str, source_text: str,
+                      templates: Dict[str, str], items: List[Dict[str, Any]],
+                      context_indices: Iterable[int], current_index: Optional[int] = None,
+                      summary_indices: Iterable[int] = (),
+                      excerpts: Optional[Dict[int, tuple]] = None, glossary_block: str = "") -> Dict[str, Any]:
+        """Build the chat payload for `source_text` with the given context items and glossary."""
+        indices = [idx for idx in context_indices if idx != current_index]
+        context_block = self.build_context_block(items, indices, target_language,
+                                                 templates.get("context_item_template", CONTEXT_ITEM_TEMPLATE),
+                                                 summary_indices=summary_indices, excerpts=excerpts)
+
+        return {
+            "model": model_name,
+            "messages": [
+                {"role": "system", "content": self.build_system_prompt(templates, target_language, context_block,
+                                                                       glossary_block)},
+                {"role": "user", "content": self.build_user_prompt(templates, source_text, target_language)}
+            ],
+            "stream": True,
+            "Target_Language": target_language
+        }
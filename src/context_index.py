@@ -0,0 +1,287 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hashing import text_hash
+
+# BM25 parameters (Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Only the most distinctive terms of the current item are used as the query:
+# rare names, places and terms, not the function words every chapter shares
+MAX_QUERY_TERMS = 64
+
+# Passages sent per item in relevant mode, and the weight of embedding similarity
+DEFAULT_EXCERPT_SEGMENTS = 3
+DENSE_WEIGHT = 0.5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_CJK_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯]")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased index terms. CJK runs have no word breaks and are indexed as character bigrams."""
+    terms = []
+    for word in _WORD_RE.findall(text.lower()):
+        if _CJK_RE.search(word):
+            terms.extend(word[i:i + 2] for i in range(max(1, len(word) - 1)))
+        elif len(word) > 1 and not word.isdigit():
+            terms.append(word)
+    return terms
+
+
+def split_segments(text: str) -> List[str]:
+    """Split text into paragraphs, the unit the index searches and excerpts."""
+    return [segment.strip() for segment in _PARAGRAPH_RE.split(text or "") if segment.strip()]
+
+
+class _IndexedItem:
+    __slots__ = ("source", "segments", "hashes", "lengths", "terms")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments = split_segments(source)
+        self.hashes = [text_hash(segment) for segment in self.segments]
+        self.terms = [Counter(tokenize(segment)) for segment in self.segments]
+        self.lengths = [sum(counts.values()) for counts in self.terms]
+
+
+class ContextIndex:
+    """BM25 index over the paragraphs of every project item, with optional embeddings.
+
+    `sync(items)` brings the index up to date incrementally: only items whose
+    source text changed since the last sync are re-tokenized, and their old
+    postings are removed first. Items are keyed by object identity like the
+    fragment cache, so reordering items costs nothing.
+
+    Embedding vectors are optional. They are stored by segment hash, filled in
+    from outside (see ui/embedding_thread.py) and blended into the score when both
+    the query item and a candidate segment have one.
+    """
+
+    def __init__(self):
+        self._items: Dict[int, _IndexedItem] = {}
+        self._postings: Dict[str, Dict[Tuple[int, int], int]] = {}
+        self._segment_count = 0
+        self._total_length = 0
+        self.generation = 0  # Bumped on every change; invalidates cached searches
+        self.vectors: Dict[str, List[float]] = {}
+        self.vector_model = ""
+        self._norms: Dict[str, float] = {}
+        self._search_cache: Dict[tuple, Dict[int, List[Tuple[int, float]]]] = {}
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._postings.clear()
+        self._segment_count = 0
+        self._total_length = 0
+        self.vectors = {}
+        self.vector_model = ""
+        self._norms.clear()
+        self._search_cache.clear()
+        self.generation += 1
+
+    # --- Incremental maintenance ---
+    def sync(self, items: List[Dict[str, Any]]) -> None:
+        live = set()
+        for item in items:
+            key = id(item)
+            live.add(key)
+            source = item.get("source_text", "")
+            entry = self._items.get(key)
+            # `==` on the same string object is an identity check, so untouched items cost O(1)
+            if entry is not None and entry.source == source:
+                continue
+            if entry is not None:
+                self._remove(key, entry)
+            self._add(key, _IndexedItem(source))
+
+        for key in [key for key in self._items if key not in live]:
+            self._remove(key, self._items[key])
+
+    def _add(self, key: int, entry: _IndexedItem) -> None:
+        self._items[key] = entry
+        for seg_no, counts in enumerate(entry.terms):
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[(key, seg_no)] = tf
+        self._segment_count += len(entry.segments)
+        self._total_length += sum(entry.lengths)
+        self.generation += 1
+        self._search_cache.clear()
+
+    def _remove(self, key: int, entry: _IndexedItem) -> None:
+        for seg_no, counts in enumerate(entry.terms):
+            for term in counts:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop((key, seg_no), None)
+                if not postings:
+                    del self._postings[term]
+        self._segment_count -= len(entry.segments)
+        self._total_length -= sum(entry.lengths)
+        del self._items[key]
+        self.generation += 1
+        self._search_cache.clear()
+
+    def segments(self, item: Dict[str, Any]) -> List[str]:
+        entry = self._items.get(id(item))
+        return entry.segments if entry is not None else split_segments(item.get("source_text", ""))
+
+    # --- Search ---
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (self._segment_count - df + 0.5) / (df + 0.5))
+
+    def _query_terms(self, entry: _IndexedItem) -> List[Tuple[str, float]]:
+        counts = Counter()
+        for segment_counts in entry.terms:
+            counts.update(segment_counts)
+        weighted = [(term, self._idf(term) * (1 + math.log(tf))) for term, tf in counts.items()]
+        weighted.sort(key=lambda pair: pair[1], reverse=True)
+        return weighted[:MAX_QUERY_TERMS]
+
+    def search(self, items: List[Dict[str, Any]], query_index: int,
+               candidates: Iterable[int]) -> Dict[int, List[Tuple[int, float]]]:
+        """Score the segments of `candidates` against the item at `query_index`.
+
+        Returns {item index: [(segment number, score), ...]} with segments
+        sorted best first; candidates without any matching segment are left out.
+        """
+        self.sync(items)
+        candidates = [i for i in candidates if 0 <= i < len(items) and i != query_index]
+        query_entry = self._items.get(id(items[query_index])) if 0 <= query_index < len(items) else None
+        if query_entry is None or not candidates:
+            return {}
+
+        cache_key = (id(items[query_index]), self.generation, len(self.vectors), tuple(candidates))
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        key_to_index = {id(items[i]): i for i in candidates}
+        avg_length = self._total_length / self._segment_count if self._segment_count else 0.0
+        sparse: Dict[Tuple[int, int], float] = {}
+        for term, query_weight in self._query_terms(query_entry):
+            idf = self._idf(term)
+            for (key, seg_no), tf in self._postings.get(term, {}).items():
+                if key not in key_to_index:
+                    continue
+                length = self._items[key].lengths[seg_no]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+                score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                sparse[(key, seg_no)] = sparse.get((key, seg_no), 0.0) + score * query_weight
+
+        scores = self._blend_dense(sparse, query_entry, key_to_index)
+
+        results: Dict[int, List[Tuple[int, float]]] = {}
+        for (key, seg_no), score in scores.items():
+            if score > 0:
+                results.setdefault(key_to_index[key], []).append((seg_no, score))
+        for segments in results.values():
+            segments.sort(key=lambda pair: pair[1], reverse=True)
+
+        if len(self._search_cache) > 64:
+            self._search_cache.clear()
+        self._search_cache[cache_key] = results
+        return results
+
+    def _blend_dense(self, sparse: Dict[Tuple[int, int], float], query_entry: _IndexedItem,
+                     key_to_index: Dict[int, int]) -> Dict[Tuple[int, int], float]:
+        query_vector = self._mean_vector(query_entry.hashes)
+        top = max(sparse.values()) if sparse else 0.0
+        if query_vector is None:
+            return sparse
+
+        query_norm = math.sqrt(sum(v * v for v in query_vector)) or 1.0
+        scores = {}
+        for key in key_to_index:
+            entry = self._items.get(key)
+            if entry is None:
+                continue
+            for seg_no, segment_hash in enumerate(entry.hashes):
+                vector = self.vectors.get(segment_hash)
+                lexical = sparse.get((key, seg_no), 0.0) / top if top else 0.0
+                if vector is None:
+                    scores[(key, seg_no)] = (1 - DENSE_WEIGHT) * lexical
+                    continue
+                cosine = sum(a * b for a, b in zip(query_vector, vector)) / (query_norm * self._norm(segment_hash))
+                scores[(key, seg_no)] = (1 - DENSE_WEIGHT) * lexical + DENSE_WEIGHT * max(0.0, cosine)
+        return scores
+
+    def best_segments(self, ranked: List[Tuple[int, float]], limit: int = DEFAULT_EXCERPT_SEGMENTS) -> Tuple[int, ...]:
+        """The `limit` best segment numbers of one item, in reading order."""
+        return tuple(sorted(seg_no for seg_no, _ in ranked[:limit]))
+
+    # --- Embeddings ---
+    def _norm(self, segment_hash: str) -> float:
+        norm = self._norms.get(segment_hash)
+        if norm is None:
+            norm = math.sqrt(sum(v * v for v in self.vectors[segment_hash])) or 1.0
+            self._norms[segment_hash] = norm
+        return norm
+
+    def _mean_vector(self, hashes: List[str]) -> Optional[List[float]]:
+        vectors = [self.vectors.get(segment_hash) for segment_hash in hashes]
+        if not vectors or any(vector is None for vector in vectors):
+            return None
+        return [sum(values) / len(vectors) for values in zip(*vectors)]
+
+    def set_vector_model(self, model: str) -> None:
+        """Vectors from different models are not comparable; switching models drops them."""
+        if model != self.vector_model:
+            self.vectors = {}
+            self._norms.clear()
+            self.vector_model = model
+
+    def missing_vectors(self, limit: int = 256) -> List[Tuple[str, str]]:
+        """(segment hash, text) pairs that have no embedding yet."""
+        missing = {}
+        for entry in self._items.values():
+            for segment_hash, segment in zip(entry.hashes, entry.segments):
+                if segment_hash not in self.vectors and segment_hash not in missing:
+                    missing[segment_hash] = segment
+                    if len(missing) >= limit:
+                        return list(missing.items())
+        return list(missing.items())
+
+    def add_vectors(self, hashes: List[str], vectors: List[List[float]]) -> None:
+        for segment_hash, vector in zip(hashes, vectors):
+            self.vectors[segment_hash] = vector
+            self._norms.pop(segment_hash, None)
+        self._search_cache.clear()
+
+    def load_vectors(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read embedding cache {path}: {e}")
+            return
+        self.vector_model = data.get("model", "")
+        self.vectors = data.get("vectors", {})
+        self._norms.clear()
+        self._search_cache.clear()
+
+    def save_vectors(self, path: str) -> None:
+        if not self.vectors:
+            return
+        live = {segment_hash for entry in self._items.values() for segment_hash in entry.hashes}
+        vectors = {h: v for h, v in self.vectors.items() if h in live} if live else self.vectors
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.vector_model, "vectors": vectors}, f)
+        except OSError as e:
+            print(f"Warning: Could not write embedding cache {path}: {e}")
+
+
+def vectors_path(project_file: str) -> str:
+    """Sidecar file of a project's embedding cache (not *.json, so it is never listed as a project)."""
+    return os.path.splitext(project_file)[0] + ".embeddings"
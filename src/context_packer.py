@@ -0,0 +1,260 @@
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from context_assembler import CONTEXT_INTRO, CONTEXT_ITEM_TEMPLATE, ContextAssembler, get_fresh_summary
+
+# (mode id, combo box label, tooltip) for every context selection mode
+CONTEXT_MODES = [
+    ("fill_budget", "Automatic (Fill Budget)",
+     "Includes the nearest items until the exact token budget of the request is full"),
+    ("fill_budget_max", "Automatic (Max Items)",
+     "Includes as many items as fit in the token budget, preferring the smallest and then the nearest"),
+    ("hierarchical", "Automatic (Hierarchical)",
+     "Includes nearby items verbatim and farther items through their cached summaries"),
+    ("relevant", "Automatic (Relevant Passages)",
+     "Includes the passages of earlier items that best match the current item (search index)"),
+    ("nearby", "Automatic (Strict Nearby)", "Includes exactly 2 items before and after current item"),
+    ("manual", "Manual (Checkboxes)", "Manually select which items to include as context"),
+]
+
+# Chat formatting tokens added by the provider around every message, plus reply priming
+TOKENS_PER_MESSAGE = 4
+TOKENS_REPLY_PRIMING = 3
+
+# Items within this distance of the current one are included verbatim in hierarchical mode
+DEFAULT_VERBATIM_RADIUS = 2
+
+# Expected translation length relative to the source when the model config doesn't say
+DEFAULT_COMPLETION_RATIO = 1.5
+
+
+def context_mode_label(mode: str) -> str:
+    for mode_id, label, _ in CONTEXT_MODES:
+        if mode_id == mode:
+            return label
+    return "Unknown"
+
+
+def context_mode_from_label(label: str, default: str = "fill_budget") -> str:
+    for mode_id, mode_label, _ in CONTEXT_MODES:
+        if mode_label == label:
+            return mode_id
+    return default
+
+
+def estimate_completion_reserve(source_tokens: int, parameters: Optional[Dict[str, Any]]) -> int:
+    """Tokens to keep free for the model's reply.
+
+    An explicit `completion_reserve` parameter wins. Otherwise the reply is
+    expected to be `completion_ratio` times the source, capped by the
+    completion limit the request is sent with (`max_tokens_completion` or
+    Ollama's `num_predict`).
+    """
+    parameters = parameters or {}
+    explicit = parameters.get("completion_reserve")
+    if isinstance(explicit, (int, float)) and explicit >= 0:
+        return int(explicit)
+
+    ratio = parameters.get("completion_ratio", DEFAULT_COMPLETION_RATIO)
+    reserve = int(math.ceil(source_tokens * ratio))
+
+    for limit_key in ("max_tokens_completion", "num_predict"):
+        limit = parameters.get(limit_key)
+        if isinstance(limit, int) and limit > 0:
+            reserve = min(reserve, limit)
+    return reserve
+
+
+class ContextPlan:
+    """Result of packing: chosen context indices and the token accounting behind them."""
+
+    def __init__(self, included: Set[int], excluded: Set[int], window: int,
+                 overhead_tokens: int, reserve_tokens: int, context_tokens: int,
+                 summarized: Optional[Set[int]] = None, excerpts: Optional[Dict[int, tuple]] = None):
+        self.included = included
+        self.excluded = excluded
+        self.summarized = summarized or set()  # Subset of `included` represented by summaries
+        self.excerpts = excerpts or {}  # Included items represented by some of their paragraphs
+        self.window = window
+        self.overhead_tokens = overhead_tokens
+        self.reserve_tokens = reserve_tokens
+        self.context_tokens = context_tokens
+
+    @property
+    def budget(self) -> int:
+        """Tokens available for context items."""
+        return max(0, self.window - self.overhead_tokens - self.reserve_tokens)
+
+    @property
+    def total_tokens(self) -> int:
+        """Expected size of the whole request including the reply reserve."""
+        return self.overhead_tokens + self.context_tokens + self.reserve_tokens
+
+
+class ContextPacker:
+    """Fills the context window using exact token counts of the rendered payload.
+
+    The fixed part of the request (system prompts, glossary, context header,
+    user message and chat framing) and the expected reply are subtracted from the
+    window first; what remains is filled with rendered context fragments,
+    whose token counts come from the assembler's fragment cache.
+    """
+
+    def __init__(self, assembler: ContextAssembler, count_tokens: Callable[[str], int],
+                 tokenizer_name: Optional[Callable[[], str]] = None):
+        self.assembler = assembler
+        self.count_tokens = count_tokens
+        # Name of the tokenizer behind `count_tokens`; cached fragment counts made with another are redone
+        self.tokenizer_name = tokenizer_name or (lambda: None)
+
+    def prompt_overhead(self, templates: Dict[str, str], target_language: str, source_text: str,
+                        with_context: bool = True, glossary_block: str = "") -> int:
+        system_prompt = self.assembler.build_system_prompt(templates, target_language, "", glossary_block)
+        user_prompt = self.assembler.build_user_prompt(templates, source_text, target_language)
+        overhead = (self.count_tokens(system_prompt) + self.count_tokens(user_prompt) +
+                    2 * TOKENS_PER_MESSAGE + TOKENS_REPLY_PRIMING)
+        if with_context:
+            # Header line plus the newline joining it to the context block
+            overhead += self.count_tokens(CONTEXT_INTRO + "\n")
+        return overhead
+
+    def item_cost(self, items: List[Dict[str, Any]], index: int, target_language: str,
+                  template: str = CONTEXT_ITEM_TEMPLATE) -> int:
+        return self.assembler.fragment_tokens(items[index], index, target_language, self.count_tokens, template,
+                                              self.tokenizer_name())
+
+    def summary_cost(self, items: List[Dict[str, Any]], index: int) -> int:
+        return self.assembler.summary_tokens(items[index], index, self.count_tokens, self.tokenizer_name())
+
+    def excerpt_cost(self, items: List[Dict[str, Any]], index: int, segment_numbers: tuple,
+                     target_language: str) -> int:
+        return self.assembler.excerpt_tokens(items[index], index, segment_numbers, target_language, self.count_tokens,
+                                             self.tokenizer_name())
+
+    def pack(self, items: List[Dict[str, Any]], current_index: int, candidates: Iterable[int],
+             window: int, templates: Dict[str, str], target_language: str, source_text: str,
+             parameters: Optional[Dict[str, Any]] = None, strategy: str = "nearest",
+             verbatim_radius: int = DEFAULT_VERBATIM_RADIUS,
+             excerpts: Optional[Dict[int, tuple]] = None, glossary_block: str = "") -> ContextPlan:
+        """Choose context items for `current_index` within `window` tokens.
+
+        strategy:
+            "nearest"   - walk outward from the current item, alternating
+                          before/after, adding every item that still fits.
+            "max_items" - maximize the number of included items: with every
+                          item worth the same, taking the cheapest first is the
+                          optimal 0/1 knapsack solution (ties go to the nearest).
+            "hierarchical" - items within `verbatim_radius` of the current one
+                          are packed in full (nearest first); every farther item
+                          with a fresh summary is then packed as that summary,
+                          nearest first. Items without a summary are left out.
+            "relevant"  - earlier items within `verbatim_radius` are packed in
+                          full; the rest are packed as the passages listed in
+                          `excerpts`, in the order of that mapping (best match
+                          first). Later items and items without a match are
+                          left out.
+        """
+        candidates = [i for i in candidates if 0 <= i < len(items) and i != current_index]
+        template = templates.get("context_item_template", CONTEXT_ITEM_TEMPLATE)
+
+        source_tokens = self.count_tokens(source_text)
+        overhead = self.prompt_overhead(templates, target_language, source_text, with_context=bool(candidates),
+                                        glossary_block=glossary_block)
+        reserve = estimate_completion_reserve(source_tokens, parameters)
+        budget = window - overhead - reserve
+
+        included: Set[int] = set()
+        excluded: Set[int] = set()
+        used = 0
+
+        if strategy == "hierarchical":
+            summarized: Set[int] = set()
+            for i in self._nearest_order(candidates, current_index):
+                if abs(i - current_index) <= verbatim_radius:
+                    cost = self.item_cost(items, i, target_language, template)
+                elif get_fresh_summary(items[i]):
+                    cost = self.summary_cost(items, i)
+                    if used + cost <= budget:
+                        summarized.add(i)
+                else:
+                    excluded.add(i)
+                    continue
+                if used + cost <= budget:
+                    included.add(i)
+                    used += cost
+                else:
+                    excluded.add(i)
+            return ContextPlan(included, excluded, window, overhead, reserve, used, summarized)
+
+        if strategy == "relevant":
+            excerpts = excerpts or {}
+            chosen_excerpts: Dict[int, tuple] = {}
+            nearby = [i for i in self._nearest_order(candidates, current_index)
+                      if i < current_index and current_index - i <= verbatim_radius]
+            candidate_set = set(candidates)
+            ranked = [i for i in excerpts if i in candidate_set and i < current_index and i not in nearby]
+            for i in nearby + ranked:
+                if i in nearby:
+                    cost = self.item_cost(items, i, target_language, template)
+                else:
+                    cost = self.excerpt_cost(items, i, excerpts[i], target_language)
+                if used + cost <= budget:
+                    included.add(i)
+                    used += cost
+                    if i not in nearby:
+                        chosen_excerpts[i] = excerpts[i]
+                else:
+                    excluded.add(i)
+            excluded.update(i for i in candidates if i not in included)
+            return ContextPlan(included, excluded, window, overhead, reserve, used, excerpts=chosen_excerpts)
+
+        if strategy == "max_items":
+            order = sorted(candidates, key=lambda i: (self.item_cost(items, i, target_language, template),
+                                                      abs(i - current_index), i))
+        else:
+            order = self._nearest_order(candidates, current_index)
+
+        for i in order:
+            cost = self.item_cost(items, i, target_language, template)
+            if used + cost <= budget:
+                included.add(i)
+                used += cost
+            else:
+                excluded.add(i)
+
+        return ContextPlan(included, excluded, window, overhead, reserve, used)
+
+    @staticmethod
+    def _nearest_order(candidates: List[int], current_index: int) -> List[int]:
+        before = sorted((i for i in candidates if i < current_index), reverse=True)
+        after = sorted(i for i in candidates if i > current_index)
+        order = []
+        for offset in range(max(len(before), len(after))):
+            if offset < len(before):
+                order.append(before[offset])
+            if offset < len(after):
+                order.append(after[offset])
+        return order
+
+    def plan_tokens(self, items: List[Dict[str, Any]], indices: Iterable[int], templates: Dict[str, str],
+                    target_language: str, source_text: str, window: int,
+                    parameters: Optional[Dict[str, Any]] = None, current_index: Optional[int] = None,
+                    summarized: Iterable[int] = (), excerpts: Optional[Dict[int, tuple]] = None,
+                    glossary_block: str = "") -> ContextPlan:
+        """Token accounting for an already chosen set of context items (manual/nearby modes)."""
+        template = templates.get("context_item_template", CONTEXT_ITEM_TEMPLATE)
+        chosen = {i for i in indices if 0 <= i < len(items) and i != current_index}
+        summarized = {i for i in summarized if i in chosen}
+        excerpts = {i: segments for i, segments in (excerpts or {}).items() if i in chosen}
+        context_tokens = 0
+        for i in chosen:
+            if i in summarized:
+                context_tokens += self.summary_cost(items, i)
+            elif i in excerpts:
+                context_tokens += self.excerpt_cost(items, i, excerpts[i], target_language)
+            else:
+                context_tokens += self.item_cost(items, i, target_language, template)
+        overhead = self.prompt_overhead(templates, target_language, source_text, with_context=bool(chosen),
+                                        glossary_block=glossary_block)
+        reserve = estimate_completion_reserve(self.count_tokens(source_text), parameters)
+        return ContextPlan(chosen, set(), window, overhead, reserve, context_tokens, summarized, excerpts)
@@ -0,0 +1,205 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from token_calibration import get_calibration
+
+# Prices in models.json are USD per million tokens, set on a model or on its provider:
+#   "pricing": {"prompt": 0.15, "completion": 0.6, "batch_discount": 0.5}
+# `batch_discount` is the price factor of jobs run through the provider's batch API.
+TOKENS_PER_PRICE_UNIT = 1_000_000
+
+# Completion tokens per source token when the ledger has no history for the model:
+# a translation is about as long as its source
+DEFAULT_COMPLETION_RATIO = 1.0
+
+# What a request was for; "hedge" is a model that lost a hedged race and was cancelled
+REQUEST_KINDS = ("translation", "hedge", "summary", "glossary")
+TRANSLATION_KINDS = ("translation", "hedge")
+
+
+def ledger_path(project_file: str) -> str:
+    """Sidecar file of a project's request ledger (not *.json, so it is never listed as a project)."""
+    return os.path.splitext(project_file)[0] + ".ledger"
+
+
+def model_pricing(model_config: Optional[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """The `pricing` of a model from models.json, or None when it has none (local models)."""
+    pricing = (model_config or {}).get("pricing")
+    if not isinstance(pricing, dict):
+        return None
+    try:
+        return {
+            "prompt": float(pricing.get("prompt", 0)),
+            "completion": float(pricing.get("completion", 0)),
+            "batch_discount": float(pricing.get("batch_discount", 1))
+        }
+    except (TypeError, ValueError):
+        print(f"Warning: Invalid pricing {pricing}")
+        return None
+
+
+def request_cost(pricing: Optional[Dict[str, float]], prompt_tokens: int, completion_tokens: int,
+                 batch_api: bool = False) -> Optional[float]:
+    """USD cost of one request, or None when the model has no pricing."""
+    if not pricing:
+        return None
+    cost = (prompt_tokens * pricing["prompt"] + completion_tokens * pricing["completion"]) / TOKENS_PER_PRICE_UNIT
+    return cost * pricing["batch_discount"] if batch_api else cost
+
+
+def format_cost(cost: Optional[float]) -> str:
+    if cost is None:
+        return "no pricing"
+    return f"${cost:.4f}" if cost < 1 else f"${cost:,.2f}"
+
+
+def empty_totals() -> Dict[str, Any]:
+    return {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0, "unpriced": 0}
+
+
+class CostLedger:
+    """Tokens and cost of every request of a project, kept in an append-only JSON-lines file.
+
+    Each entry: {"time", "kind", "item", "item_name", "model", "batch", "context_mode",
+    "prompt_tokens", "completion_tokens", "source_tokens", "cost", "estimated"}.
+    `kind` is one of REQUEST_KINDS (entries written before it existed are
+    translations), `batch` is the id of the Translate Stale run or bulk job the
+    request belonged to, `cost` is None for models without pricing, and
+    `estimated` marks token counts the provider did not report.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = []
+        if path:
+            self.load()
+
+    def load(self) -> None:
+        self.entries = []
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        self.entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by a crash
+        except OSError as e:
+            print(f"Warning: Could not read ledger {self.path}: {e}")
+
+    def record(self, item_index: Optional[int], item_name: str, model: str, prompt_tokens: int,
+               completion_tokens: int, cost: Optional[float], batch: Optional[str] = None,
+               context_mode: str = "", source_tokens: int = 0, estimated: bool = False,
+               kind: str = "translation") -> Dict[str, Any]:
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "kind": kind,
+            "item": item_index,
+            "item_name": item_name,
+            "model": model,
+            "batch": batch,
+            "context_mode": context_mode,
+            "prompt_tokens": int(prompt_tokens),
+            "completion_tokens": int(completion_tokens),
+            "source_tokens": int(source_tokens),
+            "cost": cost,
+            "estimated": estimated
+        }
+        self.entries.append(entry)
+        if self.path:
+            # One line per request: nothing is rewritten, and a crash loses at most the last entry
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Warning: Could not write ledger {self.path}: {e}")
+        return entry
+
+    def totals(self, key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+               entries: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[Any, Dict[str, Any]]:
+        """Requests, tokens and cost summed per `key(entry)`; everything under None without a key."""
+        groups: Dict[Any, Dict[str, Any]] = {}
+        for entry in self.entries if entries is None else entries:
+            totals = groups.setdefault(key(entry) if key else None, empty_totals())
+            totals["requests"] += 1
+            totals["prompt_tokens"] += entry.get("prompt_tokens", 0)
+            totals["completion_tokens"] += entry.get("completion_tokens", 0)
+            if entry.get("cost") is None:
+                totals["unpriced"] += 1
+            else:
+                totals["cost"] += entry["cost"]
+        return groups
+
+    def total(self) -> Dict[str, Any]:
+        return self.totals().get(None, empty_totals())
+
+    def by_model(self):
+        return self.totals(lambda entry: entry.get("model", ""))
+
+    def by_batch(self):
+        return self.totals(lambda entry: entry.get("batch") or "single requests")
+
+    def by_item(self):
+        return self.totals(lambda entry: entry.get("item_name") or f"Item {(entry.get('item') or 0) + 1}")
+
+    def by_context_mode(self):
+        """Translation requests only: summaries and glossary requests are not part of a chapter's request."""
+        return self.totals(lambda entry: entry.get("context_mode") or "unknown",
+                           [entry for entry in self.entries if entry.get("kind", "translation") in TRANSLATION_KINDS])
+
+    def by_kind(self):
+        return self.totals(lambda entry: entry.get("kind", "translation"))
+
+    def completion_ratio(self, model: str) -> Optional[float]:
+        """Completion tokens per source token in the model's past requests."""
+        source = completion = 0
+        for entry in self.entries:
+            if entry.get("model") == model and entry.get("source_tokens"):
+                source += entry["source_tokens"]
+                completion += entry.get("completion_tokens", 0)
+        return completion / source if source else None
+
+
+def estimate_requests(requests: Iterable[Tuple[Dict[str, Any], str]], model_id: str,
+                      model_config: Optional[Dict[str, Any]], ledger: Optional[CostLedger] = None,
+                      batch_api: bool = False) -> Dict[str, Any]:
+    """Pre-flight estimate of (payload, source_text) requests: token totals and cost (None without pricing).
+
+    Prompts are counted with the constant-time calibrated estimate; answers are
+    predicted from the source length and the model's history in `ledger`. A
+    request whose payload is None was not built: its prompt is its source plus
+    the mean of what the built payloads add to theirs (prompts, glossary,
+    context), so payloads of a sample can stand for a whole run.
+    """
+    calibration = get_calibration()
+    ratio = (ledger.completion_ratio(model_id) if ledger else None) or DEFAULT_COMPLETION_RATIO
+    estimate = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    built = overhead = unbuilt = unbuilt_source_tokens = 0
+    for payload, source_text in requests:
+        source_tokens = calibration.fast_count(source_text, model_id, model_config)
+        estimate["requests"] += 1
+        estimate["completion_tokens"] += round(source_tokens * ratio)
+        if payload is None:
+            unbuilt += 1
+            unbuilt_source_tokens += source_tokens
+            continue
+        prompt = "\n".join(str(message.get("content") or "") for message in payload.get("messages", []))
+        prompt_tokens = calibration.fast_count(prompt, model_id, model_config)
+        estimate["prompt_tokens"] += prompt_tokens
+        built += 1
+        overhead += max(0, prompt_tokens - source_tokens)
+    if unbuilt:
+        estimate["prompt_tokens"] += unbuilt_source_tokens + (round(overhead / built * unbuilt) if built else 0)
+    estimate["cost"] = request_cost(model_pricing(model_config), estimate["prompt_tokens"],
+                                    estimate["completion_tokens"], batch_api)
+    return estimate
+
+
+def format_estimate(estimate: Dict[str, Any]) -> str:
+    return (f"Estimated: ~{estimate['prompt_tokens']:,} prompt + ~{estimate['completion_tokens']:,} "
+            f"completion tokens, {format_cost(estimate['cost'])}")
@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# An endpoint that failed is skipped for this long, doubling per consecutive failure
+FAILURE_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 300
+
+DEFAULT_MAX_CONCURRENCY = 1
+# A provider with a single `endpoint` keeps running as many requests as the
+# default batch concurrency, unless it sets `max_concurrency` itself
+SINGLE_ENDPOINT_MAX_CONCURRENCY = 2
+
+# How long a request waits for a free slot when every endpoint is busy
+ACQUIRE_TIMEOUT_SECONDS = 300
+
+
+def _normalize_url(url: str) -> str:
+    url = url.strip().rstrip('/')
+    if not url.startswith(('http://', 'https://')):
+        url = f'http://{url}'
+    return url
+
+
+def parse_endpoints(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Endpoints of a provider config: `endpoints` (URLs or {url, weight, max_concurrency}) or the single `endpoint`.
+
+    Returns dicts with url, weight and max_concurrency; an empty list when none are configured.
+    """
+    entries = config.get('endpoints')
+    if not entries and config.get('endpoint'):
+        entries = [{"url": config['endpoint'],
+                    "max_concurrency": config.get('max_concurrency', SINGLE_ENDPOINT_MAX_CONCURRENCY)}]
+    endpoints = []
+    for entry in entries or []:
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if not isinstance(entry, dict) or not entry.get('url'):
+            continue
+        endpoints.append({
+            "url": _normalize_url(entry['url']),
+            "weight": max(float(entry.get('weight', 1)), 0.01),
+            "max_concurrency": max(int(entry.get('max_concurrency', DEFAULT_MAX_CONCURRENCY)), 1)
+        })
+    return endpoints
+
+
+def endpoint_capacity(config: Dict[str, Any]) -> int:
+    """How many requests the provider's endpoints accept at the same time."""
+    return sum(endpoint["max_concurrency"] for endpoint in parse_endpoints(config))
+
+
+class EndpointPool:
+    """Routes requests to the least-loaded healthy endpoint of a provider.
+
+    Load is the number of active requests relative to the endpoint's weight.
+    Failed endpoints are skipped for an exponentially growing backoff period.
+    No endpoint runs more than its `max_concurrency` requests; further requests
+    wait for a slot. Shared by all handlers of the same endpoints (see
+    `get_pool`) and safe to use from several translation threads.
+    """
+
+    def __init__(self, endpoints: List[Dict[str, Any]]):
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self.endpoints = [dict(endpoint, active=0, failures=0, down_until=0.0) for endpoint in endpoints]
+
+    def urls(self) -> List[str]:
+        return [endpoint["url"] for endpoint in self.endpoints]
+
+    def _find(self, url: str) -> Optional[Dict[str, Any]]:
+        return next((endpoint for endpoint in self.endpoints if endpoint["url"] == url), None)
+
+    @staticmethod
+    def _preference(endpoint, now):
+        healthy = endpoint["down_until"] <= now
+        has_slot = endpoint["active"] < endpoint["max_concurrency"]
+        # Unhealthy endpoints are tried last, the one recovering soonest first
+        return (not healthy, not has_slot,
+                (endpoint["active"] + 1) / endpoint["weight"] if healthy else endpoint["down_until"])
+
+    def ranked(self, exclude=()) -> List[str]:
+        """URLs from most to least preferred: healthy endpoints with free slots first, by relative load."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint["url"] not in exclude]
+            return [endpoint["url"] for endpoint in sorted(candidates, key=lambda e: self._preference(e, now))]
+
+    def acquire(self, exclude=(), timeout: float = ACQUIRE_TIMEOUT_SECONDS) -> Optional[str]:
+        """Reserve a slot on the best endpoint not in `exclude` that has one free.
+
+        Ranking and reserving happen under one lock, so two threads never take
+        the same last slot. When every slot is taken, waits up to `timeout`
+        seconds for one to be released. None when no endpoint is left to try
+        or no slot became free in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self._slot_freed:
+            while True:
+                now = time.monotonic()
+                candidates = [endpoint for endpoint in self.endpoints if endpoint["url"] not in exclude]
+                if not candidates:
+                    return None
+                free = [endpoint for endpoint in candidates if endpoint["active"] < endpoint["max_concurrency"]]
+                if free:
+                    endpoint = min(free, key=lambda e: self._preference(e, now))
+                    endpoint["active"] += 1
+                    return endpoint["url"]
+                if now >= deadline:
+                    return None
+                self._slot_freed.wait(deadline - now)
+
+    def release(self, url: str, success: bool = True) -> None:
+        with self._slot_freed:
+            endpoint = self._find(url)
+            if endpoint is None:
+                return
+            endpoint["active"] = max(0, endpoint["active"] - 1)
+            self._record(endpoint, success)
+            self._slot_freed.notify_all()
+
+    def report(self, url: str, success: bool) -> None:
+        """Record the outcome of a request made without a reserved slot (e.g. a health check)."""
+        with self._lock:
+            endpoint = self._find(url)
+            if endpoint is not None:
+                self._record(endpoint, success)
+
+    def _record(self, endpoint, success):
+        if success:
+            endpoint["failures"] = 0
+            endpoint["down_until"] = 0.0
+        else:
+            endpoint["failures"] += 1
+            backoff = min(FAILURE_BACKOFF_SECONDS * 2 ** (endpoint["failures"] - 1), MAX_BACKOFF_SECONDS)
+            endpoint["down_until"] = time.monotonic() + backoff
+
+    def is_healthy(self, url: str) -> bool:
+        with self._lock:
+            endpoint = self._find(url)
+            return endpoint is not None and endpoint["down_until"] <= time.monotonic()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Snapshot of url, active requests, failures and health per endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            return [{"url": endpoint["url"], "active": endpoint["active"], "failures": endpoint["failures"],
+                     "healthy": endpoint["down_until"] <= now} for endpoint in self.endpoints]
+
+
+_pools: Dict[tuple, EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(endpoints: List[Dict[str, Any]]) -> EndpointPool:
+    """The shared pool for this set of endpoints, so load and health are tracked across handlers."""
+    key = tuple((endpoint["url"], endpoint["weight"], endpoint["max_concurrency"]) for endpoint in endpoints)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = EndpointPool(endpoints)
+        return _pools[key]
@@ -1,9 +1,275 @@
-import ebooklib
-from ebooklib import epub
-import markdown2
+import html
 import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+import markdown2
+
+from hashing import text_hash
+from glossary_extractor import MIN_ITEMS_FOR_POOL
+
+MARKDOWN_EXTRAS = ["fenced-code-blocks", "tables", "strike"]
+
+# Bump when the chapter markup changes so cached chapters are rendered again
+RENDER_VERSION = "3"
+
+STYLE = 'BODY {color: black;}'  # Basic style, black for readability
+
+ProgressCallback = Callable[[int, int, str], None]
+
+
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                 "source", "track", "wbr"}
+
+_NAME_RE = re.compile(r"^[A-Za-z_][\w.-]*$")
+# Characters XML does not allow anywhere in a document
+_INVALID_XML_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class _XhtmlSerializer(HTMLParser):
+    """Re-serializes an HTML fragment as well-formed XHTML.
+
+    Entities become characters (escaped again where XML needs it), void
+    elements are self-closed, stray end tags are dropped and unclosed elements
+    are closed. Elements and attributes with names XML cannot take without a
+    namespace declaration (Word's <o:p>) are dropped, keeping their text.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.open: List[str] = []
+
+    def _start(self, tag, attrs, closed):
+        if not _NAME_RE.match(tag):
+            return
+        attributes = "".join(
+            f' {name}="{html.escape(_INVALID_XML_CHARS_RE.sub("", value or ""))}"'
+            for name, value in dict(attrs).items() if _NAME_RE.match(name)
+        )
+        if tag in VOID_ELEMENTS:
+            self.parts.append(f"<{tag}{attributes}/>")
+        elif closed:
+            self.parts.append(f"<{tag}{attributes}></{tag}>")
+        else:
+            self.parts.append(f"<{tag}{attributes}>")
+            self.open.append(tag)
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if tag not in self.open:
+            return
+        while self.open:
+            open_tag = self.open.pop()
+            self.parts.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        self.parts.append(html.escape(_INVALID_XML_CHARS_RE.sub("", data), quote=False))
+
+    def handle_comment(self, data):
+        self.parts.append("<!--" + data.replace("--", "- -").rstrip("-") + "-->")
+
+    def close(self):
+        super().close()
+        self.parts.extend(f"</{tag}>" for tag in reversed(self.open))
+        self.open = []
+
+
+def to_xhtml(fragment: str) -> str:
+    """Well-formed XHTML for an HTML fragment, such as Markdown rendered with raw HTML in it."""
+    serializer = _XhtmlSerializer()
+    serializer.feed(fragment)
+    serializer.close()
+    return "".join(serializer.parts)
+
+
+def render_chapter(task: Tuple[str, str]) -> Tuple[str, str]:
+    """(cache key, XHTML) for (key, Markdown text).
+
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    key, markdown_text = task
+    return key, to_xhtml(markdown2.markdown(markdown_text, extras=MARKDOWN_EXTRAS))
+
+
+def chapter_key(markdown_text: str) -> str:
+    return text_hash(RENDER_VERSION, markdown_text)
+
+
+def render_cache_dir(project_file: str) -> str:
+    """Sidecar folder with rendered chapters of `project_file`, one file per content hash."""
+    return os.path.splitext(project_file)[0] + ".xhtml-cache"
+
+
+class ChapterRenderer:
+    """Renders chapter Markdown to XHTML, reusing results cached on disk by content hash.
+
+    Shared by all export formats; the bilingual edition renders source and
+    translation through the same cache.
+    """
+
+    def __init__(self, cache_dir: str, workers: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.workers = workers
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".xhtml")
+
+    def render_all(self, texts: List[str], progress: Optional[ProgressCallback] = None) -> List[str]:
+        """Make sure every Markdown text is in the cache; returns their keys in order.
+
+        Only texts that changed since they were last cached are rendered.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        keys = [chapter_key(text) for text in texts]
+        tasks = []
+        seen = set()
+        for key, text in zip(keys, texts):
+            if key not in seen and not os.path.exists(self._path(key)):
+                tasks.append((key, text))
+            seen.add(key)
+
+        total = len(tasks)
+        if progress:
+            progress(0, total, f"Rendering {total} of {len(texts)} chapters ({len(texts) - total} cached)...")
+        for done, (key, body) in enumerate(self._render(tasks), 1):
+            self._store(key, body)
+            if progress and (done % 50 == 0 or done == total):
+                progress(done, total, f"Rendering chapters: {done}/{total}")
+        return keys
+
+    def _render(self, tasks):
+        # Results are written to the cache as they arrive, so memory does not grow with the book
+        if len(tasks) < MIN_ITEMS_FOR_POOL or self.workers == 1:
+            yield from map(render_chapter, tasks)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (workers * 4))
+        done = 0
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for result in pool.map(render_chapter, tasks, chunksize=chunksize):
+                    done += 1
+                    yield result
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: Parallel rendering failed, rendering in-process: {e}")
+            yield from map(render_chapter, tasks[done:])
+
+    def _store(self, key: str, body: str) -> None:
+        # Write then rename, so an interrupted export never leaves a truncated chapter behind
+        path = self._path(key)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+
+    def read(self, key: str) -> str:
+        with open(self._path(key), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def prune(self, live_keys) -> None:
+        """Delete cached chapters that no longer belong to any item."""
+        live = {key + ".xhtml" for key in live_keys}
+        for name in os.listdir(self.cache_dir):
+            if name not in live:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+
+CONTAINER_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="EPUB/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+'''
+
+CHAPTER_XHTML = '''<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="{lang}" xml:lang="{lang}">
+<head>
+<title>{title}</title>
+<link href="style/nav.css" rel="stylesheet" type="text/css"/>
+</head>
+<body>
+{body}
+</body>
+</html>
+'''
+
+
+def write_epub(output_path: str, metadata: Dict[str, str], titles: List[str],
+               chapter_body: Callable[[int], str], progress: Optional[ProgressCallback] = None,
+               stylesheet: str = STYLE) -> None:
+    """Write an EPUB 3 file chapter by chapter; `chapter_body(i)` returns the XHTML body of chapter i.
+
+    Only one chapter body is held in memory at a time.
+    """
+    lang = metadata["language"]
+    title = html.escape(metadata["title"])
+    total = len(titles)
+
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype entry must come first and be stored uncompressed
+        archive.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        archive.writestr("META-INF/container.xml", CONTAINER_XML)
+        archive.writestr("EPUB/style/nav.css", stylesheet)
+
+        manifest = ['<item href="nav.xhtml" id="nav" media-type="application/xhtml+xml" properties="nav"/>',
+                    '<item href="toc.ncx" id="ncx" media-type="application/x-dtbncx+xml"/>',
+                    '<item href="style/nav.css" id="style_nav" media-type="text/css"/>']
+        spine = ['<itemref idref="nav"/>']
+        nav_points = []
+        nav_links = []
+        for number, chapter_title in enumerate(titles, 1):
+            file_name = f"chap_{number}.xhtml"
+            escaped = html.escape(chapter_title)
+            archive.writestr(f"EPUB/{file_name}",
+                             CHAPTER_XHTML.format(lang=lang, title=escaped, body=chapter_body(number - 1)))
+            manifest.append(f'<item href="{file_name}" id="chapter_{number}" media-type="application/xhtml+xml"/>')
+            spine.append(f'<itemref idref="chapter_{number}"/>')
+            nav_links.append(f'<li><a href="{file_name}">{escaped}</a></li>')
+            nav_points.append(f'<navPoint id="chapter_{number}"><navLabel><text>{escaped}</text></navLabel>'
+                              f'<content src="{file_name}"/></navPoint>')
+            if progress and (number % 100 == 0 or number == total):
+                progress(number, total, f"Writing EPUB: {number}/{total} chapters")
+
+        archive.writestr("EPUB/nav.xhtml", CHAPTER_XHTML.format(
+            lang=lang, title=title,
+            body=f'<nav epub:type="toc" id="id"><h2>{title}</h2><ol>\n' + "\n".join(nav_links) + '\n</ol></nav>'
+        ))
+        archive.writestr("EPUB/toc.ncx", (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">'
+            f'<head><meta content="{html.escape(metadata["identifier"])}" name="dtb:uid"/></head>'
+            f'<docTitle><text>{title}</text></docTitle><navMap>\n' + "\n".join(nav_points) + '\n</navMap></ncx>'
+        ))
+        archive.writestr("EPUB/content.opf", (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" unique-identifier="id" version="3.0">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f'<dc:identifier id="id">{html.escape(metadata["identifier"])}</dc:identifier>'
+            f'<dc:title>{title}</dc:title><dc:language>{lang}</dc:language>'
+            f'<dc:creator id="creator">{html.escape(metadata["author"])}</dc:creator>'
+            f'<dc:description>{html.escape(metadata["description"])}</dc:description>'
+            '</metadata>\n<manifest>\n' + "\n".join(manifest) + '\n</manifest>\n'
+            '<spine toc="ncx">\n' + "\n".join(spine) + '\n</spine></package>'
+        ))
+
 
-def export_project_to_epub(project_data, output_path):
+def export_project_to_epub(project_data, output_path, cache_dir=None, progress=None, workers=None):
     """
     Exports project data (translated text) to an EPUB file.
 
@@ -11,59 +277,18 @@ def export_project_to_epub(project_data, output_path):
         project_data (dict): The project data dictionary containing 'title',
                              'description', and 'items'.
         output_path (str): The full path where the EPUB file should be saved.
+        cache_dir (str): Folder for rendered chapters kept between exports
+                         (see `render_cache_dir`); a temporary folder if None.
+        progress (callable): Called with (done, total, message) while exporting.
+        workers (int): Render processes; defaults to the number of cores.
 
     Returns:
         bool: True if export was successful, False otherwise.
         str: An error message if export failed, empty string otherwise.
     """
-    if not project_data or 'items' not in project_data:
-        return False, "Invalid project data provided."
-
-    book = epub.EpubBook()
-
-    # Set metadata
-    book.set_identifier(project_data.get('title', 'Untitled Project').replace(' ', '_')) # Simple identifier
-    book.set_title(project_data.get('title', 'Untitled Project'))
-    book.set_language('en') # Assuming English for now, could be a project setting
-
-    # Add author from project settings or default to SagaTrans
-    author = project_data.get('author', 'SagaTrans')
-    book.add_author(author)
-
-    # Create chapters from project items
-    chapters = []
-    for i, item in enumerate(project_data['items']):
-        item_name = item.get('name', f'Item {i+1}')
-        translated_text_markdown = item.get('translated_text', '')
-
-        # Convert Markdown to HTML
-        translated_text_html = markdown2.markdown(translated_text_markdown, extras=["fenced-code-blocks", "tables", "strike"])
-
-        # Create chapter
-        chapter = epub.EpubHtml(title=item_name, file_name=f'chap_{i+1}.xhtml', lang='en')
-        chapter.content = f'<h1>{item_name}</h1>\n{translated_text_html}'
-        book.add_item(chapter)
-        chapters.append(chapter)
-
-    # Define Table of Contents and Spine
-    book.toc = chapters
-    book.spine = ['nav'] + chapters
-
-    # Add default NCX and Nav file
-    book.add_item(epub.EpubNcx())
-    book.add_item(epub.EpubNav())
-
-    # Add default CSS
-    style = 'BODY {color: black;}' # Basic style, changed to black for readability
-    nav_css = epub.EpubItem(uid="style_nav", file_name="style/nav.css", media_type="text/css", content=style)
-    book.add_item(nav_css)
-
-    # Create epub file
-    try:
-        epub.write_epub(output_path, book, {})
-        return True, ""
-    except Exception as e:
-        return False, f"Error writing EPUB file: {e}"
+    from exporters import export_project
+    return export_project(project_data, output_path, "epub", cache_dir=cache_dir,
+                          progress=progress, workers=workers)
 
 if __name__ == '__main__':
     # Example Usage (for testing the library independently)
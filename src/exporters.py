@@ -0,0 +1,229 @@
+import html
+import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from epub_exporter import ChapterRenderer, ProgressCallback, STYLE, chapter_key, write_epub
+
+# Chapters as (title, source Markdown, translated Markdown)
+Chapter = Tuple[str, str, str]
+
+LANGUAGE_CODES = {
+    "arabic": "ar", "bulgarian": "bg", "chinese": "zh", "simplified chinese": "zh-Hans",
+    "traditional chinese": "zh-Hant", "croatian": "hr", "czech": "cs", "danish": "da", "dutch": "nl",
+    "english": "en", "finnish": "fi", "french": "fr", "german": "de", "greek": "el", "hebrew": "he",
+    "hindi": "hi", "hungarian": "hu", "indonesian": "id", "italian": "it", "japanese": "ja",
+    "korean": "ko", "malay": "ms", "norwegian": "nb", "persian": "fa", "polish": "pl",
+    "portuguese": "pt", "romanian": "ro", "russian": "ru", "serbian": "sr", "slovak": "sk",
+    "spanish": "es", "swedish": "sv", "thai": "th", "turkish": "tr", "ukrainian": "uk",
+    "vietnamese": "vi"
+}
+
+_LANGUAGE_TAG_RE = re.compile(r"^[a-z]{2,3}(?:-[A-Za-z0-9]{2,8})*$")
+
+HTML_STYLE = '''body {color: black; max-width: 50em; margin: 0 auto; padding: 1em; line-height: 1.5;}
+nav li {list-style: none;}
+'''
+
+BILINGUAL_STYLE = '''.bilingual {display: grid; grid-template-columns: 1fr 1fr; gap: 2em;}
+body {max-width: none;}
+'''
+
+
+def language_code(target_language: str) -> str:
+    """BCP 47 tag for the project's free-text target language ("German", "pt-BR"); 'und' if unknown."""
+    value = (target_language or "").strip()
+    if _LANGUAGE_TAG_RE.match(value):
+        return value
+    name = value.lower()
+    if name in LANGUAGE_CODES:
+        return LANGUAGE_CODES[name]
+    # "English (US)", "Polish language"
+    first_word = name.split(" ")[0].split("(")[0] if name else ""
+    return LANGUAGE_CODES.get(first_word, "und")
+
+
+def safe_filename(name: str) -> str:
+    name = "".join(c for c in name if c.isalnum() or c in (' ', '_', '-', '.')).strip(" .")
+    return name[:80] or "untitled"
+
+
+def volume_paths(output_path: str, chapter_count: int, volume_size: int = 0) -> List[str]:
+    """Output path of each volume; a single volume keeps `output_path` as is."""
+    count = 1 if volume_size <= 0 else max(1, -(-chapter_count // volume_size))
+    if count == 1:
+        return [output_path]
+    root, extension = os.path.splitext(output_path)
+    return [f"{root} - Volume {number:02d}{extension}" for number in range(1, count + 1)]
+
+
+class Exporter(ABC):
+    """One output format. Subclasses write a volume of chapters to a path.
+
+    Rendering goes through the shared `ChapterRenderer`, so every format reuses
+    the chapters cached by any earlier export.
+    """
+    label = ""
+    extension = ""
+    renders_source = False
+    renders_translation = True
+
+    def __init__(self, renderer: ChapterRenderer, stylesheet: Optional[str] = None):
+        self.renderer = renderer
+        self.stylesheet = stylesheet
+
+    def prepare(self, chapters: List[Chapter], progress: Optional[ProgressCallback] = None) -> List[str]:
+        """Render what this format needs; returns the cache keys in use."""
+        texts = []
+        for _, source, translated in chapters:
+            if self.renders_source:
+                texts.append(source)
+            if self.renders_translation:
+                texts.append(translated)
+        return self.renderer.render_all(texts, progress) if texts else []
+
+    def body(self, markdown_text: str) -> str:
+        return self.renderer.read(chapter_key(markdown_text))
+
+    @abstractmethod
+    def write(self, output_path: str, metadata: Dict[str, str], chapters: List[Chapter],
+              progress: Optional[ProgressCallback] = None) -> None:
+        pass
+
+
+class EpubExporter(Exporter):
+    label = "EPUB"
+    extension = ".epub"
+
+    def write(self, output_path, metadata, chapters, progress=None):
+        write_epub(
+            output_path, metadata, [title for title, _, _ in chapters],
+            lambda i: f'<h1>{html.escape(chapters[i][0])}</h1>\n{self.body(chapters[i][2])}',
+            progress, self.stylesheet or STYLE
+        )
+
+
+class HtmlExporter(Exporter):
+    """The whole book (or volume) as one HTML file with a table of contents, written chapter by chapter."""
+    label = "Single HTML file"
+    extension = ".html"
+    style = HTML_STYLE
+
+    def chapter_html(self, chapter: Chapter) -> str:
+        return self.body(chapter[2])
+
+    def write(self, output_path, metadata, chapters, progress=None):
+        title = html.escape(metadata["title"])
+        total = len(chapters)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(f'<!DOCTYPE html>\n<html lang="{metadata["language"]}">\n<head>\n<meta charset="utf-8"/>\n'
+                    f'<title>{title}</title>\n<style>\n{self.stylesheet or self.style}\n</style>\n</head>\n<body>\n'
+                    f'<h1>{title}</h1>\n<nav><ol>\n')
+            for number, (chapter_title, _, _) in enumerate(chapters, 1):
+                f.write(f'<li><a href="#chapter-{number}">{html.escape(chapter_title)}</a></li>\n')
+            f.write('</ol></nav>\n')
+            for number, chapter in enumerate(chapters, 1):
+                f.write(f'<section id="chapter-{number}">\n<h2>{html.escape(chapter[0])}</h2>\n'
+                        f'{self.chapter_html(chapter)}\n</section>\n')
+                if progress and (number % 100 == 0 or number == total):
+                    progress(number, total, f"Writing HTML: {number}/{total} chapters")
+            f.write('</body>\n</html>\n')
+
+
+class BilingualHtmlExporter(HtmlExporter):
+    """Source and translation of each chapter side by side."""
+    label = "Bilingual HTML (side by side)"
+    renders_source = True
+    style = HTML_STYLE + BILINGUAL_STYLE
+
+    def chapter_html(self, chapter):
+        _, source, translated = chapter
+        return (f'<div class="bilingual">\n<div class="source">{self.body(source)}</div>\n'
+                f'<div class="translation">{self.body(translated)}</div>\n</div>')
+
+
+class MarkdownExporter(Exporter):
+    """A folder with one Markdown file per chapter and an index; nothing is rendered."""
+    label = "Markdown folder"
+    extension = ""
+    renders_translation = False
+
+    def write(self, output_path, metadata, chapters, progress=None):
+        os.makedirs(output_path, exist_ok=True)
+        first = metadata.get("first_chapter", 1)
+        width = max(4, len(str(first + len(chapters))))
+        total = len(chapters)
+        with open(os.path.join(output_path, "index.md"), "w", encoding="utf-8") as index:
+            index.write(f"# {metadata['title']}\n\n")
+            for number, (title, _, translated) in enumerate(chapters, 1):
+                file_name = f"{first + number - 1:0{width}d} {safe_filename(title)}.md"
+                with open(os.path.join(output_path, file_name), "w", encoding="utf-8") as f:
+                    f.write(f"# {title}\n\n{translated.strip()}\n")
+                index.write(f"{number}. [{title}](<{file_name}>)\n")
+                if progress and (number % 100 == 0 or number == total):
+                    progress(number, total, f"Writing Markdown: {number}/{total} chapters")
+
+
+EXPORTERS: Dict[str, type] = {
+    "epub": EpubExporter,
+    "html": HtmlExporter,
+    "markdown": MarkdownExporter,
+    "bilingual_html": BilingualHtmlExporter,
+}
+
+
+def export_project(project_data: Dict[str, Any], output_path: str, format_name: str = "epub",
+                   cache_dir: Optional[str] = None, volume_size: int = 0, stylesheet: Optional[str] = None,
+                   progress: Optional[ProgressCallback] = None, workers: Optional[int] = None) -> Tuple[bool, str]:
+    """Export the project's items in `format_name`, split into volumes of `volume_size` chapters (0: one file).
+
+    Volume paths come from `volume_paths`. `stylesheet` replaces the format's
+    default CSS. Returns (success, error message).
+    """
+    if not project_data or 'items' not in project_data:
+        return False, "Invalid project data provided."
+    exporter_class = EXPORTERS.get(format_name)
+    if not exporter_class:
+        return False, f"Unknown export format: {format_name}"
+
+    title = project_data.get('title', 'Untitled Project')
+    chapters = [(item.get('name', f'Item {i+1}'), item.get('source_text', ''), item.get('translated_text', ''))
+                for i, item in enumerate(project_data['items'])]
+    paths = volume_paths(output_path, len(chapters), volume_size)
+    size = volume_size if len(paths) > 1 else len(chapters)
+
+    temporary = None
+    if cache_dir is None:
+        temporary = cache_dir = tempfile.mkdtemp(prefix="sagatrans-export-")
+    try:
+        renderer = ChapterRenderer(cache_dir, workers)
+        exporter = exporter_class(renderer, stylesheet)
+        keys = exporter.prepare(chapters, progress)
+        for number, path in enumerate(paths, 1):
+            metadata = {
+                "identifier": title.replace(' ', '_'),  # Simple identifier
+                "title": title,
+                "language": language_code(project_data.get('target_language', '')),
+                "author": project_data.get('author', 'SagaTrans'),
+                "description": project_data.get('description', ''),
+                "first_chapter": (number - 1) * size + 1
+            }
+            if len(paths) > 1:
+                metadata["identifier"] += f"_vol{number}"
+                metadata["title"] = f"{title} - Volume {number}"
+                if progress:
+                    progress(number - 1, len(paths), f"Writing volume {number} of {len(paths)}...")
+            exporter.write(path, metadata, chapters[(number - 1) * size:number * size], progress)
+        if keys:
+            # Keep every render an item's current source or translation may need, whichever format made it
+            renderer.prune({chapter_key(text) for _, source, translated in chapters
+                            for text in (source, translated)})
+        return True, ""
+    except Exception as e:
+        return False, f"Error writing {exporter_class.label} export: {e}"
+    finally:
+        if temporary:
+            shutil.rmtree(temporary, ignore_errors=True)
@@ -0,0 +1,140 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+GLOSSARY_INTRO = "\nUse these glossary translations consistently (source term -> {target_language}):"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _needs_boundaries(term: str) -> bool:
+    """Terms in scripts with word breaks must match whole words; CJK terms match anywhere."""
+    return any(char.isalpha() and ord(char) < 0x2E80 for char in term)
+
+
+class GlossaryMatcher:
+    """Aho–Corasick automaton over glossary source terms.
+
+    Finds every term occurring in a text in one pass, O(len(text) + matches),
+    independent of the glossary size. Matching is case-insensitive; terms
+    written in scripts with word breaks only match as whole words.
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms = terms
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._boundaries = [_needs_boundaries(term) for term in terms]
+        self._lengths = [len(term.lower()) for term in terms]
+        for term_index, term in enumerate(terms):
+            self._insert(term.lower(), term_index)
+        self._build_failure_links()
+
+    def _insert(self, term: str, term_index: int) -> None:
+        if not term:
+            return
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(term_index)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(start offset, term index) of every match, in text order."""
+        # Offsets refer to the lowercased text, which differs from `text` only for rare ligatures
+        lowered = text.lower()
+        matches = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for term_index in self._output[state]:
+                start = position - self._lengths[term_index] + 1
+                if self._boundaries[term_index]:
+                    if start > 0 and _is_word_char(lowered[start - 1]):
+                        continue
+                    if position + 1 < len(lowered) and _is_word_char(lowered[position + 1]):
+                        continue
+                matches.append((start, term_index))
+        matches.sort()
+        return matches
+
+    def find(self, text: str) -> List[int]:
+        """Indices of the terms occurring in `text`, ordered by first occurrence."""
+        seen = {}
+        for start, term_index in self.find_all(text):
+            seen.setdefault(term_index, start)
+        return sorted(seen, key=seen.get)
+
+
+class Glossary:
+    """Term pairs of a project (`project["glossary"]`) with a cached matcher.
+
+    Each entry is a dict with "source", "target" and an optional "note". The
+    automaton is rebuilt only when the list of source terms changes.
+    """
+
+    def __init__(self):
+        self._terms_key: Optional[tuple] = None
+        self._matcher: Optional[GlossaryMatcher] = None
+        self._entry_indices: List[int] = []
+        self._last_query: Optional[Tuple[str, tuple]] = None
+        self._last_result: List[int] = []
+
+    def _ensure_matcher(self, entries: List[Dict[str, Any]]) -> None:
+        usable = [(i, entry.get("source", "").strip()) for i, entry in enumerate(entries)
+                  if entry.get("source", "").strip() and entry.get("target", "").strip()]
+        terms_key = tuple(term for _, term in usable)
+        if terms_key != self._terms_key:
+            self._terms_key = terms_key
+            self._entry_indices = [i for i, _ in usable]
+            self._matcher = GlossaryMatcher(list(terms_key)) if usable else None
+            self._last_query = None
+
+    def matching_entries(self, entries: List[Dict[str, Any]], text: str) -> List[Dict[str, Any]]:
+        """Entries whose source term occurs in `text`, ordered by first occurrence."""
+        if not entries or not text:
+            return []
+        self._ensure_matcher(entries)
+        if self._matcher is None:
+            return []
+        # Context planning asks for the same item's matches on every refresh
+        if self._last_query is None or self._last_query[0] != text or self._last_query[1] != self._terms_key:
+            self._last_result = self._matcher.find(text)
+            self._last_query = (text, self._terms_key)
+        return [entries[self._entry_indices[term_index]] for term_index in self._last_result]
+
+
+def render_glossary_block(entries: List[Dict[str, Any]], target_language: str) -> str:
+    """Glossary section of the system prompt, or '' when no entry applies."""
+    if not entries:
+        return ""
+    lines = [GLOSSARY_INTRO.format(target_language=target_language)]
+    for entry in entries:
+        line = f"- {entry['source'].strip()} -> {entry['target'].strip()}"
+        note = entry.get("note", "").strip()
+        if note:
+            line += f" ({note})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,204 @@
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Candidate terms kept per item; the rest are noise that never reaches the thresholds
+MAX_CANDIDATES_PER_ITEM = 60
+
+# A candidate must occur this often overall and in this many items
+DEFAULT_MIN_COUNT = 3
+DEFAULT_MIN_ITEMS = 2
+
+# Terms per translation-proposal request
+PROPOSAL_BATCH_SIZE = 40
+
+# Below this many items the process pool costs more than it saves
+MIN_ITEMS_FOR_POOL = 16
+
+_TOKEN_RE = re.compile(r"[^\W\d_][\w'’-]*|[.!?…。！？:;\"“”«»()\n]", re.UNICODE)
+_CJK_RUN_RE = re.compile(r"[㐀-䶿一-鿿゠-ヿ]{2,}")
+
+PROPOSAL_PROMPT = (
+    "You are building a translation glossary for a novel translated into {target_language}. "
+    "For every source term below, give the translation that should be used consistently. "
+    "Keep personal names recognisable; translate titles, places and invented terms as a "
+    "professional literary translator would. Respond with only a JSON object mapping each "
+    "source term exactly as given to its {target_language} translation."
+)
+
+
+def _is_capitalized(token: str) -> bool:
+    return token[:1].isupper()
+
+
+def extract_candidates(text: str) -> Dict[str, int]:
+    """Candidate glossary terms of one text with their occurrence counts.
+
+    - Capitalized word sequences of up to three words that do not start a
+      sentence (names, places, titles). Words that also occur in lowercase in
+      the same text are common words and are dropped as single-word terms.
+    - For CJK text, which has no capitalization, repeated runs of 2-4
+      characters, keeping only the longest run among those with equal counts.
+
+    Runs in worker processes, so it only takes and returns plain data.
+    """
+    counts: Counter = Counter()
+    lowercase_words = set()
+    sentence_start = True
+    current: List[str] = []
+
+    def flush():
+        if current:
+            for size in range(1, min(3, len(current)) + 1):
+                for start in range(len(current) - size + 1):
+                    counts[" ".join(current[start:start + size])] += 1
+            current.clear()
+
+    for token in _TOKEN_RE.findall(text):
+        if not token[0].isalpha():
+            flush()
+            sentence_start = sentence_start or token in ".!?…。！？:\n\"“«"
+            continue
+        if _is_capitalized(token) and not sentence_start:
+            current.append(token)
+        else:
+            flush()
+            if not _is_capitalized(token):
+                lowercase_words.add(token)
+        sentence_start = False
+    flush()
+
+    for term in list(counts):
+        if " " not in term and term.lower() in lowercase_words:
+            del counts[term]
+
+    cjk_counts: Counter = Counter()
+    for run in _CJK_RUN_RE.findall(text):
+        for size in range(2, 5):
+            for start in range(len(run) - size + 1):
+                cjk_counts[run[start:start + size]] += 1
+    # "魔王" is subsumed by "魔王城" when it never occurs on its own
+    longest_extension: Dict[str, int] = {}
+    for term, count in cjk_counts.items():
+        if len(term) > 2:
+            for part in (term[:-1], term[1:]):
+                longest_extension[part] = max(longest_extension.get(part, 0), count)
+    for term, count in cjk_counts.items():
+        if count >= 2 and longest_extension.get(term, 0) < count:
+            counts[term] += count
+
+    return dict(counts.most_common(MAX_CANDIDATES_PER_ITEM))
+
+
+def scan_texts(texts: Dict[str, str], workers: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    """Run `extract_candidates` over {key: text}, in parallel across cores for large batches."""
+    if not texts:
+        return {}
+    keys = list(texts)
+    if len(keys) < MIN_ITEMS_FOR_POOL or workers == 1:
+        return {key: extract_candidates(texts[key]) for key in keys}
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(keys) // (workers * 4))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(extract_candidates, (texts[key] for key in keys), chunksize=chunksize)
+            return dict(zip(keys, results))
+    except (OSError, RuntimeError) as e:
+        print(f"Warning: Parallel glossary scan failed, scanning in-process: {e}")
+        return {key: extract_candidates(texts[key]) for key in keys}
+
+
+def aggregate_candidates(per_item: Iterable[Dict[str, int]], known_terms: Iterable[str] = (),
+                         min_count: int = DEFAULT_MIN_COUNT, min_items: int = DEFAULT_MIN_ITEMS,
+                         limit: int = 500) -> List[Tuple[str, int, int]]:
+    """Merge per-item candidates into (term, total count, item count), most widespread first."""
+    totals: Counter = Counter()
+    spread: Counter = Counter()
+    for candidates in per_item:
+        for term, count in candidates.items():
+            totals[term] += count
+            spread[term] += 1
+
+    known = {term.strip().lower() for term in known_terms}
+    results = [(term, totals[term], spread[term]) for term in totals
+               if totals[term] >= min_count and spread[term] >= min_items and term.lower() not in known]
+
+    results.sort(key=lambda row: (-row[2], -row[1], row[0]))
+    results = results[:limit * 2]
+
+    # A shorter term that only ever occurs inside a longer candidate adds nothing
+    longer_terms = [term for term, _, _ in results if " " in term]
+    results = [(term, count, items) for term, count, items in results
+               if not any(term != other and term in other.split() and totals[other] >= count
+                          for other in longer_terms)]
+    return results[:limit]
+
+
+def build_proposal_payload(model_name: str, target_language: str, terms: List[str]) -> Dict[str, Any]:
+    return {
+        "model": model_name,
+        "messages": [
+            {"role": "system", "content": PROPOSAL_PROMPT.format(target_language=target_language)},
+            {"role": "user", "content": "\n".join(terms)}
+        ],
+        "stream": True,
+        "Target_Language": target_language
+    }
+
+
+def parse_proposals(response: str, terms: List[str]) -> Dict[str, str]:
+    """Read the model's {term: translation} reply; falls back to 'term: translation' lines."""
+    wanted = {term.lower(): term for term in terms}
+    proposals: Dict[str, str] = {}
+
+    start, end = response.find("{"), response.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(response[start:end + 1])
+            if isinstance(data, dict):
+                for key, value in data.items():
+                    term = wanted.get(str(key).strip().lower())
+                    if term and isinstance(value, str) and value.strip():
+                        proposals[term] = value.strip()
+                return proposals
+        except json.JSONDecodeError:
+            pass
+
+    for line in response.splitlines():
+        for separator in ("->", "=>", "\t", ":", "="):
+            if separator in line:
+                key, value = line.split(separator, 1)
+                term = wanted.get(key.strip(" -*\"'").lower())
+                if term and value.strip(" \"',"):
+                    proposals[term] = value.strip(" \"',")
+                break
+    return proposals
+
+
+def scan_cache_path(project_file: str) -> str:
+    """Sidecar file with per-item scan results (not *.json, so it is never listed as a project)."""
+    return os.path.splitext(project_file)[0] + ".termscan"
+
+
+def load_scan_cache(path: str) -> Dict[str, Dict[str, int]]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read glossary scan cache {path}: {e}")
+        return {}
+
+
+def save_scan_cache(path: str, cache: Dict[str, Dict[str, int]]) -> None:
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"Warning: Could not write glossary scan cache {path}: {e}")
@@ -0,0 +1,21 @@
+import hashlib
+import json
+
+
+def text_hash(*parts: str) -> str:
+    """Stable short hash of one or more strings, used to version item content."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")  # Separator, so ("ab", "c") != ("a", "bc")
+    return digest.hexdigest()[:16]
+
+
+def item_source_hash(item: dict) -> str:
+    """Hash of the text a translation or summary of `item` is produced from."""
+    return text_hash(item.get("source_text", "").strip())
+
+
+def prompt_hash(templates: dict, target_language: str, glossary_block: str = "") -> str:
+    """Hash of the instructions a translation is produced with: prompt templates, language and glossary."""
+    return text_hash(json.dumps(templates, sort_keys=True, ensure_ascii=False), target_language, glossary_block)
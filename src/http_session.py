@@ -0,0 +1,27 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host; batches stream several chapters to the same server at once
+POOL_MAXSIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The process-wide HTTP session shared by all model adapters.
+
+    Reusing it keeps TCP and TLS connections alive between requests instead of
+    opening a new connection per chapter.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
@@ -84,8 +84,8 @@ class ModelManager:
             raise ValueError("Configuration must contain 'providers' key")
         
         for provider_name, provider_data in config["providers"].items():
-            if "endpoint" not in provider_data:
-                raise ValueError(f"Provider {provider_name} missing required 'endpoint'")
+            if "endpoint" not in provider_data and not provider_data.get("endpoints"):
+                raise ValueError(f"Provider {provider_name} missing required 'endpoint' or 'endpoints'")
             if "models" not in provider_data:
                 raise ValueError(f"Provider {provider_name} missing required 'models'")
             
@@ -3,6 +3,9 @@ from typing import Generator, Dict, Any, Optional
 
 class ModelRequestHandler(ABC):
     """Abstract base class for model request handlers"""
+
+    # {"prompt_tokens", "completion_tokens"} reported by the provider for the last request, if any
+    last_usage: Optional[Dict[str, int]] = None
     
     @abstractmethod
     def validate_connection(self) -> bool:
@@ -24,6 +27,21 @@ class ModelRequestHandler(ABC):
         """Convert standardized parameters to provider-specific format"""
         pass
         
+    def complete(self, payload: Dict[str, Any]) -> str:
+        """Send request to model without streaming and return the whole response text.
+
+        For background work nobody watches live. Providers without a
+        non-streaming mode collect their stream.
+        """
+        return "".join(self.send_request(payload))
+
+    def warm_up(self) -> bool:
+        """Prepare the model before a batch of requests, e.g. load it into memory.
+
+        Providers without a warm-up step do nothing.
+        """
+        return True
+
     @staticmethod
     def create_handler(model_id: str, config: Dict[str, Any]) -> Optional['ModelRequestHandler']:
         """Factory method to create appropriate handler based on model ID"""
@@ -39,11 +57,16 @@ class ModelRequestHandler(ABC):
             provider = 'ollama'  # Default provider
             model_name = model_id
             
+        # A provider entry may name its API type, e.g. "type": "openai" for a local vLLM server
+        provider_type = config.get('type', provider)
         try:
-            if provider == 'ollama':
+            if provider_type == 'openai':
+                from openai_adapter import OpenAICompatibleAdapter
+                return OpenAICompatibleAdapter(model_id, config)
+            if provider_type == 'ollama':
                 from ollama_adapter import OllamaAdapter
                 return OllamaAdapter(model_id, config)  # Pass full model_id to preserve prefix
-            elif provider == 'openrouter':
+            elif provider_type == 'openrouter':
                 from openrouter_adapter import OpenRouterAdapter
                 return OpenRouterAdapter(model_id, config)  # Pass full model_id
                 
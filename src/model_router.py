@@ -0,0 +1,192 @@
+import queue
+import threading
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from model_request_handler import ModelRequestHandler
+
+# Seconds without a first token before the next model of the chain is started as well; 0 disables hedging
+DEFAULT_HEDGE_AFTER_SECONDS = 0
+
+
+def routing_chain(model_id: str, project_data: Optional[Dict[str, Any]]) -> List[str]:
+    """The project model followed by its `fallback_models`, without duplicates."""
+    chain = [model_id]
+    for fallback in (project_data or {}).get('fallback_models', []) or []:
+        if fallback and fallback not in chain:
+            chain.append(fallback)
+    return chain
+
+
+def hedge_after_seconds(project_data: Optional[Dict[str, Any]]) -> float:
+    try:
+        return max(0.0, float((project_data or {}).get('hedge_after_seconds', DEFAULT_HEDGE_AFTER_SECONDS)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def create_routed_handler(chain: List[str], model_manager, hedge_after: float = 0) -> Optional[ModelRequestHandler]:
+    """A handler for the first model of `chain` that falls back to the others.
+
+    Models without a configuration or supported provider are left out. A chain
+    of a single model returns that model's own handler.
+    """
+    handlers = []
+    for model_id in chain:
+        model_config = model_manager.get_model_config(model_id) if model_manager else None
+        handler = ModelRequestHandler.create_handler(model_id, model_config) if model_config else None
+        if handler:
+            handlers.append((model_id, handler))
+    if not handlers:
+        return None
+    if len(handlers) == 1:
+        return handlers[0][1]
+    return RoutedRequestHandler(handlers, hedge_after)
+
+
+class RoutedRequestHandler(ModelRequestHandler):
+    """Sends a request through an ordered chain of models.
+
+    A model that fails before streaming anything hands over to the next one.
+    With `hedge_after` set, the next model is also started when the current
+    ones have not produced a first token within that many seconds; the first
+    stream to produce a token wins and the others are cancelled. Once text has
+    been streamed there is no failover, since the output would be mixed.
+    """
+
+    def __init__(self, handlers: List[Tuple[str, ModelRequestHandler]], hedge_after: float = 0):
+        self.handlers = list(handlers)
+        self.hedge_after = hedge_after
+        self.model_id = self.handlers[0][0]
+        self.active_model_id = None  # model whose stream won the last request
+        # (model ID, text streamed before cancellation) of the models that lost the last
+        # hedged race; their providers bill the prompt all the same
+        self.cancelled_requests: List[Tuple[str, str]] = []
+        self._events = None
+        self._cancel = []
+
+    def validate_connection(self) -> bool:
+        """Checks the primary model only; the fallbacks count as reachable until a request to them fails.
+
+        An unreachable primary still passes, since `_route` fails over to the
+        fallbacks when its request errors.
+        """
+        model_id, handler = self.handlers[0]
+        if not handler.validate_connection():
+            print(f"Warning: Model {model_id} is not reachable, falling back to {self.handlers[1][0]}")
+        return True
+
+    def warm_up(self) -> bool:
+        return self.handlers[0][1].warm_up()
+
+    def get_parameters(self) -> Dict[str, Any]:
+        return self.handlers[0][1].get_parameters()
+
+    def convert_parameters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self.handlers[0][1].convert_parameters(params)
+
+    @staticmethod
+    def _pump(index, handler, payload, events, cancel, streaming):
+        """Stream one model into the shared event queue until done, failed or cancelled.
+
+        Without streaming the whole answer arrives as a single chunk.
+        """
+        if not streaming:
+            try:
+                text = handler.complete(payload)
+                if not cancel.is_set():
+                    events.put((index, "chunk", text))
+                    events.put((index, "done", None))
+            except Exception as e:
+                events.put((index, "error", e))
+            return
+        stream = handler.send_request(payload)
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    return
+                events.put((index, "chunk", chunk))
+            events.put((index, "done", None))
+        except Exception as e:
+            events.put((index, "error", e))
+        finally:
+            stream.close()
+
+    def _start(self, index, payload, streaming):
+        cancel = threading.Event()
+        self._cancel.append(cancel)
+        threading.Thread(
+            target=self._pump, args=(index, self.handlers[index][1], payload, self._events, cancel, streaming),
+            daemon=True
+        ).start()
+
+    def close(self):
+        """Cancel every running stream; called when the translation is stopped."""
+        for cancel in self._cancel:
+            cancel.set()
+        if self._events is not None:
+            self._events.put((None, "closed", None))
+
+    def send_request(self, payload: Dict[str, Any]) -> Generator[str, None, None]:
+        return self._route(payload, streaming=True)
+
+    def complete(self, payload: Dict[str, Any]) -> str:
+        """The whole answer, with fallback but without hedging: a complete answer always takes longer than a first token."""
+        return "".join(self._route(payload, streaming=False))
+
+    def _route(self, payload: Dict[str, Any], streaming: bool) -> Generator[str, None, None]:
+        self._events = events = queue.Queue()
+        self._cancel = []
+        self.active_model_id = None
+        self.last_usage = None
+        self.cancelled_requests = []
+        winner = None
+        failed = set()
+        partial = {}
+        last_error = None
+        self._start(0, payload, streaming)
+        try:
+            while True:
+                hedging = (streaming and winner is None and self.hedge_after > 0
+                           and len(self._cancel) < len(self.handlers))
+                try:
+                    index, kind, value = events.get(timeout=self.hedge_after if hedging else None)
+                except queue.Empty:
+                    # No first token yet: race the next model against the running ones
+                    self._start(len(self._cancel), payload, streaming)
+                    continue
+
+                if kind == "closed":
+                    return
+                if winner is None:
+                    if kind == "error":
+                        failed.add(index)
+                        last_error = value
+                        print(f"Warning: Model {self.handlers[index][0]} failed: {value}")
+                        if len(self._cancel) < len(self.handlers):
+                            self._start(len(self._cancel), payload, streaming)
+                        elif len(failed) == len(self._cancel):
+                            raise last_error
+                        continue
+                    winner = index
+                    self.active_model_id = self.handlers[index][0]
+                    for other, cancel in enumerate(self._cancel):
+                        if other != winner:
+                            cancel.set()
+                if index != winner:
+                    if kind == "chunk":
+                        partial.setdefault(index, []).append(value)
+                    elif kind == "error":
+                        failed.add(index)
+                    continue
+                if kind == "chunk":
+                    yield value
+                elif kind == "done":
+                    self.last_usage = self.handlers[winner][1].last_usage
+                    return
+                else:
+                    raise value
+        finally:
+            for cancel in self._cancel:
+                cancel.set()
+            self.cancelled_requests = [(self.handlers[index][0], "".join(partial.get(index, ())))
+                                       for index in range(len(self._cancel)) if index != winner and index not in failed]
@@ -1,38 +1,53 @@
 import requests
-import json
 from typing import Generator, Dict, Any
 from model_request_handler import ModelRequestHandler
+from endpoint_pool import get_pool, parse_endpoints
+from http_session import get_session
+from stream_decoder import StreamError, ollama_deltas, response_chunks
+
+# Ollama runtime options passed through unchanged when set in the model's parameters
+OLLAMA_RUNTIME_OPTIONS = (
+    "num_batch", "num_thread", "num_gpu", "main_gpu", "num_keep", "num_predict",
+    "repeat_penalty", "repeat_last_n", "presence_penalty", "frequency_penalty",
+    "min_p", "typical_p", "stop", "numa", "low_vram"
+)
 
 class OllamaAdapter(ModelRequestHandler):
     def __init__(self, model_id: str, config: Dict[str, Any]):
         self.model_id = model_id  # Keep full ID for API requests
         self.config = config
-        self.endpoint = config['endpoint']  # Required - no default
-        if not self.endpoint.startswith(('http://', 'https://')):
-            self.endpoint = f'http://{self.endpoint}'
+        # `endpoint` or a list of weighted `endpoints`; requests go to the least-loaded healthy one
+        self.pool = get_pool(parse_endpoints(config))
+        if not self.pool.urls():
+            raise ValueError("Ollama provider has no endpoint configured")
+        self.endpoint = self.pool.urls()[0]
         # Remove only the first segment (provider prefix) for validation
         self.model_name = '/'.join(model_id.split('/')[1:])  # Gets "hf.co/unsloth/..."
 
-    def validate_connection(self) -> bool:
+    def _has_model(self, endpoint: str) -> bool:
         try:
-            response = requests.get(
-                f"{self.endpoint}/api/tags",
+            response = get_session().get(
+                f"{endpoint}/api/tags",
                 timeout=(3.05, 600)  # Connect timeout 3.05s, read timeout 600s (10 min)
             )
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 # Check model_name (without provider prefix) since server doesn't include it
-                if not any(m['name'] == self.model_name for m in models):
-                    return False
-                return True
+                return any(m['name'] == self.model_name for m in models)
             return False
         except requests.exceptions.RequestException as e:
             return False
 
-    def send_request(self, payload: Dict[str, Any]) -> Generator[str, None, None]:
-        url = f"{self.endpoint}/api/chat"
-        headers = {"Content-Type": "application/json"}
-        
+    def validate_connection(self) -> bool:
+        """True when at least one endpoint serves the model; endpoints that don't are marked unhealthy."""
+        for endpoint in self.pool.ranked():
+            available = self._has_model(endpoint)
+            self.pool.report(endpoint, available)
+            if available:
+                return True
+        return False
+
+    def _chat_payload(self, payload: Dict[str, Any], stream: bool) -> Dict[str, Any]:
         # Convert messages to Ollama format
         messages = []
         for msg in payload['messages']:
@@ -47,40 +62,124 @@ class OllamaAdapter(ModelRequestHandler):
         ollama_payload = {
             "model": self.model_name,  # Use base model name known by Ollama server
             "messages": messages,
-            "stream": True,
+            "stream": stream,
             "options": options
         }
+        keep_alive = self._keep_alive()
+        if keep_alive is not None:
+            ollama_payload["keep_alive"] = keep_alive
+        return ollama_payload
+
+    def send_request(self, payload: Dict[str, Any]) -> Generator[str, None, None]:
+        return self._with_failover(self._chat_payload(payload, stream=True))
+
+    def complete(self, payload: Dict[str, Any]) -> str:
+        return "".join(self._with_failover(self._chat_payload(payload, stream=False)))
 
+    def _with_failover(self, ollama_payload: Dict[str, Any]) -> Generator[str, None, None]:
+        headers = {"Content-Type": "application/json"}
+        self.last_usage = None
+        # Fail over to the next endpoint while nothing has been streamed yet
+        tried = []
+        last_error = None
+        while True:
+            endpoint = self.pool.acquire(exclude=tried)
+            if endpoint is None:
+                if last_error is None:
+                    raise Exception(f"No available Ollama endpoint for {self.model_id}: all are busy")
+                raise last_error
+            tried.append(endpoint)
+            self.endpoint = endpoint
+            streamed = False
+            success = False
+            try:
+                for chunk in self._chat(endpoint, ollama_payload, headers):
+                    streamed = True
+                    yield chunk
+                success = True
+                return
+            except GeneratorExit:
+                success = True  # Stopped by the caller, not an endpoint failure
+                raise
+            except Exception as e:
+                if streamed:
+                    raise
+                last_error = e
+            finally:
+                self.pool.release(endpoint, success)
+
+    def _chat(self, endpoint: str, ollama_payload: Dict[str, Any], headers: Dict[str, str]) -> Generator[str, None, None]:
+        """Text of one /api/chat request: streamed deltas, or the whole answer at once for non-streaming payloads."""
         try:
-            with requests.post(
-                url, 
+            with get_session().post(
+                f"{endpoint}/api/chat",
                 json=ollama_payload, 
                 headers=headers, 
-                stream=True,
+                stream=ollama_payload["stream"],
                 timeout=(3.05, 600)  # Connect timeout 3.05s, read timeout 600s (10 min)
             ) as response:
                 response.raise_for_status()
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            chunk = json.loads(line)
-                            if chunk.get("message") and chunk["message"].get("content"):
-                                yield chunk["message"]["content"]
-                            elif chunk.get("done", False):
-                                break
-                        except json.JSONDecodeError:
-                            continue
+                if not ollama_payload["stream"]:
+                    result = response.json()
+                    if result.get("error"):
+                        raise StreamError(str(result["error"]))
+                    self.last_usage = {"prompt_tokens": result.get("prompt_eval_count", 0),
+                                       "completion_tokens": result.get("eval_count", 0)}
+                    content = (result.get("message") or {}).get("content") or ""
+                    if content:
+                        yield content
+                    return
+                for delta in ollama_deltas(response_chunks(response)):
+                    if delta.content:
+                        yield delta.content
+                    if delta.done:
+                        self.last_usage = delta.usage
+        except StreamError as e:
+            raise Exception(f"Ollama error: {e} ({endpoint})")
         except requests.exceptions.Timeout:
-            raise Exception("Ollama request timed out - server not responding")
+            raise Exception(f"Ollama request timed out - server not responding ({endpoint})")
         except requests.exceptions.ConnectionError:
-            raise Exception("Could not connect to Ollama server - check if it's running")
+            raise Exception(f"Could not connect to Ollama server at {endpoint} - check if it's running")
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
-                raise Exception(f"Model not found: {self.model_id}")
+                raise Exception(f"Model not found: {self.model_id} ({endpoint})")
             raise Exception(f"Ollama API error: {str(e)}")
         except requests.exceptions.RequestException as e:
             raise Exception(f"Ollama request failed: {str(e)}")
 
+    def _keep_alive(self):
+        """How long the server keeps the model loaded after a request ("30m", -1 for always).
+
+        Set per model in `parameters` or for the whole provider in models.json.
+        """
+        return self.config.get('parameters', {}).get('keep_alive', self.config.get('keep_alive'))
+
+    def warm_up(self) -> bool:
+        """Load the model on every healthy endpoint with the options later requests use.
+
+        A request without a prompt only loads the model. Different options such as
+        num_ctx would make the server reload it on the first real request.
+        """
+        payload = {
+            "model": self.model_name,
+            "options": self._convert_parameters(self.config.get('parameters', {}))
+        }
+        keep_alive = self._keep_alive()
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        loaded = False
+        for endpoint in self.pool.urls():
+            if not self.pool.is_healthy(endpoint):
+                continue
+            try:
+                response = get_session().post(f"{endpoint}/api/generate", json=payload, timeout=(3.05, 600))
+                ok = response.status_code == 200
+            except requests.exceptions.RequestException:
+                ok = False
+            self.pool.report(endpoint, ok)
+            loaded = loaded or ok
+        return loaded
+
     def get_parameters(self) -> Dict[str, Any]:
         return self.config.get('parameters', {})
 
@@ -102,6 +201,13 @@ class OllamaAdapter(ModelRequestHandler):
         seed = params.get("seed", -1)
         if seed >= 0:
             options["seed"] = seed
+
+        # Throughput and sampling knobs
+        for name in OLLAMA_RUNTIME_OPTIONS:
+            if name in params:
+                options[name] = params[name]
+        if "num_predict" not in options and "max_tokens_completion" in params:
+            options["num_predict"] = params["max_tokens_completion"]
         
         # Add thinking mode if specified in config
         if 'options' in self.config and 'thinking' in self.config['options']:
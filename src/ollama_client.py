@@ -1,20 +1,12 @@
 import requests
 import json
-import tiktoken
 from typing import Generator
+from http_session import get_session
+from tokenizer_registry import count_tokens as count_model_tokens
 
-# Tokenizer for consistent token counting with OpenRouter
-try:
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-except Exception as e:
-    print(f"Warning: Failed to initialize tokenizer: {e}")
-    tokenizer = None
-
-def count_tokens(text: str) -> int:
-    """Counts approximate tokens matching OpenRouter's counting method."""
-    if tokenizer:
-        return len(tokenizer.encode(text))
-    return len(text) // 4  # Fallback approximation
+def count_tokens(text: str, model: str = "") -> int:
+    """Counts tokens with the tokenizer of `model` (see tokenizer_registry)."""
+    return count_model_tokens(text, f"ollama/{model}" if model else "")
 
 def get_ollama_stream(endpoint: str, model: str, messages: list, parameters: dict) -> Generator[str, None, None]:
     """
@@ -58,7 +50,7 @@ def get_ollama_stream(endpoint: str, model: str, messages: list, parameters: dic
     }
 
     try:
-        with requests.post(url, json=payload, headers=headers, stream=True) as response:
+        with get_session().post(url, json=payload, headers=headers, stream=True) as response:
             response.raise_for_status()
             
             for line in response.iter_lines():
@@ -76,3 +68,25 @@ def get_ollama_stream(endpoint: str, model: str, messages: list, parameters: dic
         raise
     except Exception as e:
         raise
+
+def get_ollama_embeddings(endpoint: str, model: str, texts: list) -> list:
+    """
+    Gets embeddings for a batch of texts from Ollama's /api/embed endpoint.
+
+    Args:
+        endpoint: Ollama server endpoint (e.g., "http://localhost:11434")
+        model: The embedding model name (e.g., "nomic-embed-text")
+        texts: Texts to embed
+
+    Returns:
+        list: One vector per input text, in input order
+
+    Raises:
+        requests.exceptions.RequestException: On network errors
+    """
+    if not endpoint.startswith(('http://', 'https://')):
+        endpoint = f'http://{endpoint}'
+    url = f"{endpoint.rstrip('/')}/api/embed"
+    response = get_session().post(url, json={"model": model, "input": texts}, timeout=(3.05, 600))
+    response.raise_for_status()
+    return response.json().get("embeddings", [])
@@ -0,0 +1,145 @@
+from typing import Generator, Dict, Any, Optional, Tuple
+
+import requests
+
+from model_request_handler import ModelRequestHandler
+from http_session import get_session
+from stream_decoder import StreamError, openai_deltas, parse_usage, response_chunks
+
+
+def chat_completions_url(endpoint: str) -> str:
+    """Chat completions URL for a base endpoint such as "http://localhost:8000/v1"."""
+    endpoint = endpoint.rstrip('/')
+    if endpoint.endswith('/chat/completions'):
+        return endpoint
+    return f"{endpoint}/chat/completions"
+
+
+def parse_completion(body: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]]]:
+    """(text, usage) of a non-streaming chat completion response; raises StreamError for error responses."""
+    error = body.get("error")
+    if error:
+        raise StreamError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+    choices = body.get("choices") or [{}]
+    text = (choices[0].get("message") or {}).get("content") or ""
+    return text, parse_usage(body.get("usage"))
+
+
+class OpenAICompatibleAdapter(ModelRequestHandler):
+    """Any server with an OpenAI-style chat completions API: vLLM, llama.cpp server, LM Studio, ...
+
+    Selected for providers with `"type": "openai"` in models.json. The
+    provider's `endpoint` is the API base URL and `api_key` is optional.
+    """
+
+    def __init__(self, model_id: str, config: Dict[str, Any]):
+        self.model_id = model_id
+        self.config = config
+        if not config.get("endpoint"):
+            raise ValueError(f"No endpoint configured for {model_id}")
+        self.endpoint = chat_completions_url(config["endpoint"])
+        self.base_url = self.endpoint[:-len('/chat/completions')]
+        self.api_key = config.get("api_key")
+        # Model name known by the server, without the provider prefix
+        self.model_name = '/'.join(model_id.split('/')[1:]) or model_id
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def validate_connection(self) -> bool:
+        try:
+            response = get_session().get(f"{self.base_url}/models", headers=self.headers(), timeout=5)
+            if response.status_code != 200:
+                return False
+            served = [model.get("id") for model in response.json().get("data", [])]
+            # Servers that load a single model may report it under a different name
+            return not served or self.model_name in served or len(served) == 1
+        except (requests.exceptions.RequestException, ValueError):
+            return False
+
+    def request_body(self, payload: Dict[str, Any], stream: bool = True) -> Dict[str, Any]:
+        """Chat completion request for `payload`; also used for the lines of batch jobs."""
+        body = {
+            "model": self.model_name,
+            "messages": payload["messages"],
+            "stream": stream,
+            **self._convert_parameters(self.config.get('parameters', {}))
+        }
+        if stream:
+            # Servers that support it send real token counts in a final chunk
+            body["stream_options"] = {"include_usage": True}
+        return body
+
+    def send_request(self, payload: Dict[str, Any]) -> Generator[str, None, None]:
+        return self._request(self.request_body(payload))
+
+    def complete(self, payload: Dict[str, Any]) -> str:
+        return "".join(self._request(self.request_body(payload, stream=False)))
+
+    def _request(self, request_payload: Dict[str, Any]) -> Generator[str, None, None]:
+        self.last_usage = None
+        try:
+            with get_session().post(self.endpoint, json=request_payload, headers=self.headers(),
+                                    stream=request_payload["stream"], timeout=(3.05, 600)) as response:
+                if response.status_code == 400 and "stream_options" in response.text:
+                    # Older servers reject stream_options; retry without usage reporting
+                    del request_payload["stream_options"]
+                    yield from self._stream(request_payload)
+                    return
+                response.raise_for_status()
+                if not request_payload["stream"]:
+                    text, self.last_usage = parse_completion(response.json())
+                    if text:
+                        yield text
+                    return
+                yield from self._read_events(response)
+        except StreamError as e:
+            raise Exception(f"API error from {self.endpoint}: {e}")
+        except requests.exceptions.Timeout:
+            raise Exception(f"Request to {self.endpoint} timed out - server not responding")
+        except requests.exceptions.ConnectionError:
+            raise Exception(f"Could not connect to {self.endpoint} - check if the server is running")
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                raise Exception(f"Model not found: {self.model_id} ({self.endpoint})")
+            raise Exception(f"API error from {self.endpoint}: {str(e)}")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Request to {self.endpoint} failed: {str(e)}")
+
+    def _stream(self, request_payload: Dict[str, Any]) -> Generator[str, None, None]:
+        with get_session().post(self.endpoint, json=request_payload, headers=self.headers(),
+                                stream=True, timeout=(3.05, 600)) as response:
+            response.raise_for_status()
+            yield from self._read_events(response)
+
+    def _read_events(self, response) -> Generator[str, None, None]:
+        for delta in openai_deltas(response_chunks(response)):
+            if delta.usage:
+                self.last_usage = delta.usage
+            if delta.content:
+                yield delta.content
+
+    def get_parameters(self) -> Dict[str, Any]:
+        return self.config.get('parameters', {})
+
+    def convert_parameters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._convert_parameters(params)
+
+    def _convert_parameters(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert standardized parameters to OpenAI chat completion fields"""
+        converted = {
+            "temperature": params.get("temperature", 0.7),
+            "top_p": params.get("top_p", 0.9)
+        }
+        if "max_tokens_completion" in params:
+            converted["max_tokens"] = params["max_tokens_completion"]
+        # Not part of the OpenAI API, but accepted by vLLM and llama.cpp
+        if "top_k" in params:
+            converted["top_k"] = params["top_k"]
+        seed = params.get("seed", -1)
+        if seed >= 0:
+            converted["seed"] = seed
+        return converted
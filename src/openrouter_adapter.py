@@ -2,12 +2,18 @@ import requests
 import json
 from typing import Generator, Dict, Any
 from model_request_handler import ModelRequestHandler
+from openai_adapter import chat_completions_url, parse_completion
+from stream_decoder import StreamError, openai_deltas, response_chunks
+from http_session import get_session
+
+DEFAULT_ENDPOINT = "https://openrouter.ai/api/v1"
 
 class OpenRouterAdapter(ModelRequestHandler):
     def __init__(self, model_id: str, config: Dict[str, Any]):
         self.model_id = model_id
         self.config = config
-        self.endpoint = "https://openrouter.ai/api/v1/chat/completions"
+        self.endpoint = chat_completions_url(config.get("endpoint") or DEFAULT_ENDPOINT)
+        self.base_url = self.endpoint[:-len('/chat/completions')]
         self.api_key = config.get("api_key")  # Get API key from config
         if not self._validate_model_id():
             raise ValueError(f"Invalid OpenRouter model ID format: {model_id}")
@@ -28,13 +34,19 @@ class OpenRouterAdapter(ModelRequestHandler):
                 "HTTP-Referer": "https://github.com/Pierun0/SagaTrans",
                 "X-Title": "SagaTrans"
             }
-            response = requests.get("https://openrouter.ai/api/v1/auth/key", 
-                                 headers=headers, timeout=5)
+            response = get_session().get(f"{self.base_url}/auth/key",
+                                         headers=headers, timeout=5)
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
 
     def send_request(self, payload: Dict[str, Any]) -> Generator[str, None, None]:
+        return self._request(payload, stream=True)
+
+    def complete(self, payload: Dict[str, Any]) -> str:
+        return "".join(self._request(payload, stream=False))
+
+    def _request(self, payload: Dict[str, Any], stream: bool) -> Generator[str, None, None]:
         if not self.api_key:
             raise Exception("API key not set for OpenRouter")
 
@@ -52,12 +64,15 @@ class OpenRouterAdapter(ModelRequestHandler):
         openrouter_payload = {
             "model": model_name,
             "messages": payload["messages"],
-            "stream": True,
+            "stream": stream,
+            # Report real token counts (in the final chunk when streaming)
+            "usage": {"include": True},
             **converted_params
         }
+        self.last_usage = None
         try:
-            with requests.post(self.endpoint, json=openrouter_payload,
-                             headers=headers, stream=True, timeout=60*10) as response:
+            with get_session().post(self.endpoint, json=openrouter_payload,
+                             headers=headers, stream=stream, timeout=60*10) as response:
                 # Check for specific status codes
                 if response.status_code == 403:
                     # Try to get detailed error message from response
@@ -78,27 +93,20 @@ class OpenRouterAdapter(ModelRequestHandler):
                         raise Exception(f"OpenRouter access denied (403): {error_msg}")
                 
                 response.raise_for_status()
+
+                if not stream:
+                    text, self.last_usage = parse_completion(response.json())
+                    if text:
+                        yield text
+                    return
                 
-                for line in response.iter_lines():
-                    if line:
-                        decoded_line = line.decode('utf-8')
-                        
-                        if decoded_line.startswith('data: '):
-                            json_str = decoded_line[len('data: '):]
-                            
-                            if json_str.strip() == '[DONE]':
-                                break
-                                
-                            try:
-                                chunk = json.loads(json_str)
-                                
-                                if chunk.get("choices"):
-                                    delta = chunk["choices"][0].get("delta")
-                                    
-                                    if delta and "content" in delta:
-                                        yield delta["content"]
-                            except json.JSONDecodeError as e:
-                                continue
+                for delta in openai_deltas(response_chunks(response)):
+                    if delta.usage:
+                        self.last_usage = delta.usage
+                    if delta.content:
+                        yield delta.content
+        except StreamError as e:
+            raise Exception(f"OpenRouter error: {e}")
         except requests.exceptions.RequestException as e:
             # Check if this is a 403 error that wasn't caught above
             if hasattr(e, 'response') and e.response is not None and e.response.status_code == 403:
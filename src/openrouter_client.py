@@ -2,26 +2,14 @@ import requests
 import json
 import os
 import time
-import tiktoken
+from tokenizer_registry import count_tokens as count_model_tokens
 
 # --- Constants ---
 API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
-# --- Tokenizer Initialization ---
-try:
-    # Using cl100k_base encoding as a general approximation
-    tokenizer = tiktoken.get_encoding("cl100k_base")
-except Exception as e:
-    print(f"Warning: Failed to initialize tokenizer: {e}")
-    tokenizer = None
-
-def count_tokens(text: str) -> int:
-    """Counts approximate tokens using the initialized tokenizer."""
-    if tokenizer:
-        return len(tokenizer.encode(text))
-    else:
-        # Fallback: rough estimate (e.g., chars / 4) if tokenizer failed
-        return len(text) // 4
+def count_tokens(text: str, model: str = "") -> int:
+    """Counts tokens with the tokenizer of `model` (see tokenizer_registry)."""
+    return count_model_tokens(text, f"openrouter/{model}" if model else "")
 
 def get_translation_stream(api_key: str, payload: dict):
     """
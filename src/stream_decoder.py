@@ -0,0 +1,138 @@
+import json
+from typing import Any, Dict, Generator, Iterable, NamedTuple, Optional
+
+# Most bytes handed over at once; smaller reads return as soon as anything arrived
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StreamError(Exception):
+    """An error the server reported inside an otherwise successful stream."""
+
+
+class StreamDelta(NamedTuple):
+    content: str = ""
+    reasoning: str = ""
+    usage: Optional[Dict[str, int]] = None  # prompt_tokens and completion_tokens, on the final event
+    done: bool = False
+
+
+def parse_usage(usage: Optional[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+    """Prompt and completion token counts of an OpenAI-style `usage` object."""
+    if not usage:
+        return None
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+        "completion_tokens": int(usage.get("completion_tokens") or 0)
+    }
+
+
+def response_chunks(response) -> Generator[bytes, None, None]:
+    """Body of a streamed `requests` response, handed over as soon as bytes arrive.
+
+    `iter_content(n)` waits for n bytes unless the server uses chunked
+    encoding, so a close-delimited stream would show nothing until it ended.
+    `read1` returns whatever one socket read delivered.
+    """
+    raw = getattr(response, "raw", None)
+    if raw is None or not hasattr(raw, "read1"):
+        # urllib3 before 2.3: chunk_size=None at least yields each HTTP chunk as it arrives
+        yield from response.iter_content(chunk_size=None)
+        return
+    while True:
+        chunk = raw.read1(STREAM_CHUNK_SIZE, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Generator[bytes, None, None]:
+    """Lines of a byte stream without their LF or CRLF ending, however the chunks split them."""
+    pending = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if pending:
+            chunk = pending + chunk
+        lines = chunk.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith(b"\r") else line
+    if pending:
+        yield pending[:-1] if pending.endswith(b"\r") else pending
+
+
+def sse_events(chunks: Iterable[bytes]) -> Generator[bytes, None, None]:
+    """The data of each server-sent event; multi-line data is joined with newlines.
+
+    Comments (keep-alives such as ": OPENROUTER PROCESSING") and the event,
+    id and retry fields are skipped.
+    """
+    data = []
+    for line in iter_lines(chunks):
+        if not line:
+            if data:
+                yield data[0] if len(data) == 1 else b"\n".join(data)
+                data = []
+        elif line.startswith(b"data:"):
+            value = line[5:]
+            data.append(value[1:] if value.startswith(b" ") else value)
+    if data:
+        yield data[0] if len(data) == 1 else b"\n".join(data)
+
+
+def sse_json(chunks: Iterable[bytes]) -> Generator[Dict[str, Any], None, None]:
+    """JSON objects of an SSE stream up to the "[DONE]" event."""
+    for data in sse_events(chunks):
+        if data == b"[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            # Servers that leave out the blank line between events run them together
+            for part in data.split(b"\n"):
+                if part == b"[DONE]":
+                    return
+                try:
+                    yield json.loads(part)
+                except json.JSONDecodeError:
+                    continue
+
+
+def ndjson_objects(chunks: Iterable[bytes]) -> Generator[Dict[str, Any], None, None]:
+    """JSON objects of a newline-delimited JSON stream; malformed lines are skipped."""
+    for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def openai_deltas(chunks: Iterable[bytes]) -> Generator[StreamDelta, None, None]:
+    """Deltas of an OpenAI-style chat completion stream (OpenRouter, vLLM, llama.cpp, ...)."""
+    for event in sse_json(chunks):
+        if event.get("error"):
+            error = event["error"]
+            raise StreamError(error.get("message", str(error)) if isinstance(error, dict) else str(error))
+        choices = event.get("choices")
+        delta = (choices[0].get("delta") or {}) if choices else {}
+        content = delta.get("content") or ""
+        reasoning = delta.get("reasoning") or delta.get("reasoning_content") or ""
+        usage = parse_usage(event.get("usage"))
+        if content or reasoning or usage:
+            yield StreamDelta(content, reasoning, usage)
+
+
+def ollama_deltas(chunks: Iterable[bytes]) -> Generator[StreamDelta, None, None]:
+    """Deltas of an Ollama /api/chat stream; the final one carries the token counts."""
+    for event in ndjson_objects(chunks):
+        if event.get("error"):
+            raise StreamError(str(event["error"]))
+        message = event.get("message") or {}
+        if event.get("done"):
+            usage = {"prompt_tokens": event.get("prompt_eval_count", 0),
+                     "completion_tokens": event.get("eval_count", 0)}
+            yield StreamDelta(message.get("content") or "", message.get("thinking") or "", usage, True)
+            return
+        yield StreamDelta(message.get("content") or "", message.get("thinking") or "")
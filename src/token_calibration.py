@@ -0,0 +1,213 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from tokenizer_registry import Tokenizer, get_tokenizer, ratio_family, tokenizer_spec
+
+CALIBRATION_FILE = "settings/token_calibration.json"
+
+# Observations needed before a learned ratio replaces the tokenizer's estimate
+MIN_SAMPLES = 3
+
+# Weight of earlier observations at each new one, so a provider that changes
+# its tokenizer is picked up after a few requests
+DECAY = 0.9
+
+# A learned ratio that moves by more than this is published under a new
+# tokenizer name, so cached counts made with the old ratio are not reused
+DRIFT = 0.02
+
+# Texts longer than this are estimated even when an exact tokenizer exists
+EXACT_MAX_CHARS = 200_000
+
+# Characters sampled to tell the script of a text, whatever its length
+SCRIPT_SAMPLE_CHARS = 4000
+
+# Tokens the chat template adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SCRIPTS = (
+    ("cjk", re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af\uff66-\uff9f]")),
+    ("cyrillic", re.compile("[\u0400-\u04ff]")),
+    ("greek", re.compile("[\u0370-\u03ff]")),
+    ("arabic", re.compile("[\u0600-\u06ff\u0750-\u077f]")),
+    ("hebrew", re.compile("[\u0590-\u05ff]")),
+    ("devanagari", re.compile("[\u0900-\u097f]")),
+    ("thai", re.compile("[\u0e00-\u0e7f]")),
+)
+
+# Chars per token outside these bounds is not a plausible observation: reasoning
+# tokens billed as completion, prompt caching, or an empty answer
+PLAUSIBLE_CHARS_PER_TOKEN = {"cjk": (0.3, 4.0)}
+DEFAULT_PLAUSIBLE_CHARS_PER_TOKEN = (1.2, 12.0)
+
+
+def text_script(text: str) -> str:
+    """The dominant writing system of `text`: "latin" or one of SCRIPTS, from an evenly spread sample."""
+    if not text or text.isascii():
+        return "latin"
+    sample = text[::max(1, len(text) // SCRIPT_SAMPLE_CHARS)]
+    best, best_count = "latin", len(sample) // 4
+    for script, pattern in SCRIPTS:
+        count = len(pattern.findall(sample))
+        if count > best_count:
+            best, best_count = script, count
+    return best
+
+
+class TokenCalibration:
+    """Chars-per-token ratios learned per model and script from the usage providers report.
+
+    Stored in settings/token_calibration.json as
+    {model_id: {script: {"chars": float, "tokens": float, "samples": int}}},
+    where chars and tokens are decayed sums of the observations.
+    """
+
+    def __init__(self, path: str = CALIBRATION_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._published: Dict[tuple, float] = {}  # (model, script) -> ratio in use
+        self._revisions: Dict[str, int] = {}  # model -> bumped when a published ratio drifts
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read {self.path}: {e}")
+            return
+        with self._lock:
+            self._models = {model: dict(scripts) for model, scripts in data.items() if isinstance(scripts, dict)}
+            for model, scripts in self._models.items():
+                for script, entry in scripts.items():
+                    if entry.get("samples", 0) >= MIN_SAMPLES and entry.get("tokens"):
+                        self._published[(model, script)] = entry["chars"] / entry["tokens"]
+                        self._revisions[model] = 1
+
+    def save(self) -> None:
+        """Write the ratios if anything was observed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._models, indent=4, ensure_ascii=False)
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save {self.path}: {e}")
+
+    def observe(self, model_id: str, text: str, tokens: int, overhead: int = 0) -> bool:
+        """Learn from `tokens` reported for `text`, less `overhead` tokens of framing. Returns whether it was used."""
+        if not model_id or not text or not tokens:
+            return False
+        tokens -= overhead
+        if tokens <= 0:
+            return False
+        script = text_script(text)
+        ratio = len(text) / tokens
+        low, high = PLAUSIBLE_CHARS_PER_TOKEN.get(script, DEFAULT_PLAUSIBLE_CHARS_PER_TOKEN)
+        if not low <= ratio <= high:
+            return False
+        with self._lock:
+            entry = self._models.setdefault(model_id, {}).setdefault(
+                script, {"chars": 0.0, "tokens": 0.0, "samples": 0})
+            entry["chars"] = entry["chars"] * DECAY + len(text)
+            entry["tokens"] = entry["tokens"] * DECAY + tokens
+            entry["samples"] += 1
+            self._dirty = True
+            if entry["samples"] >= MIN_SAMPLES:
+                learned = entry["chars"] / entry["tokens"]
+                published = self._published.get((model_id, script))
+                if published is None or abs(learned - published) > published * DRIFT:
+                    self._published[(model_id, script)] = learned
+                    self._revisions[model_id] = self._revisions.get(model_id, 0) + 1
+        return True
+
+    def record_usage(self, model_id: str, messages: Iterable[Dict[str, Any]], completion: str,
+                     usage: Optional[Dict[str, int]], save: bool = True) -> None:
+        """Learn from a finished request: its prompt `messages`, its answer and the provider's `usage`."""
+        if not usage:
+            return
+        messages = list(messages or [])
+        prompt = "\n".join(str(message.get("content") or "") for message in messages)
+        self.observe(model_id, prompt, usage.get("prompt_tokens", 0), MESSAGE_OVERHEAD_TOKENS * len(messages))
+        self.observe(model_id, completion, usage.get("completion_tokens", 0))
+        if save:
+            self.save()
+
+    def chars_per_token(self, model_id: str, script: str) -> Optional[float]:
+        """The learned ratio, or None until MIN_SAMPLES observations were made."""
+        return self._published.get((model_id, script))
+
+    def revision(self, model_id: str) -> int:
+        return self._revisions.get(model_id, 0)
+
+    def estimate(self, text: str, model_id: str) -> Optional[int]:
+        """Token count of `text` from the learned ratio; None when the model and script are not calibrated.
+
+        Costs the same for any length of text.
+        """
+        if not text:
+            return 0
+        ratio = self.chars_per_token(model_id, text_script(text))
+        return math.ceil(len(text) / ratio) if ratio else None
+
+    def fast_count(self, text: str, model_id: str, model_config: Optional[Dict[str, Any]] = None) -> int:
+        """`estimate`, falling back to the ratio estimate of the model's tokenizer family; never encodes."""
+        estimate = self.estimate(text, model_id)
+        if estimate is not None:
+            return estimate
+        return get_tokenizer("ratio:" + ratio_family(tokenizer_spec(model_id, model_config))).count(text)
+
+
+_calibration: Optional[TokenCalibration] = None
+_calibration_lock = threading.Lock()
+
+
+def get_calibration() -> TokenCalibration:
+    """The shared calibration, loaded from settings on first use."""
+    global _calibration
+    with _calibration_lock:
+        if _calibration is None:
+            _calibration = TokenCalibration()
+        return _calibration
+
+
+class CalibratedTokenizer(Tokenizer):
+    """A model's tokenizer with learned ratios in front of it.
+
+    Estimating tokenizers use the learned ratio as soon as the model is
+    calibrated for the script of the text; exact ones only for texts over
+    EXACT_MAX_CHARS, where encoding would stall the GUI.
+    """
+
+    def __init__(self, base: Tokenizer, model_id: str, calibration: Optional[TokenCalibration] = None):
+        self.base = base
+        self.model_id = model_id
+        self.calibration = calibration or get_calibration()
+        self.exact = base.exact
+
+    @property
+    def name(self):
+        revision = self.calibration.revision(self.model_id)
+        return f"{self.base.name}+calibrated:{self.model_id}:{revision}" if revision else self.base.name
+
+    def count(self, text):
+        if self.base.exact and len(text) <= EXACT_MAX_CHARS:
+            return self.base.count(text)
+        estimate = self.calibration.estimate(text, self.model_id)
+        return estimate if estimate is not None else self.base.count(text)
@@ -0,0 +1,165 @@
+import math
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+# Han, kana and hangul: one character is often one or more tokens, unlike Latin script
+_CJK_RE = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af\uff66-\uff9f]")
+
+# (chars per token in other text, tokens per CJK character) by tokenizer family.
+# Approximate defaults for models without an exact tokenizer.
+RATIO_FAMILIES: Dict[str, Tuple[float, float]] = {
+    "cl100k": (4.0, 1.1),
+    "o200k": (4.2, 0.8),
+    "llama3": (4.2, 0.9),
+    "llama2": (3.5, 1.4),
+    "mistral": (3.6, 1.3),
+    "gemma": (4.3, 0.7),
+    "qwen": (4.0, 0.65),
+    "deepseek": (3.9, 0.7),
+    "claude": (3.5, 1.2),
+    "default": (3.8, 1.0),
+}
+
+# First matching pattern of the model ID (provider prefix included) picks the tokenizer
+MODEL_TOKENIZERS = (
+    (r"gpt-4o|gpt-4\.1|gpt-5|(^|/)o[134](-|$)", "tiktoken:o200k_base"),
+    (r"gpt-4|gpt-3\.5|text-embedding", "tiktoken:cl100k_base"),
+    (r"llama-?[34]|llama3", "ratio:llama3"),
+    (r"llama-?2|llama2", "ratio:llama2"),
+    (r"mistral|mixtral|ministral|codestral", "ratio:mistral"),
+    (r"gemma", "ratio:gemma"),
+    (r"qwen|qwq", "ratio:qwen"),
+    (r"deepseek", "ratio:deepseek"),
+    (r"claude", "ratio:claude"),
+)
+
+DEFAULT_TOKENIZER = "tiktoken:cl100k_base"
+
+
+class Tokenizer(ABC):
+    """Counts tokens for one model family. `name` identifies it in caches."""
+    name = ""
+    exact = False
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        pass
+
+
+class TiktokenTokenizer(Tokenizer):
+    exact = True
+
+    def __init__(self, encoding_name: str):
+        import tiktoken
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.name = f"tiktoken:{encoding_name}"
+
+    def count(self, text):
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """A tokenizer.json file or Hugging Face repository, through the optional `tokenizers` package."""
+    exact = True
+
+    def __init__(self, source: str):
+        from tokenizers import Tokenizer as HFTokenizer
+        if source.endswith(".json"):
+            self.tokenizer = HFTokenizer.from_file(source)
+        else:
+            self.tokenizer = HFTokenizer.from_pretrained(source)
+        self.name = f"hf:{source}"
+
+    def count(self, text):
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+class RatioTokenizer(Tokenizer):
+    """Estimates tokens from character counts, with CJK characters counted separately.
+
+    O(n) with a small constant, so it also serves as the fast path for huge projects.
+    """
+
+    def __init__(self, family: str = "default", chars_per_token: Optional[float] = None,
+                 tokens_per_cjk_char: Optional[float] = None):
+        default_chars, default_cjk = RATIO_FAMILIES.get(family, RATIO_FAMILIES["default"])
+        self.family = family
+        self.chars_per_token = chars_per_token or default_chars
+        self.tokens_per_cjk_char = tokens_per_cjk_char or default_cjk
+        # Explicit ratios are part of the name, so caches never mix counts of different ratios
+        self.name = (f"ratio:{family}" if chars_per_token is None and tokens_per_cjk_char is None
+                     else f"ratio:{family}:{self.chars_per_token:g}/{self.tokens_per_cjk_char:g}")
+
+    def count(self, text):
+        if not text:
+            return 0
+        cjk = len(_CJK_RE.findall(text)) if not text.isascii() else 0
+        return math.ceil((len(text) - cjk) / self.chars_per_token + cjk * self.tokens_per_cjk_char)
+
+
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def create_tokenizer(spec: str) -> Tokenizer:
+    """Tokenizer for a spec: "tiktoken:<encoding>", "hf:<tokenizer.json or repo>",
+    "ratio:<family>" or "ratio:<chars per token>".
+
+    Exact tokenizers that cannot be loaded fall back to the ratio estimate.
+    """
+    kind, _, value = spec.partition(":")
+    try:
+        if kind == "tiktoken":
+            return TiktokenTokenizer(value or "cl100k_base")
+        if kind == "hf":
+            return HuggingFaceTokenizer(value)
+    except Exception as e:
+        print(f"Warning: Tokenizer {spec} unavailable, estimating from character counts: {e}")
+        return RatioTokenizer(ratio_family(spec))
+    if kind == "ratio":
+        try:
+            return RatioTokenizer("custom", chars_per_token=float(value))
+        except ValueError:
+            return RatioTokenizer(value or "default")
+    print(f"Warning: Unknown tokenizer spec '{spec}', using {DEFAULT_TOKENIZER}")
+    return create_tokenizer(DEFAULT_TOKENIZER)
+
+
+def ratio_family(spec: str) -> str:
+    """The RATIO_FAMILIES entry that approximates the tokenizer of `spec`."""
+    kind, _, value = spec.partition(":")
+    if kind == "ratio" and value in RATIO_FAMILIES:
+        return value
+    if kind == "tiktoken":
+        return "o200k" if value.startswith("o200k") else "cl100k"
+    return "default"
+
+
+def tokenizer_spec(model_id: str, model_config: Optional[Dict[str, Any]] = None) -> str:
+    """The tokenizer spec of a model: its `tokenizer` in models.json, else the first matching MODEL_TOKENIZERS rule."""
+    if model_config and model_config.get("tokenizer"):
+        return model_config["tokenizer"]
+    model_id = (model_id or "").lower()
+    for pattern, spec in MODEL_TOKENIZERS:
+        if re.search(pattern, model_id):
+            return spec
+    return DEFAULT_TOKENIZER
+
+
+def get_tokenizer(spec: str) -> Tokenizer:
+    """The shared tokenizer for `spec`; loaded once per process."""
+    with _tokenizers_lock:
+        if spec not in _tokenizers:
+            _tokenizers[spec] = create_tokenizer(spec)
+        return _tokenizers[spec]
+
+
+def tokenizer_for_model(model_id: str, model_config: Optional[Dict[str, Any]] = None) -> Tokenizer:
+    return get_tokenizer(tokenizer_spec(model_id, model_config))
+
+
+def count_tokens(text: str, model_id: str = "", model_config: Optional[Dict[str, Any]] = None) -> int:
+    """Token count of `text` for a model (uncached; see TokenManager for the cached GUI path)."""
+    return tokenizer_for_model(model_id, model_config).count(text or "")
@@ -0,0 +1,80 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from batch_jobs import create_batch_backend, FINAL_STATES, DEFAULT_POLL_SECONDS
+
+
+class BatchThread(QThread):
+    """Submits a bulk translation job (or resumes a provider job by id) and polls it until it is done.
+
+    Requests are snapshots built on the GUI thread: (custom_id, payload).
+    Finished results are emitted in groups as the backend hands them over.
+    """
+    job_submitted = pyqtSignal(str, bool)  # job id, whether the job runs at the provider
+    results_ready = pyqtSignal(list)  # batch_result dicts
+    progress_updated = pyqtSignal(int, int, str)  # done, total, status message
+    job_finished = pyqtSignal(str)  # final state: completed, failed, cancelled or paused
+    paused = pyqtSignal(str)  # why a queued job stopped at a batch limit, and what is left
+    error = pyqtSignal(str)
+
+    def __init__(self, parent, model_id, batch=None, job_id=None, workers=2, poll_seconds=None, budget=None):
+        super().__init__(parent)
+        self.model_id = model_id
+        self.batch = batch or []
+        self.job_id = job_id
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.budget = budget
+        self.model_manager = parent.model_manager if hasattr(parent, 'model_manager') else None
+        self.backend = None
+        self.stop_requested = False
+
+    def stop(self, cancel_job=False):
+        """Stop polling; local jobs always stop, provider jobs only with `cancel_job`."""
+        self.stop_requested = True
+        if self.backend and (cancel_job or not self.backend.remote):
+            self.backend.cancel()
+
+    def run(self):
+        model_config = self.model_manager.get_model_config(self.model_id) if self.model_manager else None
+        if not model_config:
+            self.error.emit(f"Invalid model configuration for {self.model_id}")
+            return
+        self.backend = create_batch_backend(self.model_id, model_config, self.workers, self.budget)
+        if not self.backend:
+            self.error.emit(f"Unsupported model provider for {self.model_id}")
+            return
+
+        try:
+            if self.job_id:
+                if not self.backend.supports_resume:
+                    self.error.emit(f"Batch job {self.job_id} cannot be resumed: {self.backend.label} jobs "
+                                    "only run while the app is open")
+                    return
+                self.backend.resume(self.job_id)
+            else:
+                self.job_id = self.backend.submit(self.batch)
+            self.job_submitted.emit(self.job_id, self.backend.remote)
+
+            # Local jobs report progress quickly; provider jobs take hours and are checked rarely
+            poll_seconds = self.poll_seconds or (DEFAULT_POLL_SECONDS if self.backend.remote else 1)
+            while not self.stop_requested:
+                status = self.backend.status()
+                results = self.backend.take_results()
+                if results:
+                    self.results_ready.emit(results)
+                self.progress_updated.emit(status["done"], status["total"],
+                                           f"Bulk translation ({self.backend.label}): {status['done']}/{status['total']}")
+                if status["state"] in FINAL_STATES:
+                    if status["state"] == "failed":
+                        self.error.emit(f"Batch job {self.job_id} failed at the provider")
+                    elif status["state"] == "paused":
+                        self.paused.emit(f"{status['reason']}; {self.budget.describe()}")
+                    self.job_finished.emit(status["state"])
+                    return
+                # Sleep in short steps so a stop request is noticed quickly
+                for _ in range(int(poll_seconds * 10)):
+                    if self.stop_requested:
+                        return
+                    self.msleep(100)
+        except Exception as e:
+            if not self.stop_requested:
+                self.error.emit(f"Bulk translation error: {str(e)}")
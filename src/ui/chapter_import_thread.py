@@ -0,0 +1,31 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from chapter_importer import expand_sources, parse_tasks, build_items
+
+
+class ChapterImportThread(QThread):
+    """Parses source files into new project items off the GUI thread.
+
+    Works on snapshots of the project's item names and content hashes, so the
+    result can be inserted in one step when it arrives.
+    """
+    progress_updated = pyqtSignal(str)
+    import_finished = pyqtSignal(dict)  # {"items": [...], "duplicates": int, "sources": int}
+    error = pyqtSignal(str)
+
+    def __init__(self, parent, paths, existing_names, existing_hashes):
+        super().__init__(parent)
+        self.paths = paths
+        self.existing_names = existing_names
+        self.existing_hashes = existing_hashes
+
+    def run(self):
+        try:
+            self.progress_updated.emit(f"Reading {len(self.paths)} source(s)...")
+            tasks = expand_sources(self.paths)
+            self.progress_updated.emit(f"Parsing {len(tasks)} documents...")
+            chapters = [chapter for chapters in parse_tasks(tasks) for chapter in chapters]
+            result = build_items(chapters, self.existing_names, self.existing_hashes)
+            result["sources"] = len(tasks)
+            self.import_finished.emit(result)
+        except Exception as e:
+            self.error.emit(f"Import failed: {str(e)}")
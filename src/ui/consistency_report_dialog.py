@@ -0,0 +1,73 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QHeaderView,
+    QAbstractItemView, QMessageBox
+)
+from PyQt5.QtCore import Qt
+from consistency_checker import MISSING_GLOSSARY_TERM
+
+KIND_LABELS = {MISSING_GLOSSARY_TERM: "Glossary", "name": "Name"}
+
+
+class ConsistencyReportDialog(QDialog):
+    """Non-modal list of consistency issues; clicking a row selects the item in the main window."""
+
+    def __init__(self, main_window, issues):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.issues = issues
+        self.setWindowTitle("Consistency Report")
+        self.resize(900, 500)
+        self.setModal(False)
+
+        layout = QVBoxLayout()
+        affected = len({issue["item_index"] for issue in issues})
+        layout.addWidget(QLabel(f"{len(issues)} issues in {affected} items. Click a row to open the item."))
+
+        self.table = QTableWidget(len(issues), 4)
+        self.table.setHorizontalHeaderLabels(["Item", "Kind", "Term", "Problem"])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        for row, issue in enumerate(issues):
+            item_cell = QTableWidgetItem(f"{issue['item_index'] + 1}. {issue['item_name']}")
+            item_cell.setData(Qt.UserRole, issue["item_index"])
+            self.table.setItem(row, 0, item_cell)
+            self.table.setItem(row, 1, QTableWidgetItem(KIND_LABELS.get(issue["kind"], issue["kind"])))
+            self.table.setItem(row, 2, QTableWidgetItem(issue["term"]))
+            self.table.setItem(row, 3, QTableWidgetItem(issue["detail"]))
+        self.table.resizeColumnsToContents()
+        self.table.cellClicked.connect(self._jump_to_item)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        retranslate_button = QPushButton("Re-translate Affected Items")
+        retranslate_button.clicked.connect(self._retranslate_affected)
+        button_layout.addWidget(retranslate_button)
+        button_layout.addStretch()
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def affected_indices(self):
+        return sorted({issue["item_index"] for issue in self.issues})
+
+    def _retranslate_affected(self):
+        indices = self.affected_indices()
+        answer = QMessageBox.question(
+            self, "Re-translate",
+            f"Translate the {len(indices)} affected items again with the current glossary and prompt?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if answer != QMessageBox.Yes:
+            return
+        queued = self.main_window.translation_manager.queue_translations(indices)
+        self.main_window.statusBar().showMessage(f"Queued {queued} items for translation.", 5000)
+
+    def _jump_to_item(self, row, column):
+        item_index = self.table.item(row, 0).data(Qt.UserRole)
+        if 0 <= item_index < self.main_window.item_listbox.count():
+            self.main_window.item_listbox.setCurrentRow(item_index)
+            self.main_window.raise_()
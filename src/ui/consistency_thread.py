@@ -0,0 +1,19 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from consistency_checker import check_project
+
+
+class ConsistencyCheckThread(QThread):
+    """Runs the project consistency check off the GUI thread on a snapshot of the items."""
+    check_finished = pyqtSignal(list)  # issues
+    error = pyqtSignal(str)
+
+    def __init__(self, parent, items, glossary):
+        super().__init__(parent)
+        self.items = items
+        self.glossary = glossary
+
+    def run(self):
+        try:
+            self.check_finished.emit(check_project(self.items, self.glossary))
+        except Exception as e:
+            self.error.emit(f"Consistency check failed: {str(e)}")
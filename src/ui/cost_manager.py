@@ -0,0 +1,134 @@
+from PyQt5.QtWidgets import QMessageBox, QDialog, QDialogButtonBox, QVBoxLayout, QTextEdit
+from cost_ledger import (
+    CostLedger, TRANSLATION_KINDS, ledger_path, model_pricing, request_cost, estimate_requests, format_cost
+)
+from context_packer import context_mode_label
+from token_calibration import get_calibration
+
+# Payloads built for a pre-flight estimate; the other items of a run are extrapolated from them
+ESTIMATE_SAMPLE_SIZE = 20
+
+ITEM_NAMES = {"glossary": "Glossary proposals"}
+
+
+class CostManager:
+    """Records the tokens and cost of every translation request in the project ledger."""
+
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self._ledger = None
+
+    def ledger(self):
+        """Ledger of the open project, loaded when the project changes; None without a project file."""
+        project_file = self.main_window.current_file
+        if not project_file or not self.main_window.current_project_data:
+            return None
+        path = ledger_path(project_file)
+        if self._ledger is None or self._ledger.path != path:
+            self._ledger = CostLedger(path)
+        return self._ledger
+
+    def _model_config(self, model_id):
+        model_manager = getattr(self.main_window, 'model_manager', None)
+        return model_manager.get_model_config(model_id) if model_manager and model_id else None
+
+    def record_request(self, item_index, model_id, messages, completion, usage, source_text="",
+                       batch=None, batch_api=False, kind="translation"):
+        """Add a finished request of `kind` (see REQUEST_KINDS); token counts are estimated when the provider reported none."""
+        ledger = self.ledger()
+        if ledger is None or not model_id:
+            return None
+        model_config = self._model_config(model_id)
+        calibration = get_calibration()
+        estimated = not usage
+        if estimated:
+            prompt = "\n".join(str(message.get("content") or "") for message in messages or [])
+            usage = {"prompt_tokens": calibration.fast_count(prompt, model_id, model_config),
+                     "completion_tokens": calibration.fast_count(completion, model_id, model_config)}
+        items = self.main_window.project_items
+        item_name = items[item_index].get('name', '') if item_index is not None and 0 <= item_index < len(items) else ''
+        project_data = self.main_window.current_project_data
+        context_mode = project_data.get('context_selection_mode', 'fill_budget') if kind in TRANSLATION_KINDS else ''
+        return ledger.record(
+            item_index, item_name or ITEM_NAMES.get(kind, ''), model_id, usage["prompt_tokens"],
+            usage["completion_tokens"],
+            request_cost(model_pricing(model_config), usage["prompt_tokens"], usage["completion_tokens"], batch_api),
+            batch=batch, context_mode=context_mode,
+            source_tokens=calibration.fast_count(source_text, model_id, model_config) if source_text else 0,
+            estimated=estimated, kind=kind
+        )
+
+    def estimate(self, requests, model_id, batch_api=False):
+        """Pre-flight estimate of (payload, source_text) requests for `model_id`."""
+        return estimate_requests(requests, model_id, self._model_config(model_id), self.ledger(), batch_api)
+
+    def pricing(self, model_id):
+        return model_pricing(self._model_config(model_id))
+
+    def estimate_items(self, item_indices, batch_api=False):
+        """Pre-flight estimate of translating `item_indices` with the project model.
+
+        Payloads are built for an evenly spread sample of ESTIMATE_SAMPLE_SIZE
+        items only, so the estimate costs the same on the GUI thread for any
+        size of run.
+        """
+        translation_manager = self.main_window.translation_manager
+        item_indices = list(item_indices)
+        step = max(1, len(item_indices) / ESTIMATE_SAMPLE_SIZE)
+        sample = {item_indices[int(k * step)] for k in range(min(len(item_indices), ESTIMATE_SAMPLE_SIZE))}
+        requests = []
+        for item_index in item_indices:
+            payload = translation_manager._build_api_payload_for_item(item_index) if item_index in sample else None
+            if payload or item_index not in sample:
+                requests.append((payload, self.main_window.project_items[item_index].get('source_text', '')))
+        model_id = self.main_window.current_project_data.get('model', '')
+        return self.estimate(requests, model_id, batch_api)
+
+    def report_text(self):
+        ledger = self.ledger()
+        if not ledger or not ledger.entries:
+            return "No requests recorded yet."
+
+        def table(title, groups, label=str):
+            lines = [title, f"  {'':40} {'requests':>8} {'prompt':>12} {'completion':>12} {'cost':>12} {'per request':>12}"]
+            for key, totals in groups.items():
+                cost = totals["cost"] if totals["unpriced"] < totals["requests"] else None
+                per_request = cost / (totals["requests"] - totals["unpriced"]) if cost is not None else None
+                lines.append(f"  {label(key)[:40]:40} {totals['requests']:>8} {totals['prompt_tokens']:>12,} "
+                             f"{totals['completion_tokens']:>12,} {format_cost(cost):>12} {format_cost(per_request):>12}")
+            return "\n".join(lines)
+
+        total = ledger.total()
+        sections = [
+            f"{total['requests']} requests, {total['prompt_tokens']:,} prompt and "
+            f"{total['completion_tokens']:,} completion tokens, {format_cost(total['cost'])}"
+            + (f" ({total['unpriced']} requests to models without pricing)" if total['unpriced'] else ""),
+            table("By model", ledger.by_model()),
+            table("By request type", ledger.by_kind()),
+            table("By context mode (cost per chapter)", ledger.by_context_mode(), context_mode_label),
+            table("By batch", ledger.by_batch()),
+            table("By item", ledger.by_item()),
+        ]
+        estimated = sum(1 for entry in ledger.entries if entry.get("estimated"))
+        if estimated:
+            sections.append(f"{estimated} requests reported no usage; their tokens are estimated.")
+        return "\n\n".join(sections)
+
+    def show_cost_report(self):
+        if not self.main_window.current_project_data:
+            QMessageBox.warning(self.main_window, "Cost Report", "No project loaded.")
+            return
+        dialog = QDialog(self.main_window)
+        dialog.setWindowTitle("Tokens and Cost")
+        dialog.resize(900, 600)
+        layout = QVBoxLayout(dialog)
+        report_edit = QTextEdit()
+        report_edit.setReadOnly(True)
+        report_edit.setLineWrapMode(QTextEdit.NoWrap)
+        report_edit.setFontFamily("monospace")
+        report_edit.setPlainText(self.report_text())
+        layout.addWidget(report_edit)
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(dialog.reject)
+        layout.addWidget(button_box)
+        dialog.exec_()
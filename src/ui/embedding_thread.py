@@ -0,0 +1,37 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+EMBEDDING_BATCH_SIZE = 32
+
+
+class EmbeddingThread(QThread):
+    """Embeds index segments in batches for the relevant-passages context mode.
+
+    Works on a snapshot of (segment hash, text) pairs and emits the vectors per
+    batch; the GUI thread stores them in the ContextIndex.
+    """
+    vectors_ready = pyqtSignal(list, list)  # segment hashes, vectors
+    error = pyqtSignal(str)
+
+    def __init__(self, parent, embed, segments):
+        super().__init__(parent)
+        self.embed = embed  # Callable: list of texts -> list of vectors
+        self.segments = segments
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+
+    def run(self):
+        for start in range(0, len(self.segments), EMBEDDING_BATCH_SIZE):
+            if self.stop_requested:
+                return
+            batch = self.segments[start:start + EMBEDDING_BATCH_SIZE]
+            try:
+                vectors = self.embed([text for _, text in batch])
+            except Exception as e:
+                self.error.emit(str(e))
+                return
+            if len(vectors) != len(batch):
+                self.error.emit(f"Expected {len(batch)} embeddings, got {len(vectors)}")
+                return
+            self.vectors_ready.emit([segment_hash for segment_hash, _ in batch], vectors)
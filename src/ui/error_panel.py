@@ -0,0 +1,105 @@
+from datetime import datetime
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QHeaderView, QAbstractItemView
+)
+
+
+def item_key(item):
+    """Key of a project item that survives moving and removing other items."""
+    return id(item)
+
+
+class ErrorPanel(QDockWidget):
+    """Non-modal list of failed requests, docked below the editor.
+
+    Failures of an item share one row that shows the latest attempt; rows
+    without an item (bulk job errors) are kept one per message. Rows are keyed
+    by the identity of the project item, not its index, so they stay with
+    their item when items are moved or removed. Nothing here blocks the GUI
+    thread, so running translations keep streaming.
+    """
+    retry_requested = pyqtSignal(list)  # item keys (see item_key) of the rows to retry
+
+    COLUMNS = ("Time", "Item", "Error", "Attempts", "Status")
+
+    def __init__(self, parent=None):
+        super().__init__("Errors", parent)
+        self.setObjectName("error_panel")
+        self.setAllowedAreas(Qt.BottomDockWidgetArea | Qt.TopDockWidgetArea)
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.retry_selected_button = QPushButton("Retry Selected")
+        self.retry_all_button = QPushButton("Retry All")
+        self.clear_button = QPushButton("Clear")
+        self.retry_selected_button.clicked.connect(lambda: self._request_retry(selected_only=True))
+        self.retry_all_button.clicked.connect(lambda: self._request_retry(selected_only=False))
+        self.clear_button.clicked.connect(self.clear)
+        button_layout.addWidget(self.retry_selected_button)
+        button_layout.addWidget(self.retry_all_button)
+        button_layout.addStretch()
+        button_layout.addWidget(self.clear_button)
+        layout.addLayout(button_layout)
+
+        self.setWidget(widget)
+        self.hide()
+
+    def _find_row(self, item):
+        key = item_key(item)
+        for row in range(self.table.rowCount()):
+            if self.table.item(row, 0).data(Qt.UserRole) == key:
+                return row
+        return None
+
+    def record(self, item, item_name, message, detail="", attempts=1, status="failed"):
+        """Show a failure of the project `item`; None for errors that belong to no single item."""
+        row = self._find_row(item) if item is not None else None
+        if row is None:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+        time_cell = QTableWidgetItem(datetime.now().strftime("%H:%M:%S"))
+        time_cell.setData(Qt.UserRole, item_key(item) if item is not None else None)
+        error_cell = QTableWidgetItem(message.splitlines()[0] if message else "")
+        error_cell.setToolTip(detail or message)
+        cells = (time_cell, QTableWidgetItem(item_name), error_cell,
+                 QTableWidgetItem(str(attempts)), QTableWidgetItem(status))
+        for column, cell in enumerate(cells):
+            self.table.setItem(row, column, cell)
+        if not self.isVisible():
+            self.show()
+
+    def set_status(self, item, status):
+        row = self._find_row(item)
+        if row is not None:
+            self.table.setItem(row, 4, QTableWidgetItem(status))
+
+    def resolve(self, item):
+        """Drop the row of an item that has since been translated."""
+        row = self._find_row(item)
+        if row is not None:
+            self.table.removeRow(row)
+
+    def clear(self):
+        self.table.setRowCount(0)
+
+    def _request_retry(self, selected_only):
+        rows = {index.row() for index in self.table.selectedIndexes()} if selected_only else range(self.table.rowCount())
+        keys = [self.table.item(row, 0).data(Qt.UserRole) for row in sorted(rows)]
+        keys = [key for key in keys if key is not None]
+        if keys:
+            self.retry_requested.emit(keys)
@@ -0,0 +1,112 @@
+import os
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QDialogButtonBox, QComboBox,
+    QPushButton, QSpinBox, QFileDialog, QMessageBox
+)
+from exporters import EXPORTERS, safe_filename
+
+
+class ExportDialog(QDialog):
+    """Choose export format, output path, volume size and an optional stylesheet."""
+
+    def __init__(self, parent=None, project_title="", options=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Project")
+        self.resize(600, 0)
+        options = options or {}
+        self.project_title = project_title
+
+        layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.format_combo = QComboBox()
+        for format_name, exporter_class in EXPORTERS.items():
+            self.format_combo.addItem(exporter_class.label, format_name)
+        index = self.format_combo.findData(options.get("format", "epub"))
+        self.format_combo.setCurrentIndex(max(0, index))
+        self.format_combo.currentIndexChanged.connect(self._update_extension)
+        form.addRow("Format:", self.format_combo)
+
+        path_layout = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self._browse_output)
+        path_layout.addWidget(self.path_edit)
+        path_layout.addWidget(browse_button)
+        form.addRow("Save To:", path_layout)
+
+        self.volume_spin = QSpinBox()
+        self.volume_spin.setRange(0, 100000)
+        self.volume_spin.setSingleStep(100)
+        self.volume_spin.setSpecialValueText("One file")
+        self.volume_spin.setValue(options.get("volume_size", 0))
+        self.volume_spin.setToolTip("Split the book into volumes of this many chapters")
+        form.addRow("Chapters per Volume:", self.volume_spin)
+
+        stylesheet_layout = QHBoxLayout()
+        self.stylesheet_edit = QLineEdit(options.get("stylesheet", ""))
+        self.stylesheet_edit.setPlaceholderText("Default stylesheet")
+        stylesheet_button = QPushButton("Browse...")
+        stylesheet_button.clicked.connect(self._browse_stylesheet)
+        stylesheet_layout.addWidget(self.stylesheet_edit)
+        stylesheet_layout.addWidget(stylesheet_button)
+        form.addRow("Stylesheet (CSS):", stylesheet_layout)
+
+        layout.addLayout(form)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self._accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+        self.path_edit.setText(os.path.abspath(safe_filename(project_title or "Exported_Project").replace(" ", "_")
+                                               + EXPORTERS[self.format_name()].extension))
+
+    def format_name(self):
+        return self.format_combo.currentData()
+
+    def _update_extension(self):
+        path = self.path_edit.text().strip()
+        if path:
+            root, extension = os.path.splitext(path)
+            known = {exporter_class.extension for exporter_class in EXPORTERS.values()}
+            if extension.lower() in known:
+                path = root
+            self.path_edit.setText(path + EXPORTERS[self.format_name()].extension)
+
+    def _browse_output(self):
+        exporter_class = EXPORTERS[self.format_name()]
+        if exporter_class.extension:
+            pattern = f"{exporter_class.label} (*{exporter_class.extension});;All Files (*)"
+            path, _ = QFileDialog.getSaveFileName(self, "Export Project", self.path_edit.text(), pattern)
+        else:
+            # Folder formats get a new folder named after the project inside the chosen one
+            parent = QFileDialog.getExistingDirectory(self, "Export Project to Folder")
+            path = os.path.join(parent, safe_filename(self.project_title or "Exported_Project")) if parent else ""
+        if path:
+            self.path_edit.setText(path)
+
+    def _browse_stylesheet(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Choose Stylesheet", "", "CSS Files (*.css);;All Files (*)")
+        if path:
+            self.stylesheet_edit.setText(path)
+
+    def _accept(self):
+        if not self.path_edit.text().strip():
+            QMessageBox.warning(self, "Export Project", "Choose where to save the export.")
+            return
+        stylesheet = self.stylesheet_edit.text().strip()
+        if stylesheet and not os.path.isfile(stylesheet):
+            QMessageBox.warning(self, "Export Project", f"Stylesheet not found:\n{stylesheet}")
+            return
+        self.accept()
+
+    def get_options(self):
+        return {
+            "format": self.format_name(),
+            "volume_size": self.volume_spin.value(),
+            "stylesheet": self.stylesheet_edit.text().strip()
+        }
+
+    def get_output_path(self):
+        return self.path_edit.text().strip()
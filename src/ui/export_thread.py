@@ -0,0 +1,37 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from exporters import export_project, volume_paths
+
+
+class ExportThread(QThread):
+    """Exports a snapshot of the project off the GUI thread."""
+    progress_updated = pyqtSignal(int, int, str)  # done, total, status message
+    export_finished = pyqtSignal(list)  # written paths, one per volume
+    error = pyqtSignal(str)
+
+    def __init__(self, parent, project_data, output_path, options, cache_dir=None):
+        super().__init__(parent)
+        self.project_data = project_data
+        self.output_path = output_path
+        self.options = options
+        self.cache_dir = cache_dir
+
+    def run(self):
+        stylesheet = None
+        if self.options.get("stylesheet"):
+            try:
+                with open(self.options["stylesheet"], "r", encoding="utf-8") as f:
+                    stylesheet = f.read()
+            except OSError as e:
+                self.error.emit(f"Could not read stylesheet: {e}")
+                return
+
+        volume_size = self.options.get("volume_size", 0)
+        success, message = export_project(
+            self.project_data, self.output_path, self.options.get("format", "epub"),
+            cache_dir=self.cache_dir, volume_size=volume_size, stylesheet=stylesheet,
+            progress=lambda done, total, msg: self.progress_updated.emit(done, total, msg)
+        )
+        if success:
+            self.export_finished.emit(volume_paths(self.output_path, len(self.project_data['items']), volume_size))
+        else:
+            self.error.emit(message)
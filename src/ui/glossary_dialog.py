@@ -0,0 +1,119 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+    QDialogButtonBox, QLineEdit, QLabel, QHeaderView, QCheckBox
+)
+from PyQt5.QtCore import Qt
+from glossary import Glossary
+
+COLUMNS = [("source", "Source Term"), ("target", "Translation"), ("note", "Note")]
+
+
+class GlossaryDialog(QDialog):
+    """Edits the project glossary: source term, translation and an optional note per row."""
+
+    def __init__(self, parent=None, entries=None, current_text=""):
+        super().__init__(parent)
+        self.setWindowTitle("Project Glossary")
+        self.resize(800, 600)
+        self.current_text = current_text
+
+        layout = QVBoxLayout()
+
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter terms...")
+        self.filter_edit.textChanged.connect(self._apply_filter)
+        filter_layout.addWidget(self.filter_edit)
+        self.current_only_check = QCheckBox("Only terms in current item")
+        self.current_only_check.setEnabled(bool(current_text))
+        self.current_only_check.toggled.connect(self._apply_filter)
+        filter_layout.addWidget(self.current_only_check)
+        layout.addLayout(filter_layout)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([label for _, label in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSortingEnabled(False)
+        layout.addWidget(self.table)
+
+        for entry in entries or []:
+            self._append_row(entry)
+
+        button_layout = QHBoxLayout()
+        add_button = QPushButton("Add Term")
+        add_button.clicked.connect(self._add_term)
+        remove_button = QPushButton("Remove Selected")
+        remove_button.clicked.connect(self._remove_selected)
+        button_layout.addWidget(add_button)
+        button_layout.addWidget(remove_button)
+        button_layout.addStretch()
+        self.count_label = QLabel()
+        button_layout.addWidget(self.count_label)
+        layout.addLayout(button_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self.setLayout(layout)
+        self._update_count()
+
+    def _append_row(self, entry):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column, (key, _) in enumerate(COLUMNS):
+            self.table.setItem(row, column, QTableWidgetItem(entry.get(key, "")))
+        # Keep fields this dialog doesn't show (e.g. extraction statistics)
+        self.table.item(row, 0).setData(Qt.UserRole, dict(entry))
+        return row
+
+    def _add_term(self):
+        self.filter_edit.clear()
+        self.current_only_check.setChecked(False)
+        row = self._append_row({})
+        self.table.scrollToItem(self.table.item(row, 0))
+        self.table.editItem(self.table.item(row, 0))
+        self._update_count()
+
+    def _remove_selected(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.table.removeRow(row)
+        self._update_count()
+
+    def _apply_filter(self):
+        needle = self.filter_edit.text().strip().lower()
+        in_current = None
+        if self.current_only_check.isChecked():
+            entries = self.get_entries(include_empty=True)
+            matched = Glossary().matching_entries(entries, self.current_text)
+            in_current = {id(entry) for entry in matched}
+            row_entries = entries
+        for row in range(self.table.rowCount()):
+            texts = [(self.table.item(row, column).text() if self.table.item(row, column) else "").lower()
+                     for column in range(len(COLUMNS))]
+            visible = not needle or any(needle in text for text in texts)
+            if in_current is not None:
+                visible = visible and id(row_entries[row]) in in_current
+            self.table.setRowHidden(row, not visible)
+
+    def _update_count(self):
+        self.count_label.setText(f"{self.table.rowCount()} terms")
+
+    def get_entries(self, include_empty=False):
+        """Glossary rows as entry dicts; rows without a source term are dropped unless `include_empty`."""
+        entries = []
+        for row in range(self.table.rowCount()):
+            first = self.table.item(row, 0)
+            entry = dict(first.data(Qt.UserRole) or {}) if first else {}
+            for column, (key, _) in enumerate(COLUMNS):
+                item = self.table.item(row, column)
+                value = item.text().strip() if item else ""
+                if value or key != "note":
+                    entry[key] = value
+                else:
+                    entry.pop(key, None)
+            if include_empty or entry.get("source"):
+                entries.append(entry)
+        return entries
@@ -0,0 +1,80 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from model_request_handler import ModelRequestHandler
+from glossary_extractor import (
+    scan_texts, aggregate_candidates, build_proposal_payload, parse_proposals, PROPOSAL_BATCH_SIZE
+)
+
+
+class GlossaryExtractionThread(QThread):
+    """Scans new or changed items for glossary candidates and optionally asks a model for translations.
+
+    Works on snapshots taken on the GUI thread:
+        texts_to_scan: {item hash: source text} of items missing from the scan cache
+        cached:        {item hash: candidates} from previous scans
+        item_hashes:   hashes of all current items (what the statistics cover)
+    """
+    progress_updated = pyqtSignal(str)
+    extraction_finished = pyqtSignal(dict, list, dict)  # new scan results, candidate rows, proposals
+    error = pyqtSignal(str)
+    request_finished = pyqtSignal(object, str, object, str, object)  # item_index (None), model, messages, answer, usage
+
+    def __init__(self, parent, texts_to_scan, cached, item_hashes, known_terms,
+                 model_id=None, target_language=""):
+        super().__init__(parent)
+        self.texts_to_scan = texts_to_scan
+        self.cached = cached
+        self.item_hashes = item_hashes
+        self.known_terms = known_terms
+        self.model_id = model_id
+        self.target_language = target_language
+        self.model_manager = parent.model_manager if hasattr(parent, 'model_manager') else None
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+
+    def run(self):
+        try:
+            self.progress_updated.emit(f"Scanning {len(self.texts_to_scan)} new or changed items for glossary terms...")
+            scanned = scan_texts(self.texts_to_scan)
+            if self.stop_requested:
+                return
+
+            per_item = []
+            for item_hash in self.item_hashes:
+                candidates = scanned.get(item_hash, self.cached.get(item_hash))
+                if candidates:
+                    per_item.append(candidates)
+            rows = aggregate_candidates(per_item, self.known_terms)
+
+            proposals = {}
+            if self.model_id and rows:
+                proposals = self._propose([term for term, _, _ in rows])
+
+            if not self.stop_requested:
+                self.extraction_finished.emit(scanned, rows, proposals)
+        except Exception as e:
+            self.error.emit(f"Glossary extraction failed: {str(e)}")
+
+    def _propose(self, terms):
+        model_config = self.model_manager.get_model_config(self.model_id) if self.model_manager else None
+        handler = ModelRequestHandler.create_handler(self.model_id, model_config) if model_config else None
+        if not handler or not handler.validate_connection():
+            self.error.emit(f"Could not connect to {self.model_id}; terms were added without translations")
+            return {}
+
+        proposals = {}
+        for start in range(0, len(terms), PROPOSAL_BATCH_SIZE):
+            if self.stop_requested:
+                break
+            batch = terms[start:start + PROPOSAL_BATCH_SIZE]
+            self.progress_updated.emit(f"Proposing translations: {start}/{len(terms)} terms...")
+            payload = build_proposal_payload(self.model_id, self.target_language, batch)
+            try:
+                response = handler.complete(payload)
+            except Exception as e:
+                self.error.emit(f"Translation proposal request failed: {str(e)}")
+                continue
+            self.request_finished.emit(None, self.model_id, payload.get('messages', []), response, handler.last_usage)
+            proposals.update(parse_proposals(response, batch))
+        return proposals
@@ -0,0 +1,163 @@
+from PyQt5.QtWidgets import QMessageBox, QDialog
+from hashing import item_source_hash
+from glossary_extractor import scan_cache_path, load_scan_cache, save_scan_cache
+
+
+class GlossaryManager:
+    def __init__(self, main_window):
+        self.main_window = main_window
+        self.extraction_thread = None
+        self.consistency_thread = None
+        self.report_dialog = None
+
+    def edit_glossary(self):
+        if not self.main_window.current_project_data:
+            QMessageBox.warning(self.main_window, "Glossary", "No project loaded.")
+            return
+
+        from ui.glossary_dialog import GlossaryDialog
+        current_text = self.main_window.source_text_area.toPlainText() if self.main_window.current_item_index is not None else ""
+        dialog = GlossaryDialog(self.main_window, self.main_window.current_project_data.get('glossary', []), current_text)
+        if dialog.exec_() == QDialog.Accepted:
+            entries = dialog.get_entries()
+            if entries != self.main_window.current_project_data.get('glossary', []):
+                self.main_window.current_project_data['glossary'] = entries
+                self.main_window.mark_dirty()
+                self.main_window._update_status_bar()
+                self.main_window.statusBar().showMessage(f"Glossary updated: {len(entries)} terms.", 3000)
+
+    def extract_glossary(self):
+        """Scan the project for recurring names and terms and add them to the glossary."""
+        project_data = self.main_window.current_project_data
+        if not project_data or not self.main_window.current_file:
+            QMessageBox.warning(self.main_window, "Extract Glossary", "No project loaded.")
+            return
+        if self.extraction_thread and self.extraction_thread.isRunning():
+            QMessageBox.information(self.main_window, "Extract Glossary", "Glossary extraction is already running.")
+            return
+
+        answer = QMessageBox.question(
+            self.main_window, "Extract Glossary",
+            "Scan all items for recurring names and terms.\n\n"
+            "Ask the project model to propose translations for the new terms?",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+        )
+        if answer == QMessageBox.Cancel:
+            return
+
+        # Only items whose source changed since the last scan are scanned again
+        cache = load_scan_cache(scan_cache_path(self.main_window.current_file))
+        item_hashes = []
+        texts_to_scan = {}
+        for item in self.main_window.project_items:
+            source_text = item.get('source_text', '').strip()
+            if not source_text:
+                continue
+            item_hash = item_source_hash(item)
+            item_hashes.append(item_hash)
+            if item_hash not in cache:
+                texts_to_scan[item_hash] = source_text
+
+        known_terms = [entry.get('source', '') for entry in project_data.get('glossary', [])]
+        model_id = project_data.get('model', '') if answer == QMessageBox.Yes else None
+
+        from ui.glossary_extraction_thread import GlossaryExtractionThread
+
+        project_file = self.main_window.current_file
+        self.extraction_thread = GlossaryExtractionThread(
+            self.main_window, texts_to_scan, cache, item_hashes, known_terms,
+            model_id=model_id, target_language=project_data.get('target_language', '')
+        )
+        self.extraction_thread.progress_updated.connect(lambda msg: self.main_window.statusBar().showMessage(msg))
+        self.extraction_thread.error.connect(lambda msg: print(f"Warning: {msg}"))
+        self.extraction_thread.request_finished.connect(
+            lambda _, model, messages, answer, usage: self._record_proposal_request(
+                project_file, model, messages, answer, usage)
+        )
+        self.extraction_thread.extraction_finished.connect(
+            lambda scanned, rows, proposals: self._handle_extraction_finished(
+                project_file, cache, item_hashes, scanned, rows, proposals)
+        )
+        self.extraction_thread.start()
+
+    def _record_proposal_request(self, project_file, model, messages, answer, usage):
+        if project_file == self.main_window.current_file:
+            self.main_window.cost_manager.record_request(None, model, messages, answer, usage, kind="glossary")
+
+    def _handle_extraction_finished(self, project_file, cache, item_hashes, scanned, rows, proposals):
+        # Keep the cache to the items that still exist
+        cache.update(scanned)
+        live = set(item_hashes)
+        save_scan_cache(scan_cache_path(project_file), {h: c for h, c in cache.items() if h in live})
+
+        if project_file != self.main_window.current_file or not self.main_window.current_project_data:
+            return
+
+        glossary = self.main_window.current_project_data.setdefault('glossary', [])
+        known = {entry.get('source', '').strip().lower() for entry in glossary}
+        added = 0
+        for term, count, item_count in rows:
+            if term.lower() in known:
+                continue
+            glossary.append({
+                "source": term,
+                "target": proposals.get(term, ""),
+                "origin": "extracted",
+                "count": count,
+                "items": item_count
+            })
+            added += 1
+
+        if added:
+            self.main_window.mark_dirty()
+        translated = sum(1 for term, _, _ in rows if term in proposals)
+        message = f"Glossary extraction found {added} new terms"
+        if proposals:
+            message += f", {translated} with proposed translations"
+        message += f" ({len(scanned)} items scanned)."
+        self.main_window.statusBar().showMessage(message, 5000)
+
+        if added:
+            QMessageBox.information(self.main_window, "Extract Glossary",
+                                    message + "\n\nTerms without a translation are not sent to the model "
+                                              "until one is filled in. Review them now.")
+            self.edit_glossary()
+
+    def check_consistency(self):
+        """Check all translated items against the glossary and each other, then show the report."""
+        if not self.main_window.current_project_data:
+            QMessageBox.warning(self.main_window, "Consistency Check", "No project loaded.")
+            return
+        if self.consistency_thread and self.consistency_thread.isRunning():
+            return
+
+        # Snapshot: the check runs in other processes while editing continues
+        items = [{"name": item.get('name', ''),
+                  "source_text": item.get('source_text', ''),
+                  "translated_text": item.get('translated_text', '')}
+                 for item in self.main_window.project_items]
+        glossary = [dict(entry) for entry in self.main_window.current_project_data.get('glossary', [])]
+
+        from ui.consistency_thread import ConsistencyCheckThread
+
+        self.consistency_thread = ConsistencyCheckThread(self.main_window, items, glossary)
+        self.consistency_thread.check_finished.connect(self._show_consistency_report)
+        self.consistency_thread.error.connect(
+            lambda msg: QMessageBox.critical(self.main_window, "Consistency Check", msg)
+        )
+        self.main_window.statusBar().showMessage(f"Checking {len(items)} items for consistency...")
+        self.consistency_thread.start()
+
+    def _show_consistency_report(self, issues):
+        if not issues:
+            self.main_window.statusBar().showMessage("Consistency check found no issues.", 5000)
+            QMessageBox.information(self.main_window, "Consistency Check", "No inconsistencies found.")
+            return
+
+        from ui.consistency_report_dialog import ConsistencyReportDialog
+
+        if self.report_dialog:
+            self.report_dialog.close()
+        self.report_dialog = ConsistencyReportDialog(self.main_window, issues)
+        self.report_dialog.show()
+        self.main_window.statusBar().showMessage(f"Consistency check found {len(issues)} issues.", 5000)
@@ -1,13 +1,16 @@
 import copy
-from PyQt5.QtWidgets import QMessageBox, QInputDialog
+from PyQt5.QtWidgets import QMessageBox, QInputDialog, QFileDialog
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
 from ui.translation_state_manager import TranslationState
+from ui.error_panel import item_key
+from chapter_importer import content_hash, TEXT_EXTENSIONS, HTML_EXTENSIONS, EPUB_EXTENSIONS
 
 
 class ItemManager:
     def __init__(self, main_window):
         self.main_window = main_window
+        self.import_thread = None
 
     def add_item(self):
         if not self.main_window.current_project_data: return
@@ -32,6 +35,60 @@ class ItemManager:
         elif ok and not item_name:
              QMessageBox.warning(self.main_window, "Add Item", "Item name cannot be empty.")
 
+    def import_chapters(self, folder=False):
+        """Import chapters from EPUB, text or HTML files (or a folder of them) as new items at the end."""
+        if not self.main_window.current_project_data: return
+        if self.import_thread and self.import_thread.isRunning():
+            QMessageBox.information(self.main_window, "Import Chapters", "An import is already running.")
+            return
+
+        if folder:
+            path = QFileDialog.getExistingDirectory(self.main_window, "Import Chapters from Folder")
+            paths = [path] if path else []
+        else:
+            patterns = " ".join(f"*{extension}" for extension in EPUB_EXTENSIONS + TEXT_EXTENSIONS + HTML_EXTENSIONS)
+            paths, _ = QFileDialog.getOpenFileNames(self.main_window, "Import Chapters", "",
+                                                    f"Chapter Sources ({patterns});;All Files (*)")
+        if not paths:
+            return
+
+        # Snapshots for naming and duplicate detection; the thread never touches project data
+        existing_names = [item.get('name', '') for item in self.main_window.project_items]
+        existing_hashes = [content_hash(item.get('source_text', '')) for item in self.main_window.project_items
+                           if item.get('source_text', '').strip()]
+
+        from ui.chapter_import_thread import ChapterImportThread
+
+        project_items = self.main_window.project_items
+        self.import_thread = ChapterImportThread(self.main_window, paths, existing_names, existing_hashes)
+        self.import_thread.progress_updated.connect(lambda msg: self.main_window.statusBar().showMessage(msg))
+        self.import_thread.error.connect(lambda msg: QMessageBox.critical(self.main_window, "Import Chapters", msg))
+        self.import_thread.import_finished.connect(lambda result: self._handle_import_finished(project_items, result))
+        self.import_thread.start()
+
+    def _handle_import_finished(self, project_items, result):
+        # The project was closed or replaced while importing
+        if project_items is not self.main_window.project_items or not self.main_window.current_project_data:
+            return
+        new_items = result.get("items", [])
+        duplicates = result.get("duplicates", 0)
+        message = f"Imported {len(new_items)} chapters from {result.get('sources', 0)} documents"
+        if duplicates:
+            message += f", skipped {duplicates} duplicates"
+        if not new_items:
+            self.main_window.statusBar().showMessage(message + ".", 5000)
+            QMessageBox.information(self.main_window, "Import Chapters", message + ".")
+            return
+
+        first_new = len(self.main_window.project_items)
+        self.main_window.project_items.extend(new_items)
+        self.main_window.mark_dirty()
+        self.main_window._refresh_listbox_display()
+        self.main_window.item_listbox.setCurrentRow(first_new)
+        self.main_window._update_token_counts()
+        self.main_window.save_project()
+        self.main_window.statusBar().showMessage(message + ".", 5000)
+
     def remove_item(self):
         if self.main_window.current_item_index is None or not self.main_window.current_project_data: return
         
@@ -45,7 +102,11 @@ class ItemManager:
             reply = QMessageBox.question(self.main_window, "Remove Item", f"Are you sure you want to remove '{item_name}'?",
                                        QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
             if reply == QMessageBox.Yes:
-                del self.main_window.project_items[self.main_window.current_item_index]
+                removed = self.main_window.project_items.pop(self.main_window.current_item_index)
+                # Failures are keyed by item identity; a removed item's key may be reused by a new item
+                self.main_window.translation_manager.retry_counts.pop(item_key(removed), None)
+                self.main_window.error_panel.resolve(removed)
+                self.main_window.translation_manager.context_assembler.fragments.prune(self.main_window.project_items)
                 self.main_window.current_item_index = None
                 self.main_window._refresh_listbox_display()
                 self.main_window._update_token_counts()
@@ -1,6 +1,8 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLineEdit, 
                             QDialogButtonBox, QLabel, QMessageBox, QComboBox)
+from PyQt5.QtCore import Qt
 from data_manager import load_config_defaults # Import the centralized function
+from context_packer import CONTEXT_MODES, context_mode_label, context_mode_from_label
 
 class NewProjectDialog(QDialog):
     def __init__(self, parent=None):
@@ -50,14 +52,10 @@ class NewProjectDialog(QDialog):
         # Context selection mode
         form.addRow(QLabel("<b>Context Selection</b>"))
         self.context_mode_combo = QComboBox()
-        modes = [
-            ("Automatic (Fill Budget)", "fill_budget"),
-            ("Automatic (Strict Nearby)", "nearby"), 
-            ("Manual (Checkboxes)", "manual")
-        ]
-        for text, _ in modes:
+        for i, (mode_id, text, tooltip) in enumerate(CONTEXT_MODES):
             self.context_mode_combo.addItem(text)
-        self.context_mode_combo.setCurrentText("Automatic (Fill Budget)")
+            self.context_mode_combo.setItemData(i, tooltip, Qt.ToolTipRole)
+        self.context_mode_combo.setCurrentText(context_mode_label("fill_budget"))
         form.addRow("Context Mode:", self.context_mode_combo)
 
         layout.addLayout(form)
@@ -112,10 +110,6 @@ class NewProjectDialog(QDialog):
             "target_language": self.lang_edit.text().strip(),
             "model": self.model_edit.text().strip() or "google/gemini-2.0-flash-exp:free", # Ensure default if cleared
             "context_token_limit_approx": limit_value,
-            "context_selection_mode": {
-                "Manual (Checkboxes)": "manual",
-                "Automatic (Strict Nearby)": "nearby",
-                "Automatic (Fill Budget)": "fill_budget"
-            }.get(self.context_mode_combo.currentText(), "fill_budget"),
+            "context_selection_mode": context_mode_from_label(self.context_mode_combo.currentText()),
             **({"prompt_config": prompt_config} if prompt_config else {})
         }
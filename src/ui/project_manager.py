@@ -1,16 +1,19 @@
 import os
 import json
-from PyQt5.QtWidgets import QMessageBox, QFileDialog, QDialog
+from PyQt5.QtWidgets import QMessageBox, QDialog
 import os
 import shutil
 import json
 from ui.new_project_dialog import NewProjectDialog
 from ui.project_selection_dialog import ProjectSelectionDialog
+from context_packer import DEFAULT_VERBATIM_RADIUS
+from context_index import DEFAULT_EXCERPT_SEGMENTS
 
 
 class ProjectManager:
     def __init__(self, main_window):
         self.main_window = main_window
+        self.export_thread = None
 
     def new_project(self):
         if not self.main_window._check_unsaved_changes():
@@ -108,6 +111,11 @@ class ProjectManager:
             
         self.main_window.project_items = self.main_window.current_project_data.get("items", [])
         self.main_window.current_item_index = None
+        self.main_window.translation_manager.context_assembler.clear()
+        self.main_window.translation_manager.reset_context_index(filepath)
+        self.main_window.translation_manager.retry_counts.clear()
+        self.main_window.translation_manager.paused_bulk = None
+        self.main_window.error_panel.clear()
 
         loaded_title = self.main_window.current_project_data.get("title", project_filename)
         if not project_title:
@@ -120,7 +128,11 @@ class ProjectManager:
         self.main_window._refresh_listbox_display()
 
         self.main_window.setWindowTitle(f"SagaTrans - {project_title}")
-        self.main_window.statusBar().showMessage(f"Loaded project: {project_title}")
+        if project_data.get('batch_job'):
+            self.main_window.statusBar().showMessage(
+                f"Loaded project: {project_title}. A batch job has results to collect; use Bulk Translate.")
+        else:
+            self.main_window.statusBar().showMessage(f"Loaded project: {project_title}")
         self.main_window.is_dirty = False
         self.main_window._update_ui_state()
 
@@ -139,6 +151,7 @@ class ProjectManager:
 
             with open(self.main_window.current_file, "w", encoding="utf-8") as f:
                 json.dump(self.main_window.current_project_data, f, indent=4)
+            self.main_window.translation_manager.save_context_index(self.main_window.current_file)
 
             self.main_window.is_dirty = False
             self.main_window._update_ui_state()
@@ -156,6 +169,13 @@ class ProjectManager:
         if dialog.exec_() == QDialog.Accepted:
             updated_settings = dialog.get_data()
 
+            project_data = self.main_window.current_project_data
+            old_limit = project_data.get('context_token_limit_approx', -1)
+            old_mode = project_data.get('context_selection_mode', 'fill_budget')
+            old_selection = (project_data.get('context_verbatim_radius', DEFAULT_VERBATIM_RADIUS),
+                             project_data.get('context_excerpt_segments', DEFAULT_EXCERPT_SEGMENTS),
+                             project_data.get('embedding_model', ''), project_data.get('model', ''))
+
             self.main_window.current_project_data.update({
                 'title': updated_settings.get('title', ''),
                 'description': updated_settings.get('description', ''),
@@ -164,52 +184,82 @@ class ProjectManager:
                 'model': updated_settings.get('model', ''),
                 'context_token_limit_approx': updated_settings.get('context_token_limit_approx', -1),
                 'context_selection_mode': updated_settings.get('context_selection_mode', 'fill_budget'),
+                'context_verbatim_radius': updated_settings.get('context_verbatim_radius', DEFAULT_VERBATIM_RADIUS),
+                'fallback_models': updated_settings.get('fallback_models', []),
+                'hedge_after_seconds': updated_settings.get('hedge_after_seconds', 0),
+                'batch_limits': updated_settings.get('batch_limits', {}),
+                'summary_model': updated_settings.get('summary_model', ''),
+                'summary_max_words': updated_settings.get('summary_max_words', 150),
+                'embedding_model': updated_settings.get('embedding_model', ''),
+                'context_excerpt_segments': updated_settings.get('context_excerpt_segments', DEFAULT_EXCERPT_SEGMENTS),
                 'prompt_config': updated_settings.get('prompt_config', {})
             })
 
-            old_limit = self.main_window.current_project_data.get('context_token_limit_approx', -1)
             new_limit = updated_settings.get('context_token_limit_approx', -1)
             limit_changed = old_limit != new_limit
 
-            old_mode = self.main_window.current_project_data.get('context_selection_mode', 'fill_budget')
             new_mode = updated_settings.get('context_selection_mode', 'fill_budget')
             mode_changed = old_mode != new_mode
 
+            new_selection = (project_data['context_verbatim_radius'], project_data['context_excerpt_segments'],
+                             project_data['embedding_model'], project_data['model'])
+            selection_changed = old_selection != new_selection
+
             self.main_window.statusBar().showMessage("Project settings updated.")
             self.main_window.mark_dirty()
 
-            if limit_changed or mode_changed:
+            if limit_changed or mode_changed or selection_changed:
                 self.main_window._refresh_listbox_display()
 
             # Automatically save the project after updating settings
             self.save_project()
             QMessageBox.information(self.main_window, "Edit Project", "Project settings updated and saved.")
 
-    def export_epub(self):
-        """Handles the EPUB export process."""
+    def export_book(self):
+        """Export the project as EPUB, HTML, Markdown or a bilingual edition in the background."""
         if not self.main_window.current_project_data:
-            QMessageBox.warning(self.main_window, "Export EPUB", "No project loaded.")
+            QMessageBox.warning(self.main_window, "Export", "No project loaded.")
+            return
+        if self.export_thread and self.export_thread.isRunning():
+            QMessageBox.information(self.main_window, "Export", "An export is already running.")
             return
 
-        options = QFileDialog.Options()
-        # options |= QFileDialog.DontUseNativeDialog # Uncomment if needed for debugging file dialog issues
+        from ui.export_dialog import ExportDialog
+        project_data = self.main_window.current_project_data
+        dialog = ExportDialog(self.main_window, project_data.get('title', ''), project_data.get('export_options', {}))
+        if dialog.exec_() != QDialog.Accepted:
+            return
 
-        # Suggest a default filename based on project title
-        default_filename = self.main_window.current_project_data.get('title', 'Exported_Project')
-        default_filename = "".join(c for c in default_filename if c.isalnum() or c in (' ', '_', '-')).rstrip()
-        default_filename = default_filename.replace(" ", "_") + ".epub"
+        options = dialog.get_options()
+        if options != project_data.get('export_options'):
+            project_data['export_options'] = options
+            self.main_window.mark_dirty()
 
-        filepath, _ = QFileDialog.getSaveFileName(self.main_window, "Export Project as EPUB",
-                                                  default_filename,
-                                                  "EPUB Files (*.epub);;All Files (*)", options=options)
+        from epub_exporter import render_cache_dir
+        from ui.export_thread import ExportThread
 
-        if filepath:
-            from epub_exporter import export_project_to_epub
-            success, message = export_project_to_epub(self.main_window.current_project_data, filepath)
-            if success:
-                QMessageBox.information(self.main_window, "Export EPUB", f"Project successfully exported to:\n{filepath}")
-            else:
-                QMessageBox.critical(self.main_window, "Export EPUB Error", f"Failed to export EPUB:\n{message}")
+        # Include unsaved edits of the displayed item, then export a snapshot
+        self.main_window._save_text_for_index(self.main_window.current_item_index)
+        snapshot = dict(project_data)
+        snapshot['items'] = [dict(item) for item in self.main_window.project_items]
+        cache_dir = render_cache_dir(self.main_window.current_file) if self.main_window.current_file else None
+
+        self.export_thread = ExportThread(self.main_window, snapshot, dialog.get_output_path(), options, cache_dir)
+        self.export_thread.progress_updated.connect(
+            lambda done, total, msg: self.main_window.statusBar().showMessage(msg)
+        )
+        self.export_thread.export_finished.connect(self._handle_export_finished)
+        self.export_thread.error.connect(
+            lambda msg: QMessageBox.critical(self.main_window, "Export Error", f"Failed to export:\n{msg}")
+        )
+        self.main_window.statusBar().showMessage("Exporting...")
+        self.export_thread.start()
+
+    def _handle_export_finished(self, paths):
+        self.main_window.statusBar().showMessage(f"Exported to {paths[0]}" if len(paths) == 1
+                                                 else f"Exported {len(paths)} volumes", 5000)
+        QMessageBox.information(self.main_window, "Export",
+                                "Project successfully exported to:\n" + "\n".join(paths))
 
     def remove_project_file(self, project_filename):
         """Remove a project file from the projects directory."""
@@ -1,8 +1,8 @@
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTextEdit, QAction, QSplitter, QWidget, QVBoxLayout, QToolBar,
-    QFileDialog, QMessageBox, QListWidget, QPushButton, QHBoxLayout, QInputDialog, QDialog, QLineEdit, QDialogButtonBox, QLabel,
-    QListWidgetItem, QTabWidget, QComboBox, QSizePolicy, QGridLayout
+    QMessageBox, QListWidget, QPushButton, QHBoxLayout, QInputDialog, QDialog, QLineEdit, QDialogButtonBox, QLabel,
+    QListWidgetItem, QTabWidget, QComboBox, QSizePolicy, QGridLayout, QMenu
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QTimer, QUrl
 from PyQt5.QtGui import QColor, QClipboard
@@ -22,8 +22,6 @@ import markdown2
 import json
 import os
 from ui.qt_project_dialog import ProjectSettingsDialog
-import tiktoken
-from epub_exporter import export_project_to_epub # Import the new exporter
 
 # Import the new manager classes
 from ui.project_manager import ProjectManager
@@ -31,10 +29,14 @@ from ui.item_manager import ItemManager
 from ui.preview_manager import PreviewManager
 from ui.translation_manager import TranslationManager
 from ui.token_manager import TokenManager
+from ui.glossary_manager import GlossaryManager
+from ui.cost_manager import CostManager
+from ui.error_panel import ErrorPanel
 from ui.plain_text_edit import PlainTextEdit
 from ui.translation_thread import TranslationThread
 from ui.translation_state_manager import TranslationStateManager, TranslationState, LockLevel
 from ui.item_translation_buffer import ItemTranslationBuffer
+from context_packer import CONTEXT_MODES, DEFAULT_VERBATIM_RADIUS, context_mode_label, context_mode_from_label
 
 class QtMainWindow(QMainWindow):
     # Application version
@@ -59,15 +61,9 @@ class QtMainWindow(QMainWindow):
         self.project_metadata = {}
         self.project_items = []  # List of dicts with keys: name, source_text, translated_text, approx_token_count
         self.current_item_index = None
-        self.tokenizer = None
         self.current_file = None
         self.is_dirty = False # Track unsaved changes
         self.current_project_data = None # Moved this line up
-        try:
-            import tiktoken
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
-        except Exception as e:
-            print(f"Warning: Tokenizer init failed: {e}")
 
         # Preview-related attributes
         self.preview_visible = False
@@ -86,6 +82,9 @@ class QtMainWindow(QMainWindow):
         self.item_manager = ItemManager(self)
         self.preview_manager = PreviewManager(self)
         self.translation_manager = TranslationManager(self)
+        self.glossary_manager = GlossaryManager(self)
+        self.cost_manager = CostManager(self)
+        self.error_panel = ErrorPanel(self)
         self.token_manager = TokenManager(self)
         self.translation_state_manager = TranslationStateManager(self)
         
@@ -146,11 +145,18 @@ class QtMainWindow(QMainWindow):
         self.remove_item_button = QPushButton("Remove")
         self.rename_item_button = QPushButton("Rename")
         self.duplicate_item_button = QPushButton("Duplicate")
+        self.import_items_button = QPushButton("Import")
+        self.import_items_button.setToolTip("Import chapters from EPUB, text or HTML files")
+        import_menu = QMenu(self.import_items_button)
+        import_menu.addAction("Files (EPUB, TXT, HTML)...", lambda: self.item_manager.import_chapters())
+        import_menu.addAction("HTML/Text Folder...", lambda: self.item_manager.import_chapters(folder=True))
+        self.import_items_button.setMenu(import_menu)
 
         self.item_button_layout.addWidget(self.add_item_button)
         self.item_button_layout.addWidget(self.remove_item_button)
         self.item_button_layout.addWidget(self.rename_item_button)
         self.item_button_layout.addWidget(self.duplicate_item_button)
+        self.item_button_layout.addWidget(self.import_items_button)
 
         self.side_panel_layout.addWidget(self.item_button_frame)
 
@@ -346,6 +352,10 @@ class QtMainWindow(QMainWindow):
         self.edit_action.setShortcut("Ctrl+E")
         self.translate_action = QAction("Translate Item", self)
         self.translate_action.setShortcut("Ctrl+T")
+        self.translate_stale_action = QAction("Translate Stale", self)
+        self.translate_stale_action.setToolTip("Translate items that are untranslated or whose source, prompt or model changed since")
+        self.bulk_translate_action = QAction("Bulk Translate", self)
+        self.bulk_translate_action.setToolTip("Translate stale items as one background job, through the provider's batch API where available")
         self.toggle_live_preview_action = QAction("Toggle Live Preview", self)
         self.toggle_live_preview_action.setCheckable(True)
         self.toggle_live_preview_action.setShortcut("Ctrl+Shift+M")
@@ -359,29 +369,34 @@ class QtMainWindow(QMainWindow):
         self.about_action.setShortcut("F1")
 
         # Add Export as EPUB action
-        self.export_epub_action = QAction("Export as EPUB", self)
-        self.export_epub_action.setShortcut("Ctrl+Shift+E") # Choose an appropriate shortcut
+        self.export_action = QAction("Export", self)
+        self.export_action.setShortcut("Ctrl+Shift+E")
+        self.export_action.setToolTip("Export as EPUB, HTML, Markdown or a bilingual edition")
+
+        self.glossary_action = QAction("Glossary", self)
+        self.glossary_action.setShortcut("Ctrl+G")
+        self.glossary_action.setToolTip("Edit the project glossary; matching terms are added to every request")
+
+        self.extract_glossary_action = QAction("Extract Glossary", self)
+        self.extract_glossary_action.setToolTip("Find recurring names and terms in all items and add them to the glossary")
+
+        self.check_consistency_action = QAction("Check Consistency", self)
+        self.check_consistency_action.setToolTip("Find items whose translation deviates from the glossary or from other items")
+
+        self.generate_summaries_action = QAction("Generate Summaries", self)
+        self.generate_summaries_action.setToolTip("Summarize items whose context summary is missing or out of date")
+
+        self.cost_report_action = QAction("Cost Report", self)
+        self.cost_report_action.setToolTip("Tokens and cost of the project's requests per model, batch, context mode and item")
 
         # Context mode selector
         self.context_mode_combo = QComboBox()
-        modes = [
-            ("Automatic (Fill Budget)", "Includes nearby items until token budget is nearly full"),
-            ("Automatic (Strict Nearby)", "Includes exactly 2 items before and after current item"),
-            ("Manual (Checkboxes)", "Manually select which items to include as context")
-        ]
-
-        for i, (text, tooltip) in enumerate(modes):
+        for i, (mode_id, text, tooltip) in enumerate(CONTEXT_MODES):
             self.context_mode_combo.addItem(text)
             self.context_mode_combo.setItemData(i, tooltip, Qt.ToolTipRole)
 
         current_mode = self.current_project_data.get("context_selection_mode", "fill_budget") if self.current_project_data else "fill_budget"
-        initial_text = "Automatic (Fill Budget)"
-        if current_mode == "manual":
-            initial_text = "Manual (Checkboxes)"
-        elif current_mode == "nearby":
-            initial_text = "Automatic (Strict Nearby)"
-
-        self.context_mode_combo.setCurrentText(initial_text)
+        self.context_mode_combo.setCurrentText(context_mode_label(current_mode))
         self.context_mode_combo.currentTextChanged.connect(self._on_context_mode_changed)
         self.context_mode_combo.setToolTip("Select how context items are chosen for translation")
 
@@ -390,13 +405,23 @@ class QtMainWindow(QMainWindow):
         toolbar.addAction(self.save_action)
         toolbar.addSeparator()
         toolbar.addAction(self.edit_action)
+        toolbar.addAction(self.glossary_action)
+        toolbar.addAction(self.extract_glossary_action)
+        toolbar.addAction(self.check_consistency_action)
         toolbar.addAction(self.translate_action)
+        toolbar.addAction(self.translate_stale_action)
+        toolbar.addAction(self.bulk_translate_action)
         toolbar.addAction(self.toggle_live_preview_action)
         toolbar.addAction(self.view_request_action)
         toolbar.addAction(self.view_response_action)
+        toolbar.addAction(self.generate_summaries_action)
+        toolbar.addAction(self.cost_report_action)
+        errors_action = self.error_panel.toggleViewAction()
+        errors_action.setToolTip("Show failed requests, with retry")
+        toolbar.addAction(errors_action)
         toolbar.addSeparator()
         toolbar.addAction(self.about_action) # Add About action to toolbar
-        toolbar.addAction(self.export_epub_action) # Add the new action to the toolbar
+        toolbar.addAction(self.export_action)
         toolbar.addSeparator()
         toolbar.addWidget(QLabel("Context Mode:"))
         toolbar.addWidget(self.context_mode_combo)
@@ -408,11 +433,18 @@ class QtMainWindow(QMainWindow):
         self.save_action.triggered.connect(self.save_project)
         self.edit_action.triggered.connect(self.edit_project_settings)
         self.translate_action.triggered.connect(self.translate_current_item)
+        self.translate_stale_action.triggered.connect(self.translation_manager.translate_stale_items)
+        self.bulk_translate_action.triggered.connect(self.translation_manager.translate_in_bulk)
+        self.cost_report_action.triggered.connect(self.cost_manager.show_cost_report)
         self.toggle_live_preview_action.triggered.connect(self.toggle_live_preview_panel)
         self.view_request_action.triggered.connect(self.show_request_payload)
         self.view_response_action.triggered.connect(self.show_last_response)
         self.about_action.triggered.connect(self.show_about)
-        self.export_epub_action.triggered.connect(self.export_epub) # Connect the new action
+        self.export_action.triggered.connect(self.export_book)
+        self.generate_summaries_action.triggered.connect(self.translation_manager.generate_summaries)
+        self.glossary_action.triggered.connect(self.glossary_manager.edit_glossary)
+        self.extract_glossary_action.triggered.connect(self.glossary_manager.extract_glossary)
+        self.check_consistency_action.triggered.connect(self.glossary_manager.check_consistency)
 
         # Connect item buttons
         self.add_item_button.clicked.connect(self.add_item) # Keep one connection
@@ -422,6 +454,10 @@ class QtMainWindow(QMainWindow):
         self.move_item_up_button.clicked.connect(self.move_item_up)
         self.move_item_down_button.clicked.connect(self.move_item_down)
 
+        # Failed requests are listed here instead of in modal dialogs
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.error_panel)
+        self.error_panel.retry_requested.connect(self.translation_manager.retry_items)
+
         # Status bar
         self.status = self.statusBar()
         self.status.showMessage("Ready")
@@ -430,30 +466,8 @@ class QtMainWindow(QMainWindow):
         self._update_ui_state()
 
     # --- EPUB Export ---
-    def export_epub(self):
-        """Handles the EPUB export process."""
-        if not self.current_project_data:
-            QMessageBox.warning(self, "Export EPUB", "No project loaded.")
-            return
-
-        options = QFileDialog.Options()
-        # options |= QFileDialog.DontUseNativeDialog # Uncomment if needed for debugging file dialog issues
-
-        # Suggest a default filename based on project title
-        default_filename = self.current_project_data.get('title', 'Exported_Project')
-        default_filename = "".join(c for c in default_filename if c.isalnum() or c in (' ', '_', '-')).rstrip()
-        default_filename = default_filename.replace(" ", "_") + ".epub"
-
-        filepath, _ = QFileDialog.getSaveFileName(self, "Export Project as EPUB",
-                                                  default_filename,
-                                                  "EPUB Files (*.epub);;All Files (*)", options=options)
-
-        if filepath:
-            success, message = export_project_to_epub(self.current_project_data, filepath)
-            if success:
-                QMessageBox.information(self, "Export EPUB", f"Project successfully exported to:\n{filepath}")
-            else:
-                QMessageBox.critical(self, "Export EPUB Error", f"Failed to export EPUB:\n{message}")
+    def export_book(self):
+        self.project_manager.export_book()
 
     # --- Project Handling ---
     def new_project(self):
@@ -509,6 +523,9 @@ class QtMainWindow(QMainWindow):
         self.item_listbox.clear()
         current_selection_row = self.current_item_index
         included_indices, excluded_indices = self._get_context_item_indices()
+        summarized_indices = self._get_summarized_context_indices(included_indices)
+        excerpt_indices = set(self.translation_manager.context_excerpts(self.current_item_index, included_indices)) \
+            if self.current_item_index is not None else set()
 
         for i, item in enumerate(self.project_items):
             name = item.get("name", f"Item {i+1}")
@@ -553,6 +570,10 @@ class QtMainWindow(QMainWindow):
             if not is_suitable_for_context:
                 font_style = "italic"
             # Add context inclusion indicator if needed (keep existing functionality)
+            elif i in summarized_indices:
+                display_name = f"[📝] {display_name}"
+            elif i in excerpt_indices:
+                display_name = f"[🔍] {display_name}"
             elif i in included_indices:
                 display_name = f"[⚙️] {display_name}"
                 
@@ -644,7 +665,12 @@ class QtMainWindow(QMainWindow):
             else:
                 # Add context inclusion indicator if needed
                 included_indices, excluded_indices = self._get_context_item_indices()
-                if index in included_indices:
+                if index in self._get_summarized_context_indices(included_indices):
+                    display_name = f"[📝] {display_name}"
+                elif self.current_item_index is not None and \
+                        index in self.translation_manager.context_excerpts(self.current_item_index, included_indices):
+                    display_name = f"[🔍] {display_name}"
+                elif index in included_indices:
                     display_name = f"[⚙️] {display_name}"
                 
             display_text = f"{index + 1}. {display_name.ljust(50)} S:{source_tokens:4} T:{target_tokens:4}"
@@ -709,13 +735,7 @@ class QtMainWindow(QMainWindow):
         if not self.current_project_data:
             return
 
-        mode_mapping = {
-            "Manual (Checkboxes)": "manual",
-            "Automatic (Strict Nearby)": "nearby",
-            "Automatic (Fill Budget)": "fill_budget"
-        }
-
-        new_mode = mode_mapping.get(mode_text, "fill_budget")
+        new_mode = context_mode_from_label(mode_text)
         current_mode = self.current_project_data.get("context_selection_mode", "fill_budget")
 
         if new_mode != current_mode:
@@ -761,8 +781,11 @@ class QtMainWindow(QMainWindow):
         except Exception as e:
              print(f"Warning: Error saving text for index {index_to_save}: {e}")
 
-    def _get_context_item_indices(self):
-        if self.current_item_index is None or not self.current_project_data:
+    def _get_context_item_indices(self, item_index=None):
+        """Returns (included, excluded) context indices for `item_index` (default: current item)."""
+        if item_index is None:
+            item_index = self.current_item_index
+        if item_index is None or not self.current_project_data:
             return set(), set()
 
         mode = self.current_project_data.get("context_selection_mode", "fill_budget")
@@ -783,67 +806,59 @@ class QtMainWindow(QMainWindow):
                     excluded.add(i)
             return included, excluded
 
-        elif mode == "fill_budget":
+        elif mode in ("fill_budget", "fill_budget_max"):
             context_limit = self.current_project_data.get('context_token_limit_approx', -1)
             if context_limit <= 0:
                 return set(), set()
 
-            included = set()
+            candidates = []
             excluded = set()
-            current_token_count = 0
-            target_token_budget = int(context_limit * 0.8)
-
-            left, right = self.current_item_index - 1, self.current_item_index + 1
-            while left >= 0 or right < len(self.project_items):
-                if left >= 0:
-                    # Only consider items that are suitable for context
-                    if self._is_item_suitable_for_context(left):
-                        item = self.project_items[left]
-                        item_tokens = self.count_tokens(item.get('source_text', '')) + \
-                                     self.count_tokens(item.get('translated_text', ''))
+            for i in range(len(self.project_items)):
+                if i == item_index:
+                    continue
+                # Only consider items that are suitable for context
+                if self._is_item_suitable_for_context(i):
+                    candidates.append(i)
+                else:
+                    excluded.add(i)
 
-                        if current_token_count + item_tokens <= target_token_budget:
-                            included.add(left)
-                            current_token_count += item_tokens
-                        else:
-                            excluded.add(left)
-                    else:
-                        excluded.add(left)
-                    left -= 1
+            strategy = "max_items" if mode == "fill_budget_max" else "nearest"
+            plan = self.translation_manager.plan_context(item_index, candidates, context_limit, strategy)
+            return plan.included, excluded | plan.excluded
+        elif mode in ("hierarchical", "relevant"):
+            context_limit = self.current_project_data.get('context_token_limit_approx', -1)
+            if context_limit <= 0:
+                return set(), set()
 
-                if right < len(self.project_items):
-                    # Only consider items that are suitable for context
-                    if self._is_item_suitable_for_context(right):
-                        item = self.project_items[right]
-                        item_tokens = self.count_tokens(item.get('source_text', '')) + \
-                                     self.count_tokens(item.get('translated_text', ''))
+            candidates = []
+            excluded = set()
+            for i in range(len(self.project_items)):
+                if i == item_index:
+                    continue
+                if self._is_item_suitable_for_context(i):
+                    candidates.append(i)
+                else:
+                    excluded.add(i)
 
-                        if current_token_count + item_tokens <= target_token_budget:
-                            included.add(right)
-                            current_token_count += item_tokens
-                        else:
-                            excluded.add(right)
-                    else:
-                        excluded.add(right)
-                    right += 1
-            return included, excluded
+            plan = self.translation_manager.plan_context(item_index, candidates, context_limit, mode)
+            return plan.included, excluded | plan.excluded
         elif mode == "nearby":
             context_limit = self.current_project_data.get('context_token_limit_approx', -1)
 
-            included = {self.current_item_index}
+            included = {item_index}
             excluded = set()
 
             if context_limit <= 0:
                 for i in range(len(self.project_items)):
-                    if i != self.current_item_index:
+                    if i != item_index:
                         excluded.add(i)
                 return included, excluded
 
             current_token_count = 0
             target_token_budget = context_limit
 
-            left = self.current_item_index - 1
-            right = self.current_item_index + 1
+            left = item_index - 1
+            right = item_index + 1
 
             while (left >= 0 or right < len(self.project_items)):
                 added_in_iteration = False
@@ -895,6 +910,17 @@ class QtMainWindow(QMainWindow):
 
         return set(), set()
 
+    def _get_summarized_context_indices(self, included_indices, item_index=None):
+        """Subset of `included_indices` that is sent as summaries rather than verbatim."""
+        if item_index is None:
+            item_index = self.current_item_index
+        if item_index is None or not self.current_project_data:
+            return set()
+        if self.current_project_data.get("context_selection_mode") != "hierarchical":
+            return set()
+        radius = self.current_project_data.get("context_verbatim_radius", DEFAULT_VERBATIM_RADIUS)
+        return {i for i in included_indices if abs(i - item_index) > radius}
+
     def _delayed_update_token_counts(self):
         if not hasattr(self, '_debounce_timer'):
             self._debounce_timer = QTimer()
@@ -1195,104 +1221,6 @@ class QtMainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", f"Failed to show response:\n{e}")
 
     # --- Translation ---
-    def _build_api_payload(self):
-        if self.current_item_index is None or not self.current_project_data:
-            QMessageBox.warning(self, "Translation", "No item selected or project loaded.")
-            return None
-
-        source_text = self.source_text_area.toPlainText().strip()
-        target_language = self.current_project_data.get('target_language', '')
-        model_name = self.current_project_data.get('model', '')
-        context_limit = self.current_project_data.get('context_token_limit_approx', -1)
-        prompt_config = self.current_project_data.get('prompt_config', {})
-
-        if not all([source_text, target_language, model_name]):
-            QMessageBox.warning(self, "Translation",
-                              "Cannot translate. Ensure source text exists and project language/model are set.")
-            return None
-
-        config_defaults = self._load_config_defaults().get("default_prompts", {})
-
-        pre_system_prompt_template = prompt_config.get("pre_system_prompt",
-            config_defaults.get("pre_system_prompt",
-                "You are a translation assistant. Translate the final user message into **{target_language}**."
-            )
-        )
-        post_system_prompt_template = prompt_config.get("post_system_prompt",
-            config_defaults.get("post_system_prompt",
-                "IMPORTANT: Respond with *only* the translation of the final user message into **{target_language}**, nothing else."
-            )
-        )
-        user_prompt_template = prompt_config.get("user_prompt",
-            config_defaults.get("user_prompt", "{source_text}")
-        )
-
-        context_item_template = (
-            "\n==================== CONTEXT ITEM START: {item_name} ====================\n"
-            "Source Text ({item_name}):\n{source_text}\n"
-            "{translation_section}"
-            "==================== CONTEXT ITEM END: {item_name} ======================\n"
-        )
-
-        context_items_str = ""
-        included_indices, _ = self._get_context_item_indices()
-        context_token_count = 0
-
-        context_indices_to_use = sorted([idx for idx in included_indices if idx != self.current_item_index])
-
-        for i in context_indices_to_use:
-            try:
-                item = self.project_items[i]
-                item_name = item.get("name", f"Item {i+1}")
-                item_source = item.get("source_text", "").strip()
-                item_translation = item.get("translated_text", "").strip()
-
-                if item_source:
-                    if item_translation:
-                        translation_section = f"\nExisting Translation ({target_language}) for '{item_name}':\n{item_translation}\n"
-                    else:
-                        translation_section = f"\n(No existing translation for '{item_name}')\n"
-
-                    context_item = context_item_template.format(
-                        item_name=item_name,
-                        source_text=item_source,
-                        translation_section=translation_section
-                    )
-                    context_items_str += context_item
-                    context_token_count += self.count_tokens(item_source) + self.count_tokens(item_translation)
-
-            except IndexError:
-                print(f"Warning: Index {i} out of range during context building.")
-                continue
-
-        pre_system_prompt = pre_system_prompt_template.format(target_language=target_language)
-        post_system_prompt = post_system_prompt_template.format(target_language=target_language)
-
-        system_prompt_parts = [pre_system_prompt]
-        if context_items_str:
-            system_prompt_parts.append("\nUse the following context from other items in the project to inform your translation:")
-            system_prompt_parts.append(context_items_str)
-        system_prompt_parts.append("\n" + post_system_prompt)
-
-        final_system_prompt = "\n".join(system_prompt_parts)
-
-        #final_user_prompt = user_prompt_template.format(target_language=target_language)
-        if '{target_language}' in user_prompt_template:
-            final_user_prompt = user_prompt_template.format(source_text=source_text, target_language=target_language)
-        else:
-            final_user_prompt = user_prompt_template.format(source_text=source_text)
-
-
-        return {
-            "model": model_name,
-            "messages": [
-                {"role": "system", "content": final_system_prompt},
-                {"role": "user", "content": final_user_prompt}
-            ],
-            "stream": True,
-            "Target_Language": target_language
-        }
-
     def _build_api_payload(self):
         return self.translation_manager._build_api_payload()
 
@@ -1350,10 +1278,18 @@ class QtMainWindow(QMainWindow):
         # Enable stop button only when current selected item is being translated
         self.stop_button.setEnabled(project_loaded and item_selected and self._is_item_translating(self.current_item_index))
         self.toggle_live_preview_action.setEnabled(project_loaded and QWebEngineView is not None)
-        self.export_epub_action.setEnabled(project_loaded and not is_translating)
+        self.export_action.setEnabled(project_loaded and not is_translating)
+        self.generate_summaries_action.setEnabled(project_loaded)
+        self.translate_stale_action.setEnabled(project_loaded)
+        self.bulk_translate_action.setEnabled(project_loaded)
+        self.cost_report_action.setEnabled(project_loaded)
+        self.glossary_action.setEnabled(project_loaded)
+        self.extract_glossary_action.setEnabled(project_loaded)
+        self.check_consistency_action.setEnabled(project_loaded)
 
         # Item management buttons - respect lock levels
         self.add_item_button.setEnabled(project_loaded and self._can_modify_items())
+        self.import_items_button.setEnabled(project_loaded and self._can_modify_items())
         self.remove_item_button.setEnabled(project_loaded and item_selected and self._can_modify_items())
         self.rename_item_button.setEnabled(project_loaded and item_selected and self._can_modify_items())
         self.duplicate_item_button.setEnabled(project_loaded and item_selected and self._can_modify_items())
@@ -1409,25 +1345,23 @@ class QtMainWindow(QMainWindow):
                 included, excluded = self._get_context_item_indices()
                 context_limit = self.current_project_data.get('context_token_limit_approx', -1)
                 mode = self.current_project_data.get("context_selection_mode", "fill_budget")
-                mode_display = {
-                    "fill_budget": "Automatic (Fill Budget)",
-                    "nearby": "Automatic (Strict Nearby)",
-                    "manual": "Manual (Checkboxes)"
-                }.get(mode, "Unknown")
+                mode_display = context_mode_label(mode)
 
-                current_token_count = 0
                 context_item_indices = set(idx for idx in included if idx != self.current_item_index)
 
-                for i in context_item_indices:
-                    try:
-                        item = self.project_items[i]
-                        current_token_count += self.count_tokens(item.get('source_text', ''))
-                        current_token_count += self.count_tokens(item.get('translated_text', ''))
-                    except IndexError:
-                        print(f"Warning: Index {i} out of range during status bar update.")
-
                 if context_limit > 0:
-                    status_msg = (f"Mode: {mode_display} | Context: {len(context_item_indices)} items ({current_token_count}/{context_limit} tokens) | "
+                    # Whole request: prompts, rendered context and the reply reserve
+                    summarized = self._get_summarized_context_indices(context_item_indices)
+                    excerpts = self.translation_manager.context_excerpts(self.current_item_index, context_item_indices)
+                    plan = self.translation_manager.plan_tokens(self.current_item_index, context_item_indices,
+                                                                context_limit, summarized, excerpts)
+                    current_token_count = plan.total_tokens
+                    items_display = f"{len(context_item_indices)} items"
+                    if summarized:
+                        items_display += f", {len(summarized)} summarized"
+                    if excerpts:
+                        items_display += f", {len(excerpts)} as passages"
+                    status_msg = (f"Mode: {mode_display} | Context: {items_display} ({current_token_count}/{context_limit} tokens) | "
                                   f"Excluded: {len(excluded)} items")
                     if current_token_count > context_limit:
                         status_msg += " [WARNING: Over budget]"
@@ -3,7 +3,15 @@ from PyQt5.QtWidgets import (
     QDialogButtonBox, QLabel, QComboBox, QTextEdit, QPushButton,
     QMessageBox
 )
+from PyQt5.QtCore import Qt
 from data_manager import load_config_defaults # Import the centralized function
+from context_packer import CONTEXT_MODES, DEFAULT_VERBATIM_RADIUS, context_mode_label, context_mode_from_label
+from context_assembler import DEFAULT_SUMMARY_PROMPT
+from context_index import DEFAULT_EXCERPT_SEGMENTS
+from model_router import DEFAULT_HEDGE_AFTER_SECONDS
+from batch_budget import batch_limits
+
+PROJECT_MODEL_LABEL = "(Same as project model)"
 
 class ProjectSettingsDialog(QDialog):
     def __init__(self, parent=None, data=None, model_manager=None):
@@ -89,27 +97,74 @@ class ProjectSettingsDialog(QDialog):
         # Context selection mode
         form.addRow(QLabel("<b>Context Selection</b>"))
         self.context_mode_combo = QComboBox()
-        modes = [
-            ("Automatic (Fill Budget)", "fill_budget"),
-            ("Automatic (Strict Nearby)", "nearby"),
-            ("Manual (Checkboxes)", "manual")
-        ]
-        
-        # Add all modes with tooltips
-        for text, mode_id in modes:
+        for i, (mode_id, text, tooltip) in enumerate(CONTEXT_MODES):
             self.context_mode_combo.addItem(text)
-            
+            self.context_mode_combo.setItemData(i, tooltip, Qt.ToolTipRole)
+
         # Set current mode
         current_mode = self.data.get("context_selection_mode", "fill_budget")
-        if current_mode == "manual":
-            self.context_mode_combo.setCurrentText("Manual (Checkboxes)")
-        elif current_mode == "nearby":
-            self.context_mode_combo.setCurrentText("Automatic (Strict Nearby)")
-        else:
-            self.context_mode_combo.setCurrentText("Automatic (Fill Budget)")
-            
+        self.context_mode_combo.setCurrentText(context_mode_label(current_mode))
+
         form.addRow("Context Mode:", self.context_mode_combo)
 
+        # Hierarchical context: verbatim neighbors, summaries for the rest
+        self.verbatim_radius_edit = QLineEdit(str(self.data.get("context_verbatim_radius", DEFAULT_VERBATIM_RADIUS)))
+        self.verbatim_radius_edit.setToolTip("Hierarchical mode: items this close to the current one are included in full")
+        form.addRow("Verbatim Radius:", self.verbatim_radius_edit)
+
+        # Relevant passages: paragraphs per earlier item and optional local embeddings
+        self.excerpt_segments_edit = QLineEdit(str(self.data.get("context_excerpt_segments", DEFAULT_EXCERPT_SEGMENTS)))
+        self.excerpt_segments_edit.setToolTip("Relevant Passages mode: paragraphs taken from each matching earlier item")
+        form.addRow("Passages per Item:", self.excerpt_segments_edit)
+
+        self.embedding_model_edit = QLineEdit(self.data.get("embedding_model", ""))
+        self.embedding_model_edit.setPlaceholderText("Optional Ollama embedding model, e.g. nomic-embed-text")
+        form.addRow("Embedding Model:", self.embedding_model_edit)
+
+        # Routing: models tried in order when the project model fails or is slow to start
+        self.fallback_models_edit = QLineEdit(", ".join(self.data.get("fallback_models", [])))
+        self.fallback_models_edit.setPlaceholderText("Optional, comma-separated, e.g. openrouter/mistralai/mistral-large")
+        form.addRow("Fallback Models:", self.fallback_models_edit)
+
+        self.hedge_after_edit = QLineEdit(str(self.data.get("hedge_after_seconds", DEFAULT_HEDGE_AFTER_SECONDS)))
+        self.hedge_after_edit.setToolTip("Start the next fallback model as well when no text arrived after this "
+                                         "many seconds; the faster one is kept. 0 turns this off.")
+        form.addRow("Hedge After (s):", self.hedge_after_edit)
+
+        # Batch limits: Translate Stale and queued bulk jobs pause before crossing them; 0 means no limit
+        limits = batch_limits(self.data)
+        self.batch_limit_edits = {}
+        for key, label, tooltip in (
+            ("tokens", "Batch Token Limit:", "Prompt and completion tokens one batch may use"),
+            ("cost", "Batch Cost Limit ($):", "Dollars one batch may spend, from the pricing in models.json"),
+            ("minutes", "Batch Time Limit (min):", "Wall-clock minutes after which a batch starts no more requests"),
+            ("rpm", "Requests per Minute:", "Most requests a batch starts in any minute"),
+        ):
+            edit = QLineEdit(f"{limits[key]:g}")
+            edit.setToolTip(tooltip + ". 0 means no limit.")
+            form.addRow(label, edit)
+            self.batch_limit_edits[key] = edit
+
+        self.summary_model_combo = QComboBox()
+        self.summary_model_combo.addItem(PROJECT_MODEL_LABEL)
+        if self.model_manager:
+            for model_name in self.model_manager.get_all_models():
+                self.summary_model_combo.addItem(model_name)
+        summary_model = self.data.get("summary_model", "")
+        if summary_model and self.summary_model_combo.findText(summary_model) < 0:
+            self.summary_model_combo.addItem(summary_model)
+        self.summary_model_combo.setCurrentText(summary_model or PROJECT_MODEL_LABEL)
+        form.addRow("Summary Model:", self.summary_model_combo)
+
+        self.summary_words_edit = QLineEdit(str(self.data.get("summary_max_words", 150)))
+        form.addRow("Summary Length (words):", self.summary_words_edit)
+
+        self.summary_prompt_edit = QTextEdit()
+        summary_prompt_default = self.default_prompts.get("summary_prompt") or DEFAULT_SUMMARY_PROMPT
+        self.summary_prompt_edit.setPlainText(prompt_config.get("summary_prompt") or summary_prompt_default)
+        self.summary_prompt_edit.setPlaceholderText(f"Default: {summary_prompt_default}")
+        form.addRow("Summary Prompt:", self.summary_prompt_edit)
+
         layout.addLayout(form)
 
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -142,12 +197,18 @@ class ProjectSettingsDialog(QDialog):
             QMessageBox.warning(self, "Reload Failed", message)
 
     def get_data(self):
-        # Always include prompt_config with current values
-        prompt_config = {
+        # Always include prompt_config with current values; keep keys this dialog doesn't edit
+        prompt_config = dict(self.data.get("prompt_config", {}))
+        prompt_config.update({
             "pre_system_prompt": self.pre_system_prompt_edit.toPlainText().strip(),
             "post_system_prompt": self.post_system_prompt_edit.toPlainText().strip(),
-            "user_prompt": self.user_prompt_edit.toPlainText().strip()
-        }
+            "user_prompt": self.user_prompt_edit.toPlainText().strip(),
+            "summary_prompt": self.summary_prompt_edit.toPlainText().strip()
+        })
+
+        summary_model = self.summary_model_combo.currentText()
+        if summary_model == PROJECT_MODEL_LABEL:
+            summary_model = ""
 
         return {
             "title": self.title_edit.text(),
@@ -156,10 +217,14 @@ class ProjectSettingsDialog(QDialog):
             "target_language": self.lang_edit.text(),
             "model": self.model_combo.currentText(),
             "context_token_limit_approx": int(self.limit_edit.text() or -1),
-            "context_selection_mode": {
-                "Manual (Checkboxes)": "manual",
-                "Automatic (Strict Nearby)": "nearby",
-                "Automatic (Fill Budget)": "fill_budget"
-            }.get(self.context_mode_combo.currentText(), "fill_budget"),
+            "context_selection_mode": context_mode_from_label(self.context_mode_combo.currentText()),
+            "context_verbatim_radius": int(self.verbatim_radius_edit.text() or DEFAULT_VERBATIM_RADIUS),
+            "context_excerpt_segments": int(self.excerpt_segments_edit.text() or DEFAULT_EXCERPT_SEGMENTS),
+            "embedding_model": self.embedding_model_edit.text().strip(),
+            "fallback_models": [model.strip() for model in self.fallback_models_edit.text().split(",") if model.strip()],
+            "hedge_after_seconds": float(self.hedge_after_edit.text() or DEFAULT_HEDGE_AFTER_SECONDS),
+            "batch_limits": {key: float(edit.text() or 0) for key, edit in self.batch_limit_edits.items()},
+            "summary_model": summary_model,
+            "summary_max_words": int(self.summary_words_edit.text() or 150),
             "prompt_config": prompt_config
         }
@@ -0,0 +1,54 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from model_request_handler import ModelRequestHandler
+
+
+class SummaryThread(QThread):
+    """Generates context summaries for a batch of items, one request at a time.
+
+    Jobs are snapshots taken on the GUI thread: (item_index, source_hash, payload).
+    Results are emitted per item so the caller can store them as they arrive and
+    discard any whose item changed in the meantime.
+    """
+    summary_ready = pyqtSignal(int, str, str)  # item_index, source_hash, summary text
+    progress_updated = pyqtSignal(int, int)  # done, total
+    error = pyqtSignal(str)
+    request_finished = pyqtSignal(object, str, object, str, object)  # item_index, model, messages, answer, usage
+
+    def __init__(self, parent, model_id, jobs):
+        super().__init__(parent)
+        self.model_id = model_id
+        self.jobs = jobs
+        self.model_manager = parent.model_manager if hasattr(parent, 'model_manager') else None
+        self.stop_requested = False
+
+    def stop(self):
+        self.stop_requested = True
+
+    def run(self):
+        model_config = self.model_manager.get_model_config(self.model_id) if self.model_manager else None
+        if not model_config:
+            self.error.emit(f"Invalid model configuration for {self.model_id}")
+            return
+
+        handler = ModelRequestHandler.create_handler(self.model_id, model_config)
+        if not handler:
+            self.error.emit(f"Unsupported model provider for {self.model_id}")
+            return
+        if not handler.validate_connection():
+            self.error.emit(f"Could not connect to {self.model_id} provider")
+            return
+
+        total = len(self.jobs)
+        for done, (item_index, source_hash, payload) in enumerate(self.jobs):
+            if self.stop_requested:
+                return
+            try:
+                answer = handler.complete(payload)
+            except Exception as e:
+                self.error.emit(f"Summary error for item {item_index + 1}: {str(e)}")
+                continue
+            self.request_finished.emit(item_index, self.model_id, payload.get('messages', []), answer, handler.last_usage)
+            summary = answer.strip()
+            if summary and not self.stop_requested:
+                self.summary_ready.emit(item_index, source_hash, summary)
+            self.progress_updated.emit(done + 1, total)
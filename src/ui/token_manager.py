@@ -1,23 +1,41 @@
+from tokenizer_registry import tokenizer_for_model
+from token_calibration import CalibratedTokenizer
+
+
 class TokenManager:
     def __init__(self, main_window):
         self.main_window = main_window
+        self._tokenizers = {}  # model ID -> Tokenizer
+
+    def tokenizer(self):
+        """Tokenizer of the project model, resolved once per model.
+
+        Ratios learned from provider usage take over where the model has no
+        exact tokenizer, and for texts too long to encode quickly.
+        """
+        model_id = (self.main_window.current_project_data or {}).get('model', '')
+        tokenizer = self._tokenizers.get(model_id)
+        if tokenizer is None:
+            model_manager = getattr(self.main_window, 'model_manager', None)
+            model_config = model_manager.get_model_config(model_id) if model_manager and model_id else None
+            tokenizer = self._tokenizers[model_id] = CalibratedTokenizer(
+                tokenizer_for_model(model_id, model_config), model_id)
+        return tokenizer
 
     def count_tokens(self, text: str) -> int:
         if not isinstance(text, str):
             text = ""
 
-        cache_key = hash(text)
+        # Counts differ between tokenizers, so the cache is keyed per tokenizer
+        tokenizer = self.tokenizer()
+        cache_key = (tokenizer.name, hash(text))
         if cache_key in self.main_window._token_cache:
             return self.main_window._token_cache[cache_key]
 
-        token_count = 0
-        if self.main_window.tokenizer:
-            try:
-                token_count = len(self.main_window.tokenizer.encode(text))
-            except Exception as e:
-                print(f"Tokenizer failed: {e}. Using fallback.")
-                token_count = len(text) // 4
-        else:
+        try:
+            token_count = tokenizer.count(text)
+        except Exception as e:
+            print(f"Tokenizer failed: {e}. Using fallback.")
             token_count = len(text) // 4
 
         self.main_window._token_cache[cache_key] = token_count
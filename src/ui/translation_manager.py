@@ -1,9 +1,90 @@
 import json
+import os
+from datetime import datetime
 from PyQt5.QtWidgets import QMessageBox, QDialog, QDialogButtonBox, QVBoxLayout, QTextEdit, QLabel, QTabWidget, QWidget
 from PyQt5.QtCore import QTimer
-from data_manager import load_config_defaults
+from data_manager import load_config_defaults, CONFIG_FILE
 from ui.translation_state_manager import TranslationState
 from ui.item_translation_buffer import ItemTranslationBuffer
+from context_assembler import ContextAssembler, resolve_prompt_templates, get_fresh_summary, DEFAULT_SUMMARY_PROMPT
+from context_packer import ContextPacker, DEFAULT_VERBATIM_RADIUS
+from hashing import item_source_hash, text_hash, prompt_hash
+from context_index import ContextIndex, DEFAULT_EXCERPT_SEGMENTS, vectors_path
+from ollama_client import get_ollama_embeddings
+from glossary import Glossary, render_glossary_block
+from endpoint_pool import parse_endpoints, endpoint_capacity
+from token_calibration import get_calibration
+from cost_ledger import format_estimate
+from batch_budget import BatchBudget, batch_limits, exceeded_limits
+from ui.error_panel import item_key
+
+# Translations a batch runs at the same time unless the project sets `batch_concurrency`
+# or the model's provider lists endpoints with more capacity
+DEFAULT_BATCH_CONCURRENCY = 2
+
+# Seconds before each automatic retry of a translation that failed with a transient error
+RETRY_DELAYS = (5, 30)
+
+# Errors that retrying the same request cannot fix
+PERMANENT_ERRORS = ("403", "api key", "access denied", "unauthorized", "authentication", "model not found",
+                    "invalid model", "unsupported model provider", "failed to build api payload")
+
+
+def is_retryable(error_msg):
+    error_lower = error_msg.lower()
+    return not any(keyword in error_lower for keyword in PERMANENT_ERRORS)
+
+
+def describe_error(error_msg, timeout=False, validation=False):
+    """The error with its likely causes, shown as the tooltip of the error panel."""
+    error_lower = error_msg.lower()
+    if timeout:
+        return (f"Translation timed out:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• Slow network connection\n"
+                f"• Server overload\n"
+                f"• Large text requiring more processing time\n\n"
+                f"Try reducing text length or checking your connection.")
+    if validation:
+        return (f"Connection validation failed:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• Model not available on server\n"
+                f"• Authentication issues\n"
+                f"• Server maintenance\n\n"
+                f"Check your model configuration and server status.")
+    if "openrouter api key error" in error_lower:
+        return (f"OpenRouter API Key Error:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• Invalid or expired API key\n"
+                f"• Missing API key in your project settings\n"
+                f"• API key format issues\n\n"
+                f"Please check your OpenRouter API key in project settings.")
+    if "openrouter quota exceeded" in error_lower or "rate limit" in error_lower:
+        return (f"OpenRouter Quota Exceeded:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• API usage limit reached\n"
+                f"• Too many requests in a short time\n"
+                f"• Account subscription limits\n\n"
+                f"Please wait a while or check your OpenRouter account limits.")
+    if "openrouter model access denied" in error_lower:
+        return (f"OpenRouter Model Access Denied:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• Model requires special access\n"
+                f"• Model is not available to your account\n"
+                f"• Model is deprecated or unavailable\n\n"
+                f"Please check model availability in your OpenRouter account.")
+    if "openrouter access denied" in error_lower:
+        return (f"OpenRouter Access Denied:\n{error_msg}\n\n"
+                f"This could be due to:\n"
+                f"• Authentication issues\n"
+                f"• Account restrictions\n"
+                f"• Service maintenance\n\n"
+                f"Please check your OpenRouter account status.")
+    if "timeout" in error_lower:
+        return f"Connection timeout:\n{error_msg}\n\nCheck your network connection and Ollama server status."
+    if "model not found" in error_lower:
+        return f"Model error:\n{error_msg}\n\nVerify the model name and ensure it's pulled on your Ollama server."
+    return f"Error:\n{error_msg}"
 
 
 class TranslationManager:
@@ -11,125 +92,764 @@ class TranslationManager:
         self.main_window = main_window
         self.active_translations = {}  # item_index -> ItemTranslationBuffer
         self.active_threads = {}  # item_index -> TranslationThread
-
-    def _build_api_payload_for_item(self, item_index):
-        """Build API payload for a specific item, overriding the current item index temporarily."""
+        self.context_assembler = ContextAssembler()
+        self.context_packer = ContextPacker(self.context_assembler, main_window.count_tokens,
+                                            lambda: main_window.token_manager.tokenizer().name)
+        self._config_defaults = None
+        self._config_defaults_mtime = None
+        self.summary_thread = None
+        self.context_index = ContextIndex()
+        self.embedding_thread = None
+        self._embedding_failed_model = None
+        self.glossary = Glossary()
+        self.pending_provenance = {}  # item_index -> inputs of the running translation
+        self.translation_queue = []  # item indices waiting for a free batch slot
+        self.queue_batch = None  # ledger id of the run the queued items belong to
+        self.request_batches = {}  # item_index -> ledger batch id of the running translation
+        self.queue_budget = None  # BatchBudget of the queued run, when the project sets batch limits
+        self.queue_paused = None  # why the queued run stopped starting translations
+        self._rate_wait = False  # a restart of the queue is scheduled for the rate limit
+        self.retry_counts = {}  # item_key -> failed attempts since the last success
+        self._queue_items = None  # project_items the queue belongs to
+        self.warm_up_thread = None
+        self.batch_thread = None
+        self.paused_bulk = None  # (project_items, job, budget) of a queued bulk job stopped at a batch limit
+
+    def _build_api_payload_for_item(self, item_index, interactive=True):
+        """Build API payload for a specific item without touching the current selection."""
         if item_index is None or not self.main_window.current_project_data:
             return None
+        return self._build_api_payload(item_index, interactive)
 
-        # Store the current item index temporarily
-        original_item_index = self.main_window.current_item_index
-        
-        # Temporarily set the current item index to build the payload
-        self.main_window.current_item_index = item_index
-        
-        # Build the payload using the existing method
-        payload = self._build_api_payload()
-        
-        # Restore the original item index
-        self.main_window.current_item_index = original_item_index
-        
-        return payload
+    def _report_request_problem(self, item_index, message, interactive, title="Translation", critical=False):
+        """Tell why a translation was not started.
 
-    def _build_api_payload(self):
-        if self.main_window.current_item_index is None or not self.main_window.current_project_data:
-            QMessageBox.warning(self.main_window, "Translation", "No item selected or project loaded.")
+        A user action gets a message box; the queue and automatic retries run
+        unattended, so theirs go to the error panel instead of blocking the GUI.
+        """
+        if interactive:
+            (QMessageBox.critical if critical else QMessageBox.warning)(self.main_window, title, message)
+            return
+        items = self.main_window.project_items
+        if item_index is not None and 0 <= item_index < len(items):
+            item = items[item_index]
+            self.main_window.error_panel.record(item, item.get('name', f'Item {item_index + 1}'), message,
+                                                describe_error(message), self.retry_counts.get(item_key(item), 1),
+                                                status="not sent")
+        else:
+            self.main_window.error_panel.record(None, "", message, describe_error(message), status="not sent")
+
+    def _request_inputs(self, item_index):
+        """Collect what a request for `item_index` is built from: (source_text, target_language, model, templates)."""
+        project_data = self.main_window.current_project_data
+        # The editor holds the freshest text for the displayed item only
+        if item_index == self.main_window.current_item_index:
+            source_text = self.main_window.source_text_area.toPlainText().strip()
+        else:
+            try:
+                source_text = self.main_window.project_items[item_index].get('source_text', '').strip()
+            except IndexError:
+                source_text = ''
+        target_language = project_data.get('target_language', '')
+        model_name = project_data.get('model', '')
+        prompt_config = project_data.get('prompt_config', {})
+
+        config_defaults = self._load_config_defaults().get("default_prompts", {})
+        templates = resolve_prompt_templates(prompt_config, config_defaults)
+        return source_text, target_language, model_name, templates
+
+    def glossary_entries(self, source_text):
+        """Project glossary entries whose source term occurs in `source_text`."""
+        entries = self.main_window.current_project_data.get('glossary', [])
+        return self.glossary.matching_entries(entries, source_text)
+
+    def _glossary_block(self, source_text, target_language):
+        return render_glossary_block(self.glossary_entries(source_text), target_language)
+
+    def _model_parameters(self, model_name):
+        """Parameters of the project's model from settings/models.json, or {}."""
+        model_manager = getattr(self.main_window, 'model_manager', None)
+        if not model_manager or not model_name:
+            return {}
+        model_config = model_manager.get_model_config(model_name) or {}
+        return model_config.get('parameters', {})
+
+    def plan_context(self, item_index, candidates, context_limit, strategy="nearest"):
+        """Pack `candidates` into the request window of `item_index` using exact token counts."""
+        source_text, target_language, model_name, templates = self._request_inputs(item_index)
+        radius = self.main_window.current_project_data.get('context_verbatim_radius', DEFAULT_VERBATIM_RADIUS)
+        excerpts = None
+        if strategy == "relevant":
+            excerpts = self.relevant_excerpts(item_index, candidates)
+            self._schedule_embeddings()
+        return self.context_packer.pack(
+            self.main_window.project_items, item_index, candidates, context_limit,
+            templates, target_language, source_text,
+            parameters=self._model_parameters(model_name), strategy=strategy, verbatim_radius=radius,
+            excerpts=excerpts, glossary_block=self._glossary_block(source_text, target_language)
+        )
+
+    def plan_tokens(self, item_index, included_indices, context_limit, summarized_indices=(), excerpts=None):
+        """Token accounting for a request of `item_index` with the given context items."""
+        source_text, target_language, model_name, templates = self._request_inputs(item_index)
+        return self.context_packer.plan_tokens(
+            self.main_window.project_items, included_indices, templates, target_language, source_text,
+            context_limit, parameters=self._model_parameters(model_name), current_index=item_index,
+            summarized=summarized_indices, excerpts=excerpts,
+            glossary_block=self._glossary_block(source_text, target_language)
+        )
+
+    # --- Relevant-passages context mode ---
+    def relevant_excerpts(self, item_index, candidates):
+        """{item index: paragraph numbers} for earlier candidates matching `item_index`, best match first."""
+        earlier = [i for i in candidates if i < item_index]
+        results = self.context_index.search(self.main_window.project_items, item_index, earlier)
+        segment_limit = self.main_window.current_project_data.get('context_excerpt_segments', DEFAULT_EXCERPT_SEGMENTS)
+        ranked = sorted(results.items(), key=lambda pair: (-pair[1][0][1], pair[0]))
+        return {i: self.context_index.best_segments(segments, segment_limit) for i, segments in ranked}
+
+    def context_excerpts(self, item_index, included_indices):
+        """Excerpts of the included items that relevant mode sends as passages rather than in full."""
+        project_data = self.main_window.current_project_data
+        if not project_data or project_data.get('context_selection_mode') != 'relevant':
+            return {}
+        radius = project_data.get('context_verbatim_radius', DEFAULT_VERBATIM_RADIUS)
+        distant = [i for i in included_indices if i < item_index - radius]
+        return self.relevant_excerpts(item_index, distant)
+
+    def _schedule_embeddings(self):
+        """Embed new or edited paragraphs in the background when the project has an embedding model."""
+        project_data = self.main_window.current_project_data
+        embedding_model = project_data.get('embedding_model', '') if project_data else ''
+        if not embedding_model or embedding_model == self._embedding_failed_model:
+            return
+        if self.embedding_thread and self.embedding_thread.isRunning():
+            return
+
+        model_manager = getattr(self.main_window, 'model_manager', None)
+        endpoints = parse_endpoints(model_manager.providers.get('ollama', {})) if model_manager else []
+        if not endpoints:
+            return
+        endpoint = endpoints[0]["url"]
+
+        self.context_index.set_vector_model(embedding_model)
+        missing = self.context_index.missing_vectors()
+        if not missing:
+            return
+
+        from ui.embedding_thread import EmbeddingThread
+
+        self.embedding_thread = EmbeddingThread(
+            self.main_window, lambda texts: get_ollama_embeddings(endpoint, embedding_model, texts), missing
+        )
+        self.embedding_thread.vectors_ready.connect(self.context_index.add_vectors)
+        self.embedding_thread.error.connect(lambda msg: self._handle_embedding_error(embedding_model, msg))
+        self.embedding_thread.finished.connect(self._handle_embeddings_finished)
+        self.embedding_thread.start()
+
+    def _handle_embedding_error(self, embedding_model, message):
+        # Keep using BM25 alone instead of retrying on every refresh
+        self._embedding_failed_model = embedding_model
+        print(f"Warning: Embeddings disabled for this session: {message}")
+
+    def _handle_embeddings_finished(self):
+        project_data = self.main_window.current_project_data
+        if project_data and project_data.get('context_selection_mode') == 'relevant':
+            self.main_window._refresh_listbox_display()
+
+    def reset_context_index(self, project_file=None):
+        """Drop the search index of the previous project and load the embedding cache of `project_file`."""
+        if self.embedding_thread and self.embedding_thread.isRunning():
+            self.embedding_thread.stop()
+            self.embedding_thread.wait(1000)
+        self.context_index.clear()
+        self._embedding_failed_model = None
+        if project_file:
+            self.context_index.load_vectors(vectors_path(project_file))
+
+    def save_context_index(self, project_file):
+        self.context_index.save_vectors(vectors_path(project_file))
+
+    def _build_api_payload(self, item_index=None, interactive=True):
+        if item_index is None:
+            item_index = self.main_window.current_item_index
+        if item_index is None or not self.main_window.current_project_data:
+            self._report_request_problem(item_index, "No item selected or project loaded.", interactive)
             return None
 
-        source_text = self.main_window.source_text_area.toPlainText().strip()
-        target_language = self.main_window.current_project_data.get('target_language', '')
-        model_name = self.main_window.current_project_data.get('model', '')
-        context_limit = self.main_window.current_project_data.get('context_token_limit_approx', -1)
-        prompt_config = self.main_window.current_project_data.get('prompt_config', {})
+        source_text, target_language, model_name, templates = self._request_inputs(item_index)
 
         if not all([source_text, target_language, model_name]):
-            QMessageBox.warning(self.main_window, "Translation",
-                              "Cannot translate. Ensure source text exists and project language/model are set.")
+            self._report_request_problem(
+                item_index, "Cannot translate. Ensure source text exists and project language/model are set.",
+                interactive)
             return None
 
+        included_indices, _ = self.main_window._get_context_item_indices(item_index)
+        summarized_indices = self.main_window._get_summarized_context_indices(included_indices, item_index)
+        excerpts = self.context_excerpts(item_index, included_indices)
+
+        return self.context_assembler.build_payload(
+            model_name, target_language, source_text, templates,
+            self.main_window.project_items, included_indices, current_index=item_index,
+            summary_indices=summarized_indices, excerpts=excerpts,
+            glossary_block=self._glossary_block(source_text, target_language)
+        )
+
+    def _load_config_defaults(self):
+        # Context planning runs on every UI refresh; only re-read config.json when it changes
+        try:
+            mtime = os.path.getmtime(CONFIG_FILE)
+        except OSError:
+            mtime = None
+        if self._config_defaults is None or mtime != self._config_defaults_mtime:
+            self._config_defaults = {"default_prompts": load_config_defaults()}
+            self._config_defaults_mtime = mtime
+        return self._config_defaults
+
+    # --- Context summaries (hierarchical context mode) ---
+    def _summary_model(self):
+        project_data = self.main_window.current_project_data
+        return project_data.get('summary_model') or project_data.get('model', '')
+
+    def _build_summary_payload(self, item, model_name, target_language):
+        project_data = self.main_window.current_project_data
+        prompt_config = project_data.get('prompt_config', {})
         config_defaults = self._load_config_defaults().get("default_prompts", {})
+        summary_prompt = prompt_config.get('summary_prompt') or config_defaults.get('summary_prompt') or DEFAULT_SUMMARY_PROMPT
+        system_prompt = summary_prompt.format(
+            target_language=target_language,
+            max_words=project_data.get('summary_max_words', 150)
+        )
+        return {
+            "model": model_name,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": item.get('source_text', '').strip()}
+            ],
+            "stream": True,
+            "Target_Language": target_language
+        }
 
-        pre_system_prompt_template = prompt_config.get("pre_system_prompt",
-            config_defaults.get("pre_system_prompt",
-                "You are a translation assistant. Translate the final user message into **{target_language}**."
-            )
+    def stale_summary_indices(self):
+        """Items with source text whose summary is missing or older than the source."""
+        return [i for i, item in enumerate(self.main_window.project_items)
+                if item.get('source_text', '').strip() and not get_fresh_summary(item)]
+
+    def generate_summaries(self):
+        """Generate summaries for every item whose summary is missing or stale."""
+        project_data = self.main_window.current_project_data
+        if not project_data:
+            QMessageBox.warning(self.main_window, "Summaries", "No project loaded.")
+            return
+        if self.summary_thread and self.summary_thread.isRunning():
+            QMessageBox.information(self.main_window, "Summaries", "Summaries are already being generated.")
+            return
+
+        model_name = self._summary_model()
+        target_language = project_data.get('target_language', '')
+        if not model_name or not target_language:
+            QMessageBox.warning(self.main_window, "Summaries", "Set the project language and model first.")
+            return
+
+        stale = self.stale_summary_indices()
+        if not stale:
+            self.main_window.statusBar().showMessage("All context summaries are up to date.", 3000)
+            return
+
+        # Snapshot the inputs now; the thread never touches project data
+        jobs = []
+        for i in stale:
+            item = self.main_window.project_items[i]
+            jobs.append((i, item_source_hash(item), self._build_summary_payload(item, model_name, target_language)))
+
+        from ui.summary_thread import SummaryThread
+
+        project_items = self.main_window.project_items
+        self.summary_thread = SummaryThread(self.main_window, model_name, jobs)
+        self.summary_thread.summary_ready.connect(
+            lambda index, source_hash, text: self._handle_summary_ready(project_items, index, source_hash, text, model_name)
         )
-        post_system_prompt_template = prompt_config.get("post_system_prompt",
-            config_defaults.get("post_system_prompt",
-                "IMPORTANT: Respond with *only* the translation of the final user message into **{target_language}**, nothing else."
-            )
+        self.summary_thread.progress_updated.connect(
+            lambda done, total: self.main_window.statusBar().showMessage(f"Summarizing items: {done}/{total}")
         )
-        user_prompt_template = prompt_config.get("user_prompt",
-            config_defaults.get("user_prompt", "{source_text}")
+        self.summary_thread.error.connect(lambda msg: print(f"Warning: {msg}"))
+        self.summary_thread.request_finished.connect(
+            lambda index, model, messages, answer, usage: self._record_summary_request(
+                project_items, index, model, messages, answer, usage)
         )
+        self.summary_thread.finished.connect(self._handle_summaries_finished)
+        self.main_window.statusBar().showMessage(f"Summarizing {len(jobs)} items...")
+        self.summary_thread.start()
 
-        context_item_template = (
-            "\n==================== CONTEXT ITEM START: {item_name} ====================\n"
-            "Source Text ({item_name}):\n{source_text}\n"
-            "{translation_section}"
-            "==================== CONTEXT ITEM END: {item_name} ======================\n"
-        )
+    def _handle_summary_ready(self, items, item_index, source_hash, text, model_name):
+        # Results for a project that has since been closed are dropped
+        if items is not self.main_window.project_items or not 0 <= item_index < len(items):
+            return
+        item = items[item_index]
+        # The item was edited or moved while the summary was generated
+        if item_source_hash(item) != source_hash:
+            return
+        item['summary'] = {"text": text, "source_hash": source_hash, "model": model_name}
+        self.main_window.mark_dirty()
+
+    def _record_summary_request(self, items, item_index, model, messages, answer, usage):
+        if items is self.main_window.project_items:
+            self.main_window.cost_manager.record_request(item_index, model, messages, answer, usage, kind="summary")
+
+    def _handle_summaries_finished(self):
+        remaining = len(self.stale_summary_indices()) if self.main_window.current_project_data else 0
+        message = "Context summaries updated."
+        if remaining:
+            message += f" {remaining} item(s) still without a summary."
+        self.main_window.statusBar().showMessage(message, 5000)
+        self.main_window._refresh_listbox_display()
+
+    # --- Translation provenance and batch re-translation ---
+    def translation_provenance(self, item_index):
+        """What a translation of `item_index` started now would be produced from."""
+        source_text, target_language, model_name, templates = self._request_inputs(item_index)
+        return {
+            "source_hash": text_hash(source_text),
+            "prompt_hash": prompt_hash(templates, target_language, self._glossary_block(source_text, target_language)),
+            "model": model_name,
+            "parameters": dict(self._model_parameters(model_name))
+        }
 
-        context_items_str = ""
-        included_indices, _ = self.main_window._get_context_item_indices()
-        context_token_count = 0
+    def stale_translation_indices(self):
+        """Items without a translation, or translated from a different source, prompt, model or parameters.
 
-        context_indices_to_use = sorted([idx for idx in included_indices if idx != self.main_window.current_item_index])
+        Translations made before provenance was recorded have nothing to compare
+        against and are treated as current.
+        """
+        stale = []
+        for i, item in enumerate(self.main_window.project_items):
+            if not item.get('source_text', '').strip():
+                continue
+            if not item.get('translated_text', '').strip():
+                stale.append(i)
+                continue
+            recorded = item.get('provenance')
+            if not isinstance(recorded, dict):
+                continue
+            current = self.translation_provenance(i)
+            if any(recorded.get(key) != value for key, value in current.items()):
+                stale.append(i)
+        return stale
+
+    def translate_stale_items(self):
+        """Queue every item whose translation is missing or out of date."""
+        project_data = self.main_window.current_project_data
+        if not project_data:
+            QMessageBox.warning(self.main_window, "Translate Stale Items", "No project loaded.")
+            return
+        if not project_data.get('target_language') or not project_data.get('model'):
+            QMessageBox.warning(self.main_window, "Translate Stale Items", "Set the project language and model first.")
+            return
 
-        for i in context_indices_to_use:
-            try:
-                item = self.main_window.project_items[i]
-                item_name = item.get("name", f"Item {i+1}")
-                item_source = item.get("source_text", "").strip()
-                item_translation = item.get("translated_text", "").strip()
-
-                if item_source:
-                    if item_translation:
-                        translation_section = f"\nExisting Translation ({target_language}) for '{item_name}':\n{item_translation}\n"
-                    else:
-                        translation_section = f"\n(No existing translation for '{item_name}')\n"
-
-                    context_item = context_item_template.format(
-                        item_name=item_name,
-                        source_text=item_source,
-                        translation_section=translation_section
-                    )
-                    context_items_str += context_item
-                    context_token_count += self.main_window.count_tokens(item_source) + self.main_window.count_tokens(item_translation)
+        if self.queue_paused and self.translation_queue and self._queue_items is self.main_window.project_items:
+            self._resume_paused_queue()
+            return
 
-            except IndexError:
-                print(f"Warning: Index {i} out of range during context building.")
-                continue
+        state_manager = self.main_window.translation_state_manager
+        stale = [i for i in self.stale_translation_indices()
+                 if i not in self.translation_queue and not state_manager.is_item_translating(i)]
+        if not stale:
+            self.main_window.statusBar().showMessage("All translations are up to date.", 3000)
+            return
 
-        pre_system_prompt = pre_system_prompt_template.format(target_language=target_language)
-        post_system_prompt = post_system_prompt_template.format(target_language=target_language)
+        untranslated = sum(1 for i in stale if not self.main_window.project_items[i].get('translated_text', '').strip())
+        self.main_window.statusBar().showMessage(f"Estimating {len(stale)} requests...")
+        estimate = self.main_window.cost_manager.estimate_items(stale)
+        self.main_window.statusBar().clearMessage()
+        over_limit = exceeded_limits(batch_limits(project_data), estimate)
+        answer = QMessageBox.question(
+            self.main_window, "Translate Stale Items",
+            f"{len(stale)} items need translation:\n"
+            f"• {untranslated} not translated yet\n"
+            f"• {len(stale) - untranslated} translated from a different source, prompt or model\n\n"
+            f"{format_estimate(estimate)}\n"
+            + (f"Over the batch limits ({over_limit}); the run pauses when a limit is near.\n" if over_limit else "")
+            + f"\nTranslate them now? Up to {self._batch_concurrency()} run at the same time.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if answer == QMessageBox.Yes:
+            self.queue_translations(stale, estimate)
+
+    def _resume_paused_queue(self):
+        """Offer to continue a run that paused at a batch limit, with the project's current limits."""
+        answer = QMessageBox.question(
+            self.main_window, "Translate Stale Items",
+            f"The running batch paused: {self.queue_paused}.\n"
+            f"{len(self.translation_queue)} items are waiting.\n\n"
+            "Yes: continue with the batch limits now set in Project Settings\n"
+            "No: cancel the waiting items",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+        )
+        if answer == QMessageBox.Yes:
+            self.queue_paused = None
+            if self.queue_budget:
+                self.queue_budget.update_limits(batch_limits(self.main_window.current_project_data))
+            self._start_queued_translations()
+        elif answer == QMessageBox.No:
+            cancelled = self.cancel_queued_translations()
+            self.main_window.statusBar().showMessage(f"{cancelled} queued translations cancelled.", 3000)
+
+    # --- Bulk translation: provider batch API or queued background requests ---
+    def translate_in_bulk(self):
+        """Translate every stale item as one background job whose results are written straight to the items."""
+        project_data = self.main_window.current_project_data
+        if not project_data:
+            QMessageBox.warning(self.main_window, "Bulk Translate", "No project loaded.")
+            return
+        if self.batch_thread and self.batch_thread.isRunning():
+            answer = QMessageBox.question(
+                self.main_window, "Bulk Translate",
+                "A bulk translation is running. Stop it?\n\n"
+                "A job at the provider keeps running and can be collected later with Bulk Translate.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if answer == QMessageBox.Yes:
+                self.batch_thread.stop()
+            return
 
-        system_prompt_parts = [pre_system_prompt]
-        if context_items_str:
-            system_prompt_parts.append("\nUse the following context from other items in the project to inform your translation:")
-            system_prompt_parts.append(context_items_str)
-        system_prompt_parts.append("\n" + post_system_prompt)
+        if self.paused_bulk and self.paused_bulk[0] is self.main_window.project_items:
+            if self._resume_paused_bulk():
+                return
+        self.paused_bulk = None
+
+        pending = project_data.get('batch_job')
+        if pending:
+            answer = QMessageBox.question(
+                self.main_window, "Bulk Translate",
+                f"The batch job {pending.get('id')} submitted {pending.get('submitted', '')} "
+                f"for {len(pending.get('items', {}))} items has not been collected yet.\n\n"
+                "Yes: check it now and import its results\n"
+                "No: forget it and start a new bulk translation",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if answer == QMessageBox.Cancel:
+                return
+            if answer == QMessageBox.Yes:
+                self._start_batch_thread(pending, job_id=pending.get('id'))
+                return
+            del project_data['batch_job']
+            self.main_window.mark_dirty()
 
-        final_system_prompt = "\n".join(system_prompt_parts)
+        if not project_data.get('target_language') or not project_data.get('model'):
+            QMessageBox.warning(self.main_window, "Bulk Translate", "Set the project language and model first.")
+            return
+        state_manager = self.main_window.translation_state_manager
+        stale = [i for i in self.stale_translation_indices()
+                 if i not in self.translation_queue and not state_manager.is_item_translating(i)]
+        if not stale:
+            self.main_window.statusBar().showMessage("All translations are up to date.", 3000)
+            return
 
-        #final_user_prompt = user_prompt_template.format(target_language=target_language)
-        if '{target_language}' in user_prompt_template:
-            final_user_prompt = user_prompt_template.format(source_text=source_text, target_language=target_language)
+        self.main_window.statusBar().showMessage(f"Preparing {len(stale)} requests...")
+        batch = []
+        job_items = {}
+        requests = []
+        for item_index in stale:
+            payload = self._build_api_payload_for_item(item_index)
+            if not payload:
+                continue
+            custom_id = f"item-{item_index}"
+            batch.append((custom_id, payload))
+            job_items[custom_id] = {"index": item_index, "provenance": self.translation_provenance(item_index)}
+            requests.append((payload, self.main_window.project_items[item_index].get('source_text', '')))
+        model_id = project_data.get('model', '')
+        batch_api = self._uses_batch_api(model_id)
+        estimate = self.main_window.cost_manager.estimate(requests, model_id, batch_api)
+        self.main_window.statusBar().clearMessage()
+        over_limit = exceeded_limits(batch_limits(project_data), estimate)
+        if over_limit and batch_api:
+            limit_note = f"Over the batch limits ({over_limit}). The provider runs the job as a whole, so they cannot stop it.\n"
+        elif over_limit:
+            limit_note = f"Over the batch limits ({over_limit}); the job pauses when a limit is near.\n"
         else:
-            final_user_prompt = user_prompt_template.format(source_text=source_text)
+            limit_note = ""
+
+        answer = QMessageBox.question(
+            self.main_window, "Bulk Translate",
+            f"Translate {len(batch)} stale items as one background job?\n\n"
+            f"{format_estimate(estimate)}\n{limit_note}\n"
+            "Nothing is streamed to the editor; each translation is written to its item when it arrives. "
+            "Providers with a batch API run the job on their side, which can take hours but costs less.",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if answer != QMessageBox.Yes:
+            return
 
-        return {
-            "model": model_name,
-            "messages": [
-                {"role": "system", "content": final_system_prompt},
-                {"role": "user", "content": final_user_prompt}
-            ],
-            "stream": True,
-            "Target_Language": target_language
+        job = {
+            "id": None,
+            "model": project_data.get('model', ''),
+            "submitted": datetime.now().isoformat(timespec="seconds"),
+            "items": job_items
         }
+        budget = BatchBudget.from_project(project_data, self.main_window.cost_manager.pricing(model_id), estimate)
+        self._start_batch_thread(job, batch=batch, budget=budget)
+
+    def _resume_paused_bulk(self):
+        """Offer to continue a bulk job that paused at a batch limit, with what it already spent.
+
+        Returns False when the user chose to start a new bulk translation instead.
+        """
+        project_items, job, budget = self.paused_bulk
+        answer = QMessageBox.question(
+            self.main_window, "Bulk Translate",
+            f"The bulk translation paused: {job.get('paused', 'batch limit reached')}.\n"
+            f"{len(job['items'])} items are waiting.\n\n"
+            "Yes: continue with the batch limits now set in Project Settings\n"
+            "No: forget it and start a new bulk translation",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+        )
+        if answer == QMessageBox.Cancel:
+            return True
+        if answer == QMessageBox.No:
+            return False
+
+        self.paused_bulk = None
+        # Requests are built again: context and glossary may have changed while the job was paused
+        batch = []
+        for custom_id, entry in list(job['items'].items()):
+            item_index = entry['index']
+            if (not 0 <= item_index < len(project_items)
+                    or item_source_hash(project_items[item_index]) != entry['provenance']['source_hash']):
+                del job['items'][custom_id]
+                job['skipped'] += 1
+                continue
+            payload = self._build_api_payload_for_item(item_index)
+            if payload:
+                entry['provenance'] = self.translation_provenance(item_index)
+                batch.append((custom_id, payload))
+        job.pop('paused', None)
+        budget.update_limits(batch_limits(self.main_window.current_project_data))
+        self._start_batch_thread(job, batch=batch, budget=budget)
+        return True
+
+    def _uses_batch_api(self, model_id):
+        """Whether bulk jobs of `model_id` run through the provider's (discounted) batch API."""
+        model_manager = getattr(self.main_window, 'model_manager', None)
+        model_config = model_manager.get_model_config(model_id) if model_manager and model_id else None
+        return bool(model_config) and model_config.get('batch_api') not in (None, False, "mock")
+
+    def _start_batch_thread(self, job, batch=None, job_id=None, budget=None):
+        from ui.batch_thread import BatchThread
+
+        project_items = self.main_window.project_items
+        job.setdefault("translated", 0)
+        job.setdefault("failed", [])
+        job.setdefault("skipped", 0)
+        # Prompts of the submitted requests, for the ledger and calibration; kept out of the job,
+        # which is saved with the project. A job resumed after a restart has none.
+        prompts = {custom_id: payload.get('messages', []) for custom_id, payload in batch or []}
+        self.batch_thread = BatchThread(self.main_window, job['model'], batch=batch, job_id=job_id,
+                                        workers=self._batch_concurrency(), budget=budget)
+        self.batch_thread.job_submitted.connect(
+            lambda submitted_id, remote: self._handle_batch_submitted(project_items, job, submitted_id, remote)
+        )
+        self.batch_thread.results_ready.connect(
+            lambda results: self._handle_batch_results(project_items, job, results, prompts)
+        )
+        self.batch_thread.progress_updated.connect(
+            lambda done, total, message: self.main_window.statusBar().showMessage(message)
+        )
+        self.batch_thread.error.connect(self._handle_translation_error)
+        self.batch_thread.paused.connect(lambda reason: job.__setitem__('paused', reason))
+        self.batch_thread.job_finished.connect(
+            lambda state: self._handle_batch_finished(project_items, job, state, budget)
+        )
+        self.batch_thread.start()
+
+    def _handle_batch_submitted(self, project_items, job, job_id, remote):
+        job['id'] = job_id
+        job['remote'] = remote
+        # Provider jobs outlive the session; record them so they can be collected after a restart
+        if remote and project_items is self.main_window.project_items:
+            self.main_window.current_project_data['batch_job'] = job
+            self.main_window.mark_dirty()
+            self.main_window.save_project()
+
+    def _handle_batch_results(self, project_items, job, results, prompts=None):
+        # Results for a project that has since been closed are dropped
+        if project_items is not self.main_window.project_items:
+            return
+        state_manager = self.main_window.translation_state_manager
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        calibration = get_calibration()
+        updated = 0
+        for result in results:
+            # Collected items leave the job, so a resumed job only sends and imports the rest
+            entry = job['items'].pop(result['custom_id'], None)
+            if not entry:
+                continue
+            item_index = entry['index']
+            if result['error'] or not result['text']:
+                job['failed'].append(item_index)
+                if 0 <= item_index < len(project_items):
+                    self.main_window.error_panel.record(
+                        project_items[item_index], project_items[item_index].get('name', f'Item {item_index + 1}'),
+                        result['error'] or "Empty response", describe_error(result['error'] or "Empty response"),
+                        status="failed in bulk job")
+                continue
+            messages = (prompts or {}).get(result['custom_id'], ())
+            # Calibration learns the ratio of prompt text to prompt tokens, so it needs the prompt
+            if result.get('usage') and messages:
+                calibration.record_usage(job['model'], messages, result['text'], result['usage'], save=False)
+            source_text = project_items[item_index].get('source_text', '') if 0 <= item_index < len(project_items) else ''
+            self.main_window.cost_manager.record_request(
+                item_index, job['model'], messages, result['text'], result.get('usage'), source_text,
+                batch=f"bulk {job['submitted']}", batch_api=job.get('remote', False))
+            # The item was edited, moved or translated interactively in the meantime
+            if (not 0 <= item_index < len(project_items) or state_manager.is_item_translating(item_index)
+                    or item_source_hash(project_items[item_index]) != entry['provenance']['source_hash']):
+                job['skipped'] += 1
+                continue
+            project_items[item_index]['translated_text'] = result['text']
+            project_items[item_index]['provenance'] = dict(entry['provenance'], timestamp=timestamp)
+            updated += 1
+            self.main_window.error_panel.resolve(project_items[item_index])
+            if item_index == self.main_window.current_item_index:
+                self.main_window._start_programmatic_text_update()
+                self.main_window.translated_text_area.blockSignals(True)
+                self.main_window.translated_text_area.setPlainText(result['text'])
+                self.main_window.translated_text_area.blockSignals(False)
+                self.main_window._end_programmatic_text_update()
+        calibration.save()
+        if updated:
+            job['translated'] += updated
+            self.main_window.mark_dirty()
+            self.main_window._refresh_listbox_display()
+
+    def _handle_batch_finished(self, project_items, job, state, budget=None):
+        if project_items is not self.main_window.project_items:
+            return
+        # A paused job keeps its budget, so its limits hold for the whole run and not per click
+        self.paused_bulk = (project_items, job, budget) if state == "paused" and budget else None
+        if self.main_window.current_project_data.get('batch_job') is job:
+            del self.main_window.current_project_data['batch_job']
+            self.main_window.mark_dirty()
+        message = f"Bulk translation {state}"
+        if state == "paused" and job.get('paused'):
+            message += f" ({job['paused']})"
+        message += f": {job['translated']} items translated"
+        if job['failed']:
+            message += f", {len(job['failed'])} failed"
+        if job['skipped']:
+            message += f", {job['skipped']} skipped because the item changed"
+        if state == "paused":
+            message += ". Bulk Translate continues with the rest once the batch limits allow it"
+        elif job['failed'] or job['skipped']:
+            message += ". Translate Stale picks up the rest"
+        self.main_window.statusBar().showMessage(message + ".")
+
+    def queue_translations(self, item_indices, estimate=None):
+        """Translate `item_indices` in order, at most `batch_concurrency` at a time. Returns how many were queued.
+
+        A new run is held to the project's batch limits; `estimate` is its pre-flight estimate.
+        """
+        if self._queue_items is not self.main_window.project_items:
+            self.translation_queue = []
+            self._queue_items = self.main_window.project_items
+        state_manager = self.main_window.translation_state_manager
+        queued = [i for i in item_indices
+                  if i not in self.translation_queue and not state_manager.is_item_translating(i)]
+        batch_starting = queued and not self.translation_queue and not state_manager.is_any_item_translating()
+        if queued and not self.translation_queue:
+            project_data = self.main_window.current_project_data
+            self.queue_batch = f"queue {datetime.now().isoformat(timespec='seconds')}"
+            self.queue_budget = BatchBudget.from_project(
+                project_data, self.main_window.cost_manager.pricing(project_data.get('model', '')), estimate)
+            self.queue_paused = None
+        self.translation_queue.extend(queued)
+        if batch_starting:
+            self._warm_up_model()
+        self._start_queued_translations()
+        return len(queued)
+
+    def _warm_up_model(self):
+        """Have the provider load the project model before the batch; queued items start once it is done."""
+        model_name = self.main_window.current_project_data.get('model', '')
+        if not model_name or (self.warm_up_thread and self.warm_up_thread.isRunning()):
+            return
 
-    def _load_config_defaults(self):
-        return {"default_prompts": load_config_defaults()}
+        from ui.warm_up_thread import WarmUpThread
+
+        self.warm_up_thread = WarmUpThread(self.main_window, model_name)
+        self.warm_up_thread.warm_up_finished.connect(lambda ok: self._start_queued_translations())
+        self.main_window.statusBar().showMessage(f"Loading {model_name}...")
+        self.warm_up_thread.start()
+
+    def cancel_queued_translations(self):
+        count = len(self.translation_queue)
+        self.translation_queue = []
+        self.queue_paused = None
+        return count
+
+    def _batch_concurrency(self):
+        project_data = self.main_window.current_project_data or {}
+        if project_data.get('batch_concurrency'):
+            return max(1, int(project_data['batch_concurrency']))
+        # Keep every endpoint of a multi-endpoint provider busy
+        model_manager = getattr(self.main_window, 'model_manager', None)
+        model_config = model_manager.get_model_config(project_data.get('model', '')) if model_manager else None
+        capacity = endpoint_capacity(model_config) if model_config else 0
+        return max(DEFAULT_BATCH_CONCURRENCY, capacity)
+
+    def _start_queued_translations(self):
+        # The queue is dropped when another project was loaded in the meantime
+        if self._queue_items is not self.main_window.project_items or not self.main_window.current_project_data:
+            self.translation_queue = []
+            return
+        if self.warm_up_thread and self.warm_up_thread.isRunning():
+            return
+        if self.queue_paused or self._rate_wait:
+            return
+        state_manager = self.main_window.translation_state_manager
+        budget = self.queue_budget
+        limit = self._batch_concurrency()
+        while self.translation_queue and len(state_manager.get_translating_items()) < limit:
+            if budget:
+                reason, wait = budget.try_start()
+                if reason:
+                    self._pause_queue(reason)
+                    return
+                if wait:
+                    self._rate_wait = True
+                    QTimer.singleShot(int(wait * 1000) + 100, self._end_rate_wait)
+                    self.main_window.statusBar().showMessage(
+                        f"Waiting {wait:.0f} s for the requests-per-minute limit ({len(self.translation_queue)} queued)")
+                    return
+            item_index = self.translation_queue.pop(0)
+            if 0 <= item_index < len(self.main_window.project_items) and not state_manager.is_item_translating(item_index):
+                self.request_batches[item_index] = self.queue_batch
+                self.translate_item(item_index, interactive=False)
+                if not state_manager.is_item_translating(item_index):
+                    self._release_request(item_index)
+            elif budget:
+                budget.cancel_request()
+
+    def _end_rate_wait(self):
+        self._rate_wait = False
+        self._start_queued_translations()
+
+    def _pause_queue(self, reason):
+        """Stop starting queued translations at a batch limit; running ones finish."""
+        self.queue_paused = reason
+        if self.queue_budget:
+            self.main_window.statusBar().showMessage(
+                f"Batch paused: {reason}; {self.queue_budget.describe()}. {len(self.translation_queue)} items wait. "
+                "Raise the batch limits and use Translate Stale to continue.")
+        else:
+            self.main_window.statusBar().showMessage(
+                f"Batch paused: {reason}. {len(self.translation_queue)} items wait; use Translate Stale to continue.")
+
+    def _release_request(self, item_index):
+        """Forget the batch of a translation that ended without a result, freeing its budget reservation."""
+        batch = self.request_batches.pop(item_index, None)
+        if batch and batch == self.queue_batch and self.queue_budget:
+            self.queue_budget.cancel_request()
 
     def translate_current_item(self):
         if self.main_window.current_item_index is None or not self.main_window.current_project_data:
@@ -144,15 +864,19 @@ class TranslationManager:
         # Start translation for this specific item
         self.translate_item(self.main_window.current_item_index)
         
-    def translate_item(self, item_index):
-        """Start translation for a specific item."""
+    def translate_item(self, item_index, interactive=True):
+        """Start translation for a specific item.
+
+        `interactive` is False for the queue and automatic retries: problems
+        are listed in the error panel instead of a message box.
+        """
         if item_index is None or not self.main_window.current_project_data:
-            QMessageBox.warning(self.main_window, "Translation", "No item selected or project loaded.")
+            self._report_request_problem(item_index, "No item selected or project loaded.", interactive)
             return
 
         # Check if item is already being translated
         if self.main_window.translation_state_manager.is_item_translating(item_index):
-            QMessageBox.warning(self.main_window, "Translation", "This item is already being translated.")
+            self._report_request_problem(item_index, "This item is already being translated.", interactive)
             return
 
         # Get source text for the specific item
@@ -163,22 +887,25 @@ class TranslationManager:
             try:
                 source_text = self.main_window.project_items[item_index].get('source_text', '').strip()
             except IndexError:
-                QMessageBox.critical(self.main_window, "Error", f"Item index {item_index} out of range.")
+                self._report_request_problem(item_index, f"Item index {item_index} out of range.", interactive,
+                                             title="Error", critical=True)
                 return
                 
         if not source_text:
-            QMessageBox.warning(self.main_window, "Translation", "Source text is empty.")
+            self._report_request_problem(item_index, "Source text is empty.", interactive)
             return
 
         try:
             self.main_window.project_items[item_index]['source_text'] = source_text
         except IndexError:
-            QMessageBox.critical(self.main_window, "Error", f"Item index {item_index} out of range.")
+            self._report_request_problem(item_index, f"Item index {item_index} out of range.", interactive,
+                                         title="Error", critical=True)
             return
 
-        payload = self._build_api_payload_for_item(item_index)
+        payload = self._build_api_payload_for_item(item_index, interactive)
         if not payload:
             return
+        self.pending_provenance[item_index] = self.translation_provenance(item_index)
 
         # Start translation state management for this specific item
         self.main_window.translation_state_manager.start_translation(item_index)
@@ -194,8 +921,10 @@ class TranslationManager:
         
         from ui.translation_thread import TranslationThread
         
-        # Create a unique thread for this item
-        thread = TranslationThread(self.main_window, item_index)
+        # Create a unique thread for this item; it sends the payload built above.
+        # Only the item on screen is streamed; the others arrive in one piece.
+        streaming = item_index == self.main_window.current_item_index
+        thread = TranslationThread(self.main_window, item_index, payload=payload, streaming=streaming)
         self.active_threads[item_index] = thread  # Store the thread
 
         thread.chunk_received.connect(
@@ -205,12 +934,12 @@ class TranslationManager:
         thread.finished.connect(
             lambda: self._handle_translation_finished_with_buffer(item_index)
         )
-        thread.error.connect(self._handle_translation_error_with_type)
-        thread.timeout_detected.connect(self._handle_timeout_detected)
-        
-        # Connect to UI refresh signal from state manager
-        self.main_window.translation_state_manager.ui_refresh_needed.connect(self._clear_active_translations)
-        thread.validation_failed.connect(self._handle_validation_failed)
+        # Failures are handled per item; the lambdas keep which item a signal belongs to
+        thread.error.connect(lambda message: self._handle_item_failure(item_index, message))
+        thread.timeout_detected.connect(lambda message: self._handle_item_failure(item_index, message, timeout=True))
+        thread.validation_failed.connect(
+            lambda message: self._handle_item_failure(item_index, message, validation=True)
+        )
 
         thread.start()
 
@@ -267,9 +996,12 @@ class TranslationManager:
         # Clean up translation buffer
         if item_index in self.active_translations:
             del self.active_translations[item_index]
+        self.pending_provenance.pop(item_index, None)
+        self._release_request(item_index)
             
     def stop_all_translations(self):
         """Stop all active translations."""
+        self.cancel_queued_translations()
         # Get all currently translating items
         translating_items = list(self.main_window.translation_state_manager.get_translating_items())
         
@@ -347,6 +1079,34 @@ class TranslationManager:
                 self.main_window.project_items[item_index]['translated_text'] = translated_text
                 self.main_window.mark_dirty()
 
+            provenance = self.pending_provenance.pop(item_index, None)
+            thread = self.active_threads.get(item_index)
+            model_used = thread.model_used() if thread else None
+            if provenance and model_used and model_used != provenance.get("model"):
+                # A fallback model answered; the item stays stale for the project model
+                provenance["model"] = model_used
+            if provenance and 0 <= item_index < len(self.main_window.project_items):
+                provenance["timestamp"] = datetime.now().isoformat(timespec="seconds")
+                self.main_window.project_items[item_index]['provenance'] = provenance
+            batch = self.request_batches.pop(item_index, None)
+            entry = None
+            if thread and thread.handler and model_used:
+                messages = (thread.payload or {}).get('messages', [])
+                # Provider token counts refine the estimates for models without an exact tokenizer
+                get_calibration().record_usage(model_used, messages, translated_text, thread.handler.last_usage)
+                entry = self.main_window.cost_manager.record_request(
+                    item_index, model_used, messages, translated_text, thread.handler.last_usage,
+                    self.main_window.project_items[item_index].get('source_text', ''), batch=batch)
+                # Models that lost a hedged race were billed too; they report no usage when cancelled
+                for model_id, partial_text in getattr(thread.handler, 'cancelled_requests', []):
+                    self.main_window.cost_manager.record_request(
+                        item_index, model_id, messages, partial_text, None, batch=batch, kind="hedge")
+            budget = self.queue_budget if batch and batch == self.queue_batch else None
+            if budget and entry:
+                budget.finish_request(entry['prompt_tokens'], entry['completion_tokens'], entry['cost'] or 0.0)
+            elif budget:
+                budget.cancel_request()
+
             if hasattr(self.main_window, '_response_buffer'):
                 # Only clear the response buffer if this was the current item
                 if item_index == self.main_window.current_item_index:
@@ -358,106 +1118,124 @@ class TranslationManager:
             
             # Update status bar with item-specific message
             item_name = self.main_window.project_items[item_index].get('name', f'Item {item_index + 1}')
-            self.main_window.statusBar().showMessage(f"Translation for '{item_name}' completed", 3000)
+            message = f"Translation for '{item_name}' completed"
+            if provenance and model_used and model_used != self.main_window.current_project_data.get('model'):
+                message += f" by fallback model {model_used}"
+            if self.translation_queue:
+                message += f" ({len(self.translation_queue)} queued)"
+            if budget:
+                message += f"; batch budget: {budget.describe()}"
+            self.main_window.statusBar().showMessage(message, 3000)
+
+            item = self.main_window.project_items[item_index]
+            self.retry_counts.pop(item_key(item), None)
+            self.main_window.error_panel.resolve(item)
+            self._start_queued_translations()
         except Exception as e:
-            error_msg = f"Failed to save translation: {e}"
-            QMessageBox.critical(self.main_window, "Error", error_msg)
+            self._handle_item_failure(item_index, f"Failed to save translation: {e}")
 
     def _handle_translation_error(self, error_msg):
-        """Handle translation errors with detailed error analysis and recovery options"""
-        # Detailed error analysis
-        if "openrouter api key error" in error_msg.lower():
-            detailed_msg = (f"OpenRouter API Key Error:\n{error_msg}\n\n"
-                          f"This could be due to:\n"
-                          f"• Invalid or expired API key\n"
-                          f"• Missing API key in your project settings\n"
-                          f"• API key format issues\n\n"
-                          f"Please check your OpenRouter API key in project settings.")
-        elif "openrouter quota exceeded" in error_msg.lower() or "rate limit" in error_msg.lower():
-            detailed_msg = (f"OpenRouter Quota Exceeded:\n{error_msg}\n\n"
-                          f"This could be due to:\n"
-                          f"• API usage limit reached\n"
-                          f"• Too many requests in a short time\n"
-                          f"• Account subscription limits\n\n"
-                          f"Please wait a while or check your OpenRouter account limits.")
-        elif "openrouter model access denied" in error_msg.lower():
-            detailed_msg = (f"OpenRouter Model Access Denied:\n{error_msg}\n\n"
-                          f"This could be due to:\n"
-                          f"• Model requires special access\n"
-                          f"• Model is not available to your account\n"
-                          f"• Model is deprecated or unavailable\n\n"
-                          f"Please check model availability in your OpenRouter account.")
-        elif "openrouter access denied" in error_msg.lower():
-            detailed_msg = (f"OpenRouter Access Denied:\n{error_msg}\n\n"
-                          f"This could be due to:\n"
-                          f"• Authentication issues\n"
-                          f"• Account restrictions\n"
-                          f"• Service maintenance\n\n"
-                          f"Please check your OpenRouter account status.")
-        elif "timeout" in error_msg.lower():
-            detailed_msg = f"Connection timeout:\n{error_msg}\n\nCheck your network connection and Ollama server status."
-        elif "model not found" in error_msg.lower():
-            detailed_msg = f"Model error:\n{error_msg}\n\nVerify the model name and ensure it's pulled on your Ollama server."
+        """Report an error that belongs to no single item, without blocking the GUI."""
+        self.main_window.error_panel.record(None, "", error_msg, describe_error(error_msg))
+        self.main_window.statusBar().showMessage(f"Error: {error_msg.splitlines()[0]}", 5000)
+
+    def _handle_item_failure(self, item_index, error_msg, timeout=False, validation=False):
+        """Clean up one failed translation, list it in the error panel and retry it if the error is transient.
+
+        Other translations keep streaming. Errors no retry can fix, such as a
+        rejected API key, pause the queued run instead.
+        """
+        state_manager = self.main_window.translation_state_manager
+        # A thread can report a timeout and then an error; the first report cleans up
+        if (item_index not in self.active_threads and item_index not in self.active_translations
+                and not state_manager.is_item_translating(item_index)):
+            return
+        thread = self.active_threads.pop(item_index, None)
+        if thread and thread.isRunning():
+            thread.stop()
+            if not thread.wait(1000) and thread.isRunning():
+                thread.terminate()
+                thread.wait(500)
+        buffer = self.active_translations.pop(item_index, None)
+        if buffer:
+            buffer.stop()
+        self.pending_provenance.pop(item_index, None)
+        batch = self.request_batches.get(item_index)
+        from_queue = batch is not None and batch == self.queue_batch
+        self._release_request(item_index)
+        state_manager.handle_error(item_index=item_index)
+
+        project_items = self.main_window.project_items
+        if not 0 <= item_index < len(project_items):
+            self._start_queued_translations()
+            return
+        # Put back the translation the partial stream replaced in the editor
+        if item_index == self.main_window.current_item_index:
+            self.main_window._start_programmatic_text_update()
+            self.main_window.translated_text_area.blockSignals(True)
+            self.main_window.translated_text_area.setPlainText(project_items[item_index].get('translated_text', ''))
+            self.main_window.translated_text_area.blockSignals(False)
+            self.main_window._end_programmatic_text_update()
+
+        item = project_items[item_index]
+        item_name = item.get('name', f'Item {item_index + 1}')
+        attempts = self.retry_counts.get(item_key(item), 0) + 1
+        self.retry_counts[item_key(item)] = attempts
+        if not is_retryable(error_msg):
+            status = "failed"
+            if self.translation_queue:
+                self._pause_queue(f"'{item_name}' failed: {error_msg.splitlines()[0]}")
+        elif attempts <= len(RETRY_DELAYS):
+            delay = RETRY_DELAYS[attempts - 1]
+            status = f"retrying in {delay} s"
+            # The timer follows the item, not its index: items may be moved or removed meanwhile
+            QTimer.singleShot(delay * 1000, lambda: self._retry_item(project_items, item, from_queue))
         else:
-            detailed_msg = f"Error:\n{error_msg}"
-
-        # Show error dialog with more context
-        msg_box = QMessageBox(self.main_window)
-        msg_box.setIcon(QMessageBox.Critical)
-        msg_box.setWindowTitle("Translation Error")
-        msg_box.setText(detailed_msg)
-        msg_box.setStandardButtons(QMessageBox.Ok)
-        msg_box.exec_()
-
-        # Detect if this is a 403 error and pass error type to state manager
-        error_type = None
-        if "403" in error_msg or "access denied" in error_msg.lower() or "api key error" in error_msg.lower():
-            error_type = "403"
-        
-        # Use state manager to handle error state with error type
-        self.main_window.translation_state_manager.handle_error(error_type=error_type)
-    
-    def _handle_translation_error_with_type(self, error_msg, error_type=None):
-        """Handle translation errors with error type information for specialized handling"""
-        print(f"DEBUG: Handling translation error with type: {error_type}, message: {error_msg}")
-        print(f"DEBUG: Active translations before error handling: {list(self.active_translations.keys())}")
-        print(f"DEBUG: Current translation item: {getattr(self, 'current_translation_item', 'NOT SET')}")
-        
-        # For 403 errors, ensure immediate state reset through state manager
-        if error_type == "403":
-            print("DEBUG: 403 error detected, calling force_reset")
-            self.main_window.translation_state_manager.handle_error(error_type="403")
+            status = "failed"
+        self.main_window.error_panel.record(item, item_name, error_msg,
+                                            describe_error(error_msg, timeout, validation), attempts, status)
+        self.main_window.statusBar().showMessage(
+            f"Translation for '{item_name}' failed ({status}): {error_msg.splitlines()[0]}", 5000)
+        self.main_window._update_ui_state()
+        self._start_queued_translations()
+
+    def _retry_item(self, project_items, item, from_queue):
+        """Translate a failed item again; items of the queued run rejoin its queue and budget.
+
+        Nothing happens when the item has been removed since it failed.
+        """
+        if project_items is not self.main_window.project_items or not self.main_window.current_project_data:
             return
-            
-        # For other errors, use the detailed error handling
-        self._handle_translation_error(error_msg)
-        
-        # Also notify state manager about the error type for additional handling
-        self.main_window.translation_state_manager.handle_error(error_type=error_type)
-        
-        print(f"DEBUG: Active translations after error handling: {list(self.active_translations.keys())}")
-        
-        # Clear all active translations to prevent stuck status
-        print(f"DEBUG: Clearing all active translations to prevent stuck status")
-        items_to_clear = list(self.active_translations.keys())
-        self.active_translations.clear()
-        print(f"DEBUG: Cleared {len(items_to_clear)} items. Active translations after cleanup: {list(self.active_translations.keys())}")
-        
-        # Also clear the current translation item if it exists
-        if hasattr(self, 'current_translation_item') and self.current_translation_item is not None:
-            print(f"DEBUG: Clearing current translation item: {self.current_translation_item}")
-            self.current_translation_item = None
-    
-    def _clear_active_translations(self):
-        """Clear all active translations, called when UI refresh is needed after error recovery."""
-        print(f"DEBUG: UI refresh triggered - clearing active translations")
-        print(f"DEBUG: Current translation item: {getattr(self, 'current_translation_item', 'NOT SET')}")
-        items_to_clear = list(self.active_translations.keys())
-        self.active_translations.clear()
-        print(f"DEBUG: Cleared {len(items_to_clear)} items during UI refresh. Active translations: {list(self.active_translations.keys())}")
-        
-        
-        # Don't show error message here since this is just a cleanup method
+        item_index = self._find_item(item)
+        if item_index is None:
+            self.retry_counts.pop(item_key(item), None)
+            return
+        if item_index in self.translation_queue or self.main_window.translation_state_manager.is_item_translating(item_index):
+            return
+        self.main_window.error_panel.set_status(item, "retrying")
+        if from_queue and self._queue_items is project_items:
+            self.translation_queue.append(item_index)
+            self._start_queued_translations()
+        else:
+            self.translate_item(item_index, interactive=False)
+
+    def _find_item(self, item):
+        """Current index of the project `item`, found by identity; None when it was removed."""
+        return next((index for index, candidate in enumerate(self.main_window.project_items) if candidate is item),
+                    None)
+
+    def retry_items(self, keys):
+        """Queue failed items (by item_key) again, with a fresh set of automatic retries."""
+        if not self.main_window.current_project_data:
+            return
+        indices = {item_key(item): index for index, item in enumerate(self.main_window.project_items)}
+        item_indices = [indices[key] for key in keys if key in indices]
+        for item_index in item_indices:
+            item = self.main_window.project_items[item_index]
+            self.retry_counts.pop(item_key(item), None)
+            self.main_window.error_panel.set_status(item, "queued")
+        queued = self.queue_translations(item_indices)
+        self.main_window.statusBar().showMessage(f"{queued} failed items queued again.", 3000)
 
     def show_request_payload(self):
         if self.main_window.current_item_index is None or not self.main_window.current_project_data:
@@ -569,105 +1347,3 @@ class TranslationManager:
             dialog.exec_()
         except Exception as e:
             QMessageBox.critical(self.main_window, "Error", f"Failed to show response:\n{e}")
-
-    def _handle_timeout_detected(self, timeout_msg):
-        """Handle translation timeout detected by TranslationThread."""
-        print(f"DEBUG: Translation timeout detected: {timeout_msg}")
-        
-        # Get the item index from active threads
-        item_index = None
-        for idx, thread in self.active_threads.items():
-            if thread == self.sender():
-                item_index = idx
-                break
-        
-        if item_index is not None:
-            # Clean up the specific item translation
-            self._cleanup_failed_translation(item_index, timeout_msg, timeout=True)
-        else:
-            # Fallback to general timeout handling
-            self._handle_translation_error(f"Translation timeout: {timeout_msg}")
-
-    def _handle_validation_failed(self, validation_msg):
-        """Handle validation failure detected by TranslationThread."""
-        print(f"DEBUG: Validation failed: {validation_msg}")
-        
-        # Get the item index from active threads
-        item_index = None
-        for idx, thread in self.active_threads.items():
-            if thread == self.sender():
-                item_index = idx
-                break
-        
-        if item_index is not None:
-            # Clean up the specific item translation
-            self._cleanup_failed_translation(item_index, validation_msg, validation=True)
-        else:
-            # Fallback to general error handling
-            self._handle_translation_error(f"Validation failed: {validation_msg}")
-
-    def _cleanup_failed_translation(self, item_index, error_msg, timeout=False, validation=False):
-        """Clean up after a failed translation and reset state."""
-        try:
-            # Mark item as stopped in buffer if it exists
-            if item_index in self.active_translations:
-                buffer = self.active_translations[item_index]
-                buffer.stop()
-            
-            # Stop the thread if it exists
-            if item_index in self.active_threads:
-                thread = self.active_threads[item_index]
-                if thread.isRunning():
-                    thread.stop()
-                    # Wait a short time for thread to stop gracefully
-                    if not thread.wait(1000):
-                        if thread.isRunning():
-                            thread.terminate()
-                            thread.wait(500)
-                # Clean up thread
-                del self.active_threads[item_index]
-            
-            # Use state manager to handle error state for this specific item
-            self.main_window.translation_state_manager.stop_translation(item_index)
-            
-            # Update UI state
-            self.main_window._update_ui_state()
-            
-            # Show appropriate error message based on error type
-            if timeout:
-                detailed_msg = (f"Translation timed out:\n{error_msg}\n\n"
-                              f"This could be due to:\n"
-                              f"• Slow network connection\n"
-                              f"• Server overload\n"
-                              f"• Large text requiring more processing time\n\n"
-                              f"Try reducing text length or checking your connection.")
-            elif validation:
-                detailed_msg = (f"Connection validation failed:\n{error_msg}\n\n"
-                              f"This could be due to:\n"
-                              f"• Model not available on server\n"
-                              f"• Authentication issues\n"
-                              f"• Server maintenance\n\n"
-                              f"Check your model configuration and server status.")
-            else:
-                detailed_msg = f"Translation failed:\n{error_msg}"
-            
-            # Show error dialog
-            msg_box = QMessageBox(self.main_window)
-            msg_box.setIcon(QMessageBox.Warning)
-            msg_box.setWindowTitle("Translation Error")
-            msg_box.setText(detailed_msg)
-            msg_box.setStandardButtons(QMessageBox.Ok)
-            msg_box.exec_()
-            
-            # Update status bar
-            item_name = self.main_window.project_items[item_index].get('name', f'Item {item_index + 1}')
-            status_msg = f"Translation for '{item_name}' failed - {error_msg.split(':')[0]}"
-            self.main_window.statusBar().showMessage(status_msg, 5000)
-            
-            # Clean up translation buffer
-            if item_index in self.active_translations:
-                del self.active_translations[item_index]
-                
-        except Exception as cleanup_error:
-            # Log cleanup errors but don't let them interfere with the main error handling
-            print(f"Error during translation cleanup: {cleanup_error}")
\ No newline at end of file
@@ -1,5 +1,5 @@
 from PyQt5.QtCore import QThread, pyqtSignal, QTimer
-from model_request_handler import ModelRequestHandler
+from model_router import create_routed_handler, routing_chain, hedge_after_seconds
 from openrouter_adapter import OpenRouterAdapter
 import time
 import socket
@@ -14,13 +14,20 @@ class TranslationThread(QThread):
     validation_failed = pyqtSignal(str)
     timeout_detected = pyqtSignal(str)
 
-    def __init__(self, parent, item_index=None):
+    def __init__(self, parent, item_index=None, payload=None, streaming=True):
         super().__init__(parent)
         self.parent_window = parent
         self.item_index = item_index
+        self.payload = payload  # Prebuilt on the GUI thread; avoids rebuilding it here
+        # Without streaming the whole translation arrives as one chunk, with no per-token signals
+        self.streaming = streaming
         self.handler = None
         self.stop_requested = False
         self.model_manager = parent.model_manager if hasattr(parent, 'model_manager') else None
+        # Fallback chain and hedging are project settings; read them here, on the GUI thread
+        project_data = getattr(parent, 'current_project_data', None) or {}
+        self.fallback_models = list(project_data.get('fallback_models', []) or [])
+        self.hedge_after = hedge_after_seconds(project_data)
         self.timeout_timer = None
         self.last_activity_time = None
         self.request_timeout = 60  # Default timeout in seconds
@@ -44,6 +51,10 @@ class TranslationThread(QThread):
             except:
                 pass
 
+    def model_used(self):
+        """Model that produced the translation; differs from the payload's when a fallback model won."""
+        return getattr(self.handler, 'active_model_id', None) or (self.payload or {}).get('model')
+
     def _start_timeout_monitor(self):
         """Start monitoring for translation timeout."""
         self.last_activity_time = time.time()
@@ -90,8 +101,10 @@ class TranslationThread(QThread):
 
     def run(self):
         try:
-            # Use item-specific payload building if item_index is provided
-            if self.item_index is not None:
+            # Prefer the payload built by the caller, fall back to building it here
+            if self.payload is not None:
+                payload = self.payload
+            elif self.item_index is not None:
                 payload = self.parent_window.translation_manager._build_api_payload_for_item(self.item_index)
             else:
                 payload = self.parent_window._build_api_payload()
@@ -106,8 +119,10 @@ class TranslationThread(QThread):
                 self.error.emit(f"Invalid model configuration for {model_id}")
                 return
 
-            # Create appropriate handler with full model_id including provider prefix
-            self.handler = ModelRequestHandler.create_handler(model_id, model_config)
+            # Create appropriate handler with full model_id including provider prefix,
+            # routed through the project's fallback models when it has any
+            chain = routing_chain(model_id, {'fallback_models': self.fallback_models})
+            self.handler = create_routed_handler(chain, self.parent_window.model_manager, self.hedge_after)
             if not self.handler:
                 self.error.emit(f"Unsupported model provider for {model_id}")
                 return
@@ -136,6 +151,20 @@ class TranslationThread(QThread):
 
             # Send the request and track progress
             try:
+                if not self.streaming:
+                    self.progress_updated.emit(50, "Translating in the background...")
+                    text = self.handler.complete(payload)
+                    if self.stop_requested:
+                        self.progress_updated.emit(0, "Translation stopped by user")
+                        return
+                    if not text:
+                        self.error.emit("Empty response")
+                        return
+                    self.chunk_received.emit(text)
+                    self.progress_updated.emit(100, "Translation completed")
+                    self.finished.emit()
+                    return
+
                 for chunk in self.handler.send_request(payload):
                     if self.stop_requested:
                         self.progress_updated.emit(0, "Translation stopped by user")
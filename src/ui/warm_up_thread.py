@@ -0,0 +1,21 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from model_request_handler import ModelRequestHandler
+
+
+class WarmUpThread(QThread):
+    """Prepares the model (e.g. loads it on the Ollama server) before a batch starts."""
+    warm_up_finished = pyqtSignal(bool)  # whether the provider reported success
+
+    def __init__(self, parent, model_id):
+        super().__init__(parent)
+        self.model_id = model_id
+        self.model_manager = parent.model_manager if hasattr(parent, 'model_manager') else None
+
+    def run(self):
+        model_config = self.model_manager.get_model_config(self.model_id) if self.model_manager else None
+        handler = ModelRequestHandler.create_handler(self.model_id, model_config) if model_config else None
+        try:
+            self.warm_up_finished.emit(bool(handler and handler.warm_up()))
+        except Exception as e:
+            print(f"Warning: Warm-up of {self.model_id} failed: {e}")
+            self.warm_up_finished.emit(False)
@@ -0,0 +1,150 @@
+import pytest
+
+import batch_budget
+from batch_budget import BatchBudget, batch_limits, exceeded_limits
+
+PRICING = {"prompt": 2.0, "completion": 8.0, "batch_discount": 0.5}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(batch_budget.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _limits(**limits):
+    return batch_limits({"batch_limits": limits})
+
+
+@pytest.mark.parametrize("project_data, limits", [
+    (None, {"tokens": 0.0, "cost": 0.0, "minutes": 0.0, "rpm": 0.0}),
+    ({"batch_limits": {"tokens": "5000", "cost": 1.5, "minutes": None, "rpm": "fast"}},
+     {"tokens": 5000.0, "cost": 1.5, "minutes": 0.0, "rpm": 0.0}),
+    ({"batch_limits": {"tokens": -10}}, {"tokens": 0.0, "cost": 0.0, "minutes": 0.0, "rpm": 0.0}),
+])
+def test_batch_limits(project_data, limits):
+    assert batch_limits(project_data) == limits
+
+
+def test_exceeded_limits():
+    estimate = {"prompt_tokens": 800, "completion_tokens": 400, "cost": 2.0}
+    assert exceeded_limits(_limits(), estimate) is None
+    assert exceeded_limits(_limits(tokens=1200, cost=2), estimate) is None
+    assert exceeded_limits(_limits(tokens=1000, cost=1), estimate) == (
+        "~1,200 tokens exceed the limit of 1,000; ~$2.00 exceeds the limit of $1.00")
+    # Without pricing there is no cost to compare
+    assert exceeded_limits(_limits(cost=1), dict(estimate, cost=None)) is None
+
+
+def test_from_project_takes_the_expected_request_from_the_estimate():
+    assert BatchBudget.from_project({}) is None
+    estimate = {"requests": 4, "prompt_tokens": 300, "completion_tokens": 100, "cost": 0.4}
+    budget = BatchBudget.from_project({"batch_limits": {"tokens": 1000}}, PRICING, estimate)
+    assert budget.expected_tokens == 100
+    assert budget.expected_cost == pytest.approx(0.1)
+
+
+def test_token_limit_counts_requests_in_flight():
+    budget = BatchBudget(_limits(tokens=1000), expected_tokens=300)
+    for _ in range(3):
+        assert budget.try_start() == (None, 0)
+    # A fourth request would need 1,200 tokens if all of them cost what was expected
+    reason, wait = budget.try_start()
+    assert reason.startswith("token limit of 1,000 nearly reached")
+    assert budget.paused_reason == reason
+
+
+def test_finished_requests_replace_the_estimate():
+    budget = BatchBudget(_limits(tokens=1000), expected_tokens=500)
+    assert budget.try_start() == (None, 0)
+    budget.finish_request(80, 20)
+    assert budget.tokens == 100
+    # 100 spent; the next requests are expected to cost 100 each as well
+    for _ in range(9):
+        assert budget.try_start() == (None, 0)
+    assert budget.try_start()[0] is not None
+
+
+def test_cost_limit_uses_the_pricing_and_batch_discount():
+    budget = BatchBudget(_limits(cost=1.0), PRICING, expected_cost=0.1, batch_api=True)
+    assert budget.try_start() == (None, 0)
+    budget.finish_request(100_000, 50_000)
+    # (0.2 + 0.4) / 2 with the discount
+    assert budget.cost == pytest.approx(0.3)
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start()[0].startswith("cost limit of $1.00 nearly reached")
+
+
+def test_explicit_cost_wins_over_pricing():
+    budget = BatchBudget(_limits(cost=1.0), PRICING)
+    budget.try_start()
+    budget.finish_request(100_000, 50_000, cost=0.05)
+    assert budget.cost == pytest.approx(0.05)
+
+
+def test_cancelled_requests_release_their_reservation():
+    budget = BatchBudget(_limits(tokens=1000), expected_tokens=400)
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start()[0] is not None
+    budget.cancel_request()
+    budget.update_limits(_limits(tokens=1000))
+    assert budget.try_start() == (None, 0)
+    assert budget.tokens == 0
+
+
+def test_time_limit(clock):
+    budget = BatchBudget(_limits(minutes=2))
+    assert budget.try_start() == (None, 0)
+    clock[0] += 119
+    assert budget.remaining()["minutes"] == pytest.approx(1 / 60)
+    assert budget.try_start() == (None, 0)
+    clock[0] += 1
+    assert budget.try_start() == ("time limit of 2 min reached", 0)
+
+
+def test_rate_limit_delays_without_pausing(clock):
+    budget = BatchBudget(_limits(rpm=2))
+    assert budget.try_start() == (None, 0)
+    clock[0] += 10
+    assert budget.try_start() == (None, 0)
+    clock[0] += 20
+    assert budget.try_start() == (None, pytest.approx(30))
+    assert budget.paused_reason is None
+    clock[0] += 30
+    assert budget.try_start() == (None, 0)
+
+
+def test_resume_keeps_what_was_spent():
+    budget = BatchBudget(_limits(tokens=1000, cost=1.0), PRICING, expected_tokens=300, expected_cost=0.1)
+    for _ in range(3):
+        budget.try_start()
+        budget.finish_request(250, 50)
+    reason, _ = budget.try_start()
+    assert reason is not None
+
+    budget.update_limits(_limits(tokens=1500, cost=1.0))
+
+    assert budget.paused_reason is None
+    assert budget.tokens == 900
+    assert budget.remaining()["tokens"] == 600
+    # 900 spent and 300 per request: two more fit under the raised limit, a third does not
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start() == (None, 0)
+    assert budget.try_start()[0].startswith("token limit of 1,500")
+
+
+@pytest.mark.parametrize("limits, spent, text", [
+    ({}, 0, "no limits"),
+    ({"rpm": 30}, 0, "30 requests per minute"),
+    ({"tokens": 12000}, 2000, "10,000 tokens left"),
+    ({"tokens": 12000, "cost": 5}, 2000, "10,000 tokens and $4.50 left"),
+])
+def test_describe(limits, spent, text):
+    budget = BatchBudget(_limits(**limits), PRICING)
+    if spent:
+        budget.try_start()
+        budget.finish_request(spent, 0, cost=0.5)
+    assert budget.describe() == text
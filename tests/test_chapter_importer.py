@@ -0,0 +1,87 @@
+import pytest
+
+from chapter_importer import build_items, content_hash, is_chapter_heading, split_text_chapters
+
+
+@pytest.mark.parametrize("line", [
+    "Chapter 12",
+    "Chapter 12: The Gate",
+    "CHAPTER XII",
+    "Chapter Twenty-One",
+    "Chapter 3 The Gate",
+    "Chapter 1.",
+    "Chapter 5: Love, Lies",
+    "Chapter 7 — Who Is She?",
+    "Ch. 5",
+    "Vol. 3 - Winter",
+    "Book IV",
+    "Prologue",
+    "Epilogue: Home",
+    "Side Story 2",
+    "第12章 开始",
+    "제3화",
+])
+def test_heading_lines(line):
+    assert is_chapter_heading(line)
+
+
+@pytest.mark.parametrize("line", [
+    "",
+    "Partially, yes.",
+    "Book in hand, she left.",
+    "Part one of the plan failed.",
+    "Chapter one was boring",
+    "Prologue to the story was long.",
+    "Chapters",
+    "Volume 3 is out",
+    "Part 2. Then she ran, crying.",
+    "Chapter 3: She left, and he stayed.",
+    "Book mild",
+    "Chapter 1: " + "x" * 80,
+])
+def test_prose_lines(line):
+    assert not is_chapter_heading(line)
+
+
+def test_split_text_chapters_keeps_preface_and_headings():
+    lines = ["Translator's note\n", "\n", "Chapter 1: Dawn\n", "Partially, yes.\n", "Chapter 2\n", "Dusk.\n"]
+
+    chapters = split_text_chapters(lines, "novel")
+
+    assert chapters == [
+        ("novel", "Translator's note"),
+        ("Chapter 1: Dawn", "Chapter 1: Dawn\nPartially, yes."),
+        ("Chapter 2", "Chapter 2\nDusk."),
+    ]
+
+
+def test_split_text_chapters_without_headings_is_one_chapter():
+    assert split_text_chapters(["Book in hand, she left.\n", "The end.\n"], "story") == [
+        ("story", "Book in hand, she left.\nThe end.")
+    ]
+
+
+def test_split_text_chapters_skips_blank_preface():
+    assert [name for name, _ in split_text_chapters(["\n", "Chapter 1\n", "Text\n"], "novel")] == ["Chapter 1"]
+
+
+@pytest.mark.parametrize("chapters, existing_names, existing_texts, names, duplicates", [
+    # Names already in the project get a numbered suffix
+    ([("Chapter 1", "a")], ["Chapter 1"], [], ["Chapter 1 (2)"], 0),
+    # ... as do repeated names within the import
+    ([("Intro", "a"), ("Intro", "b"), ("Intro", "c")], [], [], ["Intro", "Intro (2)", "Intro (3)"], 0),
+    # Suffixes skip names that are taken too
+    ([("Intro", "a")], ["Intro", "Intro (2)"], [], ["Intro (3)"], 0),
+    # Text already in the project, ignoring whitespace, is a duplicate
+    ([("Chapter 9", "one  two\nthree")], [], ["one two three"], [], 1),
+    # So is text repeated within the import
+    ([("A", "same"), ("B", " same ")], [], [], ["A"], 1),
+    # Blank names are numbered after the existing items
+    ([("  ", "a")], ["x", "y"], [], ["Chapter 3"], 0),
+])
+def test_build_items(chapters, existing_names, existing_texts, names, duplicates):
+    result = build_items(chapters, existing_names, [content_hash(text) for text in existing_texts])
+
+    assert [item["name"] for item in result["items"]] == names
+    assert result["duplicates"] == duplicates
+    assert all(item["translated_text"] == "" for item in result["items"])
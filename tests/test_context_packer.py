@@ -0,0 +1,157 @@
+import pytest
+
+from context_assembler import ContextAssembler, resolve_prompt_templates
+from context_packer import ContextPacker, estimate_completion_reserve
+from hashing import item_source_hash
+
+TEMPLATES = resolve_prompt_templates({}, {})
+SOURCE = "the current chapter"
+
+
+def _count_words(text):
+    return len(text.split())
+
+
+def _items(*lengths):
+    return [{"name": f"Chapter {i + 1}", "source_text": " ".join(["word"] * length), "translated_text": ""}
+            for i, length in enumerate(lengths)]
+
+
+def _summarize(item, text="a short summary"):
+    item["summary"] = {"text": text, "source_hash": item_source_hash(item)}
+
+
+def _packer():
+    return ContextPacker(ContextAssembler(), _count_words)
+
+
+def _window(packer, costs, parameters=None):
+    """A window whose context budget is exactly `costs` tokens."""
+    overhead = packer.prompt_overhead(TEMPLATES, "French", SOURCE)
+    return overhead + estimate_completion_reserve(_count_words(SOURCE), parameters) + costs
+
+
+@pytest.mark.parametrize("source_tokens, parameters, reserve", [
+    (100, None, 150),
+    (101, {}, 152),
+    (100, {"completion_ratio": 2}, 200),
+    (100, {"completion_reserve": 40}, 40),
+    (100, {"completion_reserve": 0}, 0),
+    (100, {"completion_reserve": -1}, 150),
+    (100, {"max_tokens_completion": 120}, 120),
+    (100, {"num_predict": 64}, 64),
+    (100, {"num_predict": 0}, 150),
+    (100, {"completion_reserve": 500, "max_tokens_completion": 120}, 500),
+])
+def test_estimate_completion_reserve(source_tokens, parameters, reserve):
+    assert estimate_completion_reserve(source_tokens, parameters) == reserve
+
+
+def test_nearest_alternates_before_and_after():
+    packer = _packer()
+    items = _items(10, 10, 10, 10, 10)
+    cost = packer.item_cost(items, 1, "French")
+    window = _window(packer, 2 * cost)
+
+    plan = packer.pack(items, 2, range(5), window, TEMPLATES, "French", SOURCE)
+
+    assert plan.included == {1, 3}
+    assert plan.excluded == {0, 4}
+    assert plan.context_tokens == 2 * cost
+    assert plan.total_tokens == window
+
+
+def test_nearest_skips_items_that_do_not_fit_and_keeps_filling():
+    packer = _packer()
+    items = _items(10, 500, 10, 10)
+    window = _window(packer, packer.item_cost(items, 0, "French") + packer.item_cost(items, 3, "French"))
+
+    plan = packer.pack(items, 2, range(4), window, TEMPLATES, "French", SOURCE)
+
+    assert plan.included == {0, 3}
+    assert plan.excluded == {1}
+
+
+def test_max_items_prefers_the_cheapest_items():
+    packer = _packer()
+    # The nearest item is bigger than the others but not twice as big
+    items = _items(5, 25, 5, 5, 5, 5)
+    window = _window(packer, 3 * packer.item_cost(items, 0, "French"))
+
+    nearest = packer.pack(items, 2, range(6), window, TEMPLATES, "French", SOURCE)
+    max_items = packer.pack(items, 2, range(6), window, TEMPLATES, "French", SOURCE, strategy="max_items")
+
+    assert nearest.included == {1, 3}
+    # Equally cheap items go to the nearest first
+    assert max_items.included == {0, 3, 4}
+
+
+def test_hierarchical_summarizes_distant_items():
+    packer = _packer()
+    items = _items(50, 50, 50, 50, 50, 50)
+    _summarize(items[0])
+    # Item 1 has no summary; item 5 has one made for an older source
+    items[5]["summary"] = {"text": "outdated", "source_hash": "old"}
+    window = _window(packer, 10_000)
+
+    plan = packer.pack(items, 4, range(6), window, TEMPLATES, "French", SOURCE, strategy="hierarchical",
+                       verbatim_radius=2)
+
+    assert plan.included == {0, 2, 3, 5}
+    assert plan.summarized == {0}
+    assert plan.excluded == {1}
+
+
+def test_relevant_packs_nearby_items_and_ranked_excerpts():
+    packer = _packer()
+    items = [{"name": f"Chapter {i + 1}", "source_text": "first paragraph\n\nsecond paragraph", "translated_text": ""}
+             for i in range(6)]
+    excerpts = {0: (1,), 1: (0,), 5: (0,)}
+    window = _window(packer, 10_000)
+
+    plan = packer.pack(items, 4, range(6), window, TEMPLATES, "French", SOURCE, strategy="relevant",
+                       verbatim_radius=1, excerpts=excerpts)
+
+    # Later items are never context in this mode, even with a match
+    assert plan.included == {0, 1, 3}
+    assert plan.excerpts == {0: (1,), 1: (0,)}
+    assert plan.excluded == {2, 5}
+
+
+def test_relevant_takes_the_best_match_first():
+    packer = _packer()
+    items = _items(30, 30, 30, 5)
+    excerpts = {1: (0,), 0: (0,)}
+    window = _window(packer, packer.excerpt_cost(items, 1, (0,), "French"))
+
+    plan = packer.pack(items, 3, range(3), window, TEMPLATES, "French", SOURCE, strategy="relevant",
+                       verbatim_radius=0, excerpts=excerpts)
+
+    assert plan.included == {1}
+
+
+def test_plan_tokens_matches_pack():
+    packer = _packer()
+    items = _items(10, 20, 30, 40)
+    _summarize(items[0])
+    window = _window(packer, 10_000)
+    packed = packer.pack(items, 3, range(4), window, TEMPLATES, "French", SOURCE, strategy="hierarchical",
+                         verbatim_radius=1)
+
+    planned = packer.plan_tokens(items, packed.included, TEMPLATES, "French", SOURCE, window,
+                                 current_index=3, summarized=packed.summarized)
+
+    assert planned.context_tokens == packed.context_tokens
+    assert planned.overhead_tokens == packed.overhead_tokens
+    assert planned.budget == packed.budget
+
+
+def test_no_candidates_leaves_out_the_context_header():
+    packer = _packer()
+    items = _items(10)
+    with_context = packer.prompt_overhead(TEMPLATES, "French", SOURCE)
+
+    plan = packer.pack(items, 0, [0], 10_000, TEMPLATES, "French", SOURCE)
+
+    assert plan.included == set()
+    assert plan.overhead_tokens < with_context
@@ -0,0 +1,128 @@
+import pytest
+
+import cost_ledger
+from cost_ledger import CostLedger, estimate_requests, format_cost, ledger_path, model_pricing, request_cost
+
+PRICED = {"pricing": {"prompt": 2.0, "completion": 8.0, "batch_discount": 0.5}}
+
+
+class _WordCalibration:
+    def fast_count(self, text, model_id, model_config=None):
+        return len(text.split())
+
+
+@pytest.fixture(autouse=True)
+def word_counts(monkeypatch):
+    monkeypatch.setattr(cost_ledger, "get_calibration", lambda: _WordCalibration())
+
+
+def _payload(*contents):
+    return {"messages": [{"role": "user", "content": content} for content in contents]}
+
+
+@pytest.mark.parametrize("config, pricing", [
+    (None, None),
+    ({}, None),
+    ({"pricing": "free"}, None),
+    ({"pricing": {"prompt": "x"}}, None),
+    ({"pricing": {"prompt": 1}}, {"prompt": 1.0, "completion": 0.0, "batch_discount": 1.0}),
+    (PRICED, {"prompt": 2.0, "completion": 8.0, "batch_discount": 0.5}),
+])
+def test_model_pricing(config, pricing):
+    assert model_pricing(config) == pricing
+
+
+def test_request_cost_applies_the_batch_discount():
+    pricing = model_pricing(PRICED)
+    assert request_cost(pricing, 1_000_000, 500_000) == pytest.approx(6.0)
+    assert request_cost(pricing, 1_000_000, 500_000, batch_api=True) == pytest.approx(3.0)
+    assert request_cost(None, 1_000_000, 500_000) is None
+
+
+@pytest.mark.parametrize("cost, text", [(None, "no pricing"), (0.01234, "$0.0123"), (1234.5, "$1,234.50")])
+def test_format_cost(cost, text):
+    assert format_cost(cost) == text
+
+
+def test_ledger_path_is_not_a_project_file():
+    assert ledger_path("/projects/novel.json") == "/projects/novel.ledger"
+
+
+def test_entries_survive_a_reload_and_a_cut_short_line(tmp_path):
+    path = str(tmp_path / "novel.ledger")
+    ledger = CostLedger(path)
+    ledger.record(0, "Chapter 1", "gpt", 100, 50, 0.5, batch="stale 1", context_mode="fill_budget")
+    ledger.record(None, "Summaries", "gpt", 10, 5, None, kind="summary")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"model": "gpt", "prompt')
+
+    reloaded = CostLedger(path)
+
+    assert reloaded.entries == ledger.entries
+    assert reloaded.total() == {"requests": 2, "prompt_tokens": 110, "completion_tokens": 55, "cost": 0.5,
+                                "unpriced": 1}
+
+
+def test_totals_by_kind_batch_and_context_mode():
+    ledger = CostLedger()
+    ledger.record(0, "Chapter 1", "gpt", 100, 50, 1.0, batch="stale 1", context_mode="fill_budget")
+    ledger.record(0, "Chapter 1", "backup", 100, 0, 0.25, batch="stale 1", context_mode="fill_budget", kind="hedge")
+    ledger.record(1, "Chapter 2", "gpt", 30, 10, 0.5, context_mode="", kind="summary")
+    ledger.record(None, "", "gpt", 40, 20, 0.5, kind="glossary")
+    # Written before kinds existed
+    ledger.entries.append({"model": "gpt", "item": 2, "prompt_tokens": 10, "completion_tokens": 5, "cost": None})
+
+    assert {kind: totals["requests"] for kind, totals in ledger.by_kind().items()} == {
+        "translation": 2, "hedge": 1, "summary": 1, "glossary": 1}
+    assert ledger.by_kind()["hedge"]["cost"] == 0.25
+    assert ledger.by_batch()["stale 1"]["requests"] == 2
+    assert ledger.by_batch()["single requests"]["requests"] == 3
+    # Summaries and glossary requests are not part of any context mode
+    assert {mode: totals["requests"] for mode, totals in ledger.by_context_mode().items()} == {
+        "fill_budget": 2, "unknown": 1}
+    assert ledger.by_item()["Item 3"]["unpriced"] == 1
+
+
+def test_completion_ratio_from_history():
+    ledger = CostLedger()
+    assert ledger.completion_ratio("gpt") is None
+    ledger.record(0, "", "gpt", 100, 150, None, source_tokens=100)
+    ledger.record(1, "", "gpt", 100, 50, None, source_tokens=100)
+    ledger.record(2, "", "other", 100, 900, None, source_tokens=100)
+    ledger.record(3, "", "gpt", 100, 900, None)
+    assert ledger.completion_ratio("gpt") == 1.0
+
+
+def test_estimate_counts_prompts_and_predicts_completions():
+    ledger = CostLedger()
+    ledger.record(0, "", "gpt", 10, 20, None, source_tokens=10)
+    requests = [(_payload("system prompt here", "one two three four"), "one two three four")]
+
+    estimate = estimate_requests(requests, "gpt", PRICED, ledger)
+
+    assert estimate == {"requests": 1, "prompt_tokens": 7, "completion_tokens": 8,
+                        "cost": request_cost(model_pricing(PRICED), 7, 8)}
+    assert estimate_requests(requests, "gpt", PRICED, ledger, batch_api=True)["cost"] == pytest.approx(
+        estimate["cost"] / 2)
+    assert estimate_requests(requests, "gpt", None)["cost"] is None
+
+
+def test_estimate_extrapolates_unbuilt_requests_from_the_sample():
+    # Built payloads add 3 and 5 tokens of prompt to their sources: 4 on average
+    requests = [
+        (_payload("a b c", "one two"), "one two"),
+        (_payload("a b c d e", "one two three"), "one two three"),
+        (None, "one two three four"),
+        (None, "one"),
+    ]
+
+    estimate = estimate_requests(requests, "gpt", None)
+
+    assert estimate["requests"] == 4
+    assert estimate["prompt_tokens"] == (5 + 8) + (4 + 1) + 2 * 4
+    assert estimate["completion_tokens"] == 2 + 3 + 4 + 1
+
+
+def test_estimate_without_any_built_payload_counts_the_sources():
+    estimate = estimate_requests([(None, "one two"), (None, "three")], "gpt", None)
+    assert estimate["prompt_tokens"] == 3
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import endpoint_pool
+from endpoint_pool import EndpointPool, endpoint_capacity, parse_endpoints
+
+A = "http://a:11434"
+B = "http://b:11434"
+
+
+def _pool(*endpoints):
+    return EndpointPool(parse_endpoints({"endpoints": list(endpoints)}))
+
+
+def test_parse_endpoints_normalizes_urls_and_defaults():
+    endpoints = parse_endpoints({"endpoints": ["a:11434/", {"url": B, "weight": 2, "max_concurrency": 3}, {}]})
+    assert endpoints == [{"url": A, "weight": 1.0, "max_concurrency": 1},
+                         {"url": B, "weight": 2.0, "max_concurrency": 3}]
+
+
+@pytest.mark.parametrize("config, capacity", [
+    ({}, 0),
+    ({"endpoint": A}, endpoint_pool.SINGLE_ENDPOINT_MAX_CONCURRENCY),
+    ({"endpoint": A, "max_concurrency": 4}, 4),
+    ({"endpoints": [A, {"url": B, "max_concurrency": 3}]}, 4),
+])
+def test_endpoint_capacity(config, capacity):
+    assert endpoint_capacity(config) == capacity
+
+
+def test_ranked_prefers_lower_relative_load():
+    pool = _pool({"url": A, "max_concurrency": 4}, {"url": B, "weight": 3, "max_concurrency": 4})
+    assert pool.ranked() == [B, A]
+    assert pool.acquire() == B
+    assert pool.acquire() == B
+    # B now runs 2 of weight 3, a third request there weighs 1.0 just like the first on A
+    assert pool.acquire() in (A, B)
+    assert pool.ranked(exclude=(B,)) == [A]
+
+
+def test_acquire_skips_full_endpoints_and_returns_none_when_all_are_busy():
+    pool = _pool(A, B)
+    assert {pool.acquire(timeout=0), pool.acquire(timeout=0)} == {A, B}
+    assert pool.acquire(timeout=0) is None
+    assert [status["active"] for status in pool.status()] == [1, 1]
+
+
+def test_acquire_returns_none_when_every_endpoint_is_excluded():
+    pool = _pool(A)
+    assert pool.acquire(exclude=(A,), timeout=1) is None
+
+
+def test_acquire_waits_for_a_released_slot():
+    pool = _pool(A)
+    assert pool.acquire() == A
+    timer = threading.Timer(0.05, pool.release, args=(A,))
+    timer.start()
+    started = time.monotonic()
+    assert pool.acquire(timeout=5) == A
+    assert time.monotonic() - started < 5
+    timer.join()
+
+
+def test_concurrent_acquires_never_exceed_max_concurrency():
+    pool = _pool({"url": A, "max_concurrency": 2}, {"url": B, "max_concurrency": 3})
+    barrier = threading.Barrier(10)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(pool.acquire(timeout=0.2))
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(A) == 2
+    assert results.count(B) == 3
+    assert results.count(None) == 5
+
+
+def test_failures_back_off_exponentially_and_success_resets(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(endpoint_pool.time, "monotonic", lambda: now[0])
+    pool = _pool({"url": A, "max_concurrency": 4}, {"url": B, "max_concurrency": 4})
+
+    pool.release(pool.acquire(exclude=(B,)), success=False)
+    assert not pool.is_healthy(A)
+    assert pool.ranked() == [B, A]
+
+    pool.report(A, False)
+    now[0] += endpoint_pool.FAILURE_BACKOFF_SECONDS
+    # The second failure doubled the backoff
+    assert not pool.is_healthy(A)
+    now[0] += endpoint_pool.FAILURE_BACKOFF_SECONDS
+    assert pool.is_healthy(A)
+
+    for _ in range(20):
+        pool.report(A, False)
+    now[0] += endpoint_pool.MAX_BACKOFF_SECONDS
+    assert pool.is_healthy(A)
+
+    pool.report(A, True)
+    assert pool.status()[0]["failures"] == 0
+
+
+def test_unhealthy_endpoint_is_still_used_when_it_is_the_only_one_left():
+    pool = _pool(A, B)
+    pool.report(A, False)
+    assert pool.acquire(exclude=(B,), timeout=0) == A
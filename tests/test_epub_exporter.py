@@ -0,0 +1,32 @@
+import zipfile
+from xml.dom import minidom
+
+import pytest
+
+pytest.importorskip("markdown2")
+
+from exporters import export_project
+
+
+def test_every_chapter_is_well_formed_xml(tmp_path):
+    project_data = {
+        "title": "Tom & Jerry",
+        "target_language": "English",
+        "items": [
+            {"name": "Chapter 1 <Start>", "translated_text": "tr 0<br>x &nbsp; y &copy; <o:p>z</o:p>"},
+            {"name": "Chapter 2", "translated_text": "<div>unclosed <img src=cover.png alt>\n\n"
+                                                     "| a | b |\n|---|---|\n| 1 | 2 |\n\n</span>stray"},
+            {"name": "Chapter 3", "translated_text": "# Title\n\n**bold** and `code` \x0b\n\n<hr>"},
+        ]
+    }
+    output_path = str(tmp_path / "book.epub")
+
+    success, message = export_project(project_data, output_path, "epub",
+                                      cache_dir=str(tmp_path / "cache"), workers=1)
+
+    assert success, message
+    with zipfile.ZipFile(output_path) as archive:
+        documents = [name for name in archive.namelist() if name.endswith((".xhtml", ".ncx", ".opf"))]
+        assert len([name for name in documents if name.startswith("EPUB/chap_")]) == 3
+        for name in documents:
+            minidom.parseString(archive.read(name))  # Raises on markup that is not well-formed
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+pytest.importorskip("markdown2")
+
+from epub_exporter import chapter_key
+from exporters import export_project
+
+
+def _cached_keys(cache_dir):
+    return {os.path.splitext(name)[0] for name in os.listdir(cache_dir)}
+
+
+def test_export_keeps_renders_other_formats_need(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    items = [{"name": f"Chapter {i}", "source_text": f"source {i}", "translated_text": f"translation {i}"}
+             for i in range(3)]
+    project_data = {"title": "Book", "items": items}
+    sources = {chapter_key(item["source_text"]) for item in items}
+    translations = {chapter_key(item["translated_text"]) for item in items}
+
+    assert export_project(project_data, str(tmp_path / "book.html"), "bilingual_html", cache_dir=cache_dir,
+                          workers=1)[0]
+    assert export_project(project_data, str(tmp_path / "book.epub"), "epub", cache_dir=cache_dir, workers=1)[0]
+
+    assert _cached_keys(cache_dir) == sources | translations
+
+
+def test_export_prunes_renders_of_changed_items(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    items = [{"name": "Chapter 1", "source_text": "source", "translated_text": "first draft"}]
+    project_data = {"title": "Book", "items": items}
+    assert export_project(project_data, str(tmp_path / "a.epub"), "epub", cache_dir=cache_dir, workers=1)[0]
+
+    items[0]["translated_text"] = "second draft"
+    assert export_project(project_data, str(tmp_path / "b.epub"), "epub", cache_dir=cache_dir, workers=1)[0]
+
+    assert _cached_keys(cache_dir) == {chapter_key("second draft")}
+
+
+def test_volumes_split_chapters(tmp_path):
+    items = [{"name": f"Chapter {i}", "translated_text": f"text {i}"} for i in range(5)]
+    output_path = str(tmp_path / "book.epub")
+
+    success, message = export_project({"title": "Book", "items": items}, output_path, "epub", volume_size=2,
+                                      workers=1)
+
+    assert success, message
+    assert sorted(os.listdir(tmp_path)) == [f"book - Volume {n:02d}.epub" for n in (1, 2, 3)]
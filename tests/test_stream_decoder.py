@@ -0,0 +1,140 @@
+import json
+
+import pytest
+
+from stream_decoder import (
+    StreamDelta, StreamError, iter_lines, ndjson_objects, ollama_deltas, openai_deltas, parse_usage,
+    response_chunks, sse_events, sse_json
+)
+
+CHUNK_SIZES = [1, 2, 3, 7, 64, 10_000]
+
+
+def _split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _sse(*events):
+    return b"".join(b"data: " + json.dumps(event, ensure_ascii=False).encode() + b"\n\n" for event in events)
+
+
+def _openai_event(content="", reasoning="", usage=None):
+    event = {"choices": [{"delta": {"content": content, "reasoning": reasoning}}]}
+    if usage:
+        event["usage"] = usage
+    return event
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_iter_lines_joins_lines_split_across_chunks(size):
+    data = b"first\r\nsecond\n\nthird line\r\nlast"
+    assert list(iter_lines(_split(data, size))) == [b"first", b"second", b"", b"third line", b"last"]
+
+
+def test_iter_lines_skips_empty_chunks():
+    assert list(iter_lines([b"", b"a\n", b"", b"b"])) == [b"a", b"b"]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_sse_events_skip_comments_and_join_multiline_data(size):
+    data = b": OPENROUTER PROCESSING\n\nevent: message\nid: 1\ndata: one\ndata:two\n\ndata: three\n"
+    assert list(sse_events(_split(data, size))) == [b"one\ntwo", b"three"]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_sse_json_stops_at_done(size):
+    data = _sse({"n": 1}, {"n": 2}) + b"data: [DONE]\n\n" + _sse({"n": 3})
+    assert list(sse_json(_split(data, size))) == [{"n": 1}, {"n": 2}]
+
+
+def test_sse_json_reads_events_without_blank_lines_between_them():
+    data = b'data: {"n": 1}\ndata: {"n": 2}\ndata: [DONE]\n'
+    assert list(sse_json([data])) == [{"n": 1}, {"n": 2}]
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_openai_deltas_across_chunk_boundaries(size):
+    # Multi-byte characters are split between chunks at the smaller sizes
+    data = (_sse(_openai_event(reasoning="Hmm"), _openai_event("Bonjour "), _openai_event("à tous, 世界"),
+                 {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 5}})
+            + b"data: [DONE]\n\n")
+
+    deltas = list(openai_deltas(_split(data, size)))
+
+    assert "".join(delta.content for delta in deltas) == "Bonjour à tous, 世界"
+    assert deltas[0] == StreamDelta(reasoning="Hmm")
+    assert deltas[-1].usage == {"prompt_tokens": 12, "completion_tokens": 5}
+
+
+def test_openai_deltas_raise_errors_in_the_stream():
+    data = _sse(_openai_event("partial"), {"error": {"message": "Rate limited"}})
+    deltas = openai_deltas([data])
+    assert next(deltas).content == "partial"
+    with pytest.raises(StreamError, match="Rate limited"):
+        next(deltas)
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_ollama_deltas_across_chunk_boundaries(size):
+    lines = [
+        {"message": {"role": "assistant", "content": "", "thinking": "Let me see"}, "done": False},
+        {"message": {"role": "assistant", "content": "Guten "}, "done": False},
+        {"message": {"role": "assistant", "content": "Tag, Grüße"}, "done": False},
+        {"message": {"role": "assistant", "content": ""}, "done": True, "prompt_eval_count": 20, "eval_count": 4},
+        {"message": {"role": "assistant", "content": "after done"}, "done": False},
+    ]
+    data = b"".join(json.dumps(line, ensure_ascii=False).encode() + b"\n" for line in lines)
+
+    deltas = list(ollama_deltas(_split(data, size)))
+
+    assert [delta.content for delta in deltas] == ["", "Guten ", "Tag, Grüße", ""]
+    assert deltas[0].reasoning == "Let me see"
+    assert deltas[-1] == StreamDelta("", "", {"prompt_tokens": 20, "completion_tokens": 4}, True)
+
+
+def test_ndjson_objects_skip_blank_and_malformed_lines():
+    data = b'{"a": 1}\n\nnot json\n{"a": 2}'
+    assert list(ndjson_objects(_split(data, 4))) == [{"a": 1}, {"a": 2}]
+
+
+def test_ollama_deltas_raise_errors_in_the_stream():
+    with pytest.raises(StreamError, match="model not found"):
+        list(ollama_deltas([b'{"error": "model not found"}\n']))
+
+
+@pytest.mark.parametrize("usage, parsed", [
+    (None, None),
+    ({}, None),
+    ({"prompt_tokens": 3, "completion_tokens": None}, {"prompt_tokens": 3, "completion_tokens": 0}),
+    ({"prompt_tokens": "7", "completion_tokens": 2, "total_tokens": 9}, {"prompt_tokens": 7, "completion_tokens": 2}),
+])
+def test_parse_usage(usage, parsed):
+    assert parse_usage(usage) == parsed
+
+
+class _Raw:
+    def __init__(self, reads):
+        self.reads = list(reads)
+
+    def read1(self, size, decode_content=False):
+        return self.reads.pop(0) if self.reads else b""
+
+
+class _Response:
+    def __init__(self, raw=None, content=()):
+        self.raw = raw
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        assert chunk_size is None
+        return iter(self.content)
+
+
+def test_response_chunks_hands_over_each_read():
+    raw = _Raw([b"data: a", b"\n\n", b"data: b\n\n"])
+    assert list(response_chunks(_Response(raw))) == [b"data: a", b"\n\n", b"data: b\n\n"]
+
+
+def test_response_chunks_fall_back_to_iter_content_without_read1():
+    response = _Response(raw=object(), content=[b"one", b"two"])
+    assert list(response_chunks(response)) == [b"one", b"two"]